@@ -0,0 +1,183 @@
+"""Python API for evaluating experiments without the CLI.
+
+Unlike main.main(), nothing here parses sys.argv or writes to disk (unless an
+ExperimentWriter is given to run_experiment). For example:
+
+    result = api.run_experiment({"num_years": 30, "market_config": {...}, ...})
+    results = api.evaluate([experiment_config, other_experiment_config])
+
+    # repeated what-if queries are served from memory
+    result_cache = ResultCache()
+    result = api.run_experiment(experiment_config, result_cache=result_cache)
+
+    async for index, result in api.evaluate_many_async(experiment_configs):
+        print(index, result.final_state)
+"""
+import asyncio
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from concurrent.futures import Executor
+from typing import Any
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.core.result_cache import ResultCache
+from rent_buy_invest.io.experiment_writer import ExperimentWriter
+
+DEFAULT_MAX_PENDING = 16
+
+# an experiment config object, or a dict accepted by ExperimentConfig.from_dict
+ExperimentConfigLike = ExperimentConfig | dict[str, Any]
+
+
+def _to_experiment_config(experiment_config: ExperimentConfigLike) -> ExperimentConfig:
+    if isinstance(experiment_config, ExperimentConfig):
+        return experiment_config
+    return ExperimentConfig.from_dict(experiment_config)
+
+
+def run_experiment(
+    experiment_config: ExperimentConfigLike,
+    experiment_writer: ExperimentWriter | None = None,
+    output_formats: Iterable[str] = (ExperimentWriter.DEFAULT_OUTPUT_FORMAT,),
+    result_cache: ResultCache | None = None,
+) -> ExperimentResult:
+    """Runs a single experiment in memory.
+
+    The filesystem is not touched, except to read sub-configs given by path and,
+    once per process, the config schemas. Outputs are only written if an
+    experiment writer is given.
+
+    Args:
+        experiment_config: Experiment config, or dict accepted by
+            ExperimentConfig.from_dict (e.g., with every sub-config by contents)
+        experiment_writer: If given, the configs and results are written with it
+            (see ExperimentWriter.write_result)
+        output_formats: Formats of the written DataFrames
+        result_cache: If given, the result is taken from it if an identical
+            config was already evaluated, and is added to it otherwise
+
+    Returns:
+        ExperimentResult: The initial state, projection, and final state
+
+    Raises:
+        jsonschema.ValidationError, AssertionError: If the config is invalid
+    """
+    experiment_config = _to_experiment_config(experiment_config)
+    result = (
+        ExperimentResult.from_config(experiment_config)
+        if result_cache is None
+        else result_cache.evaluate(experiment_config)
+    )
+    if experiment_writer is not None:
+        experiment_writer.write_result(experiment_config, result, output_formats)
+    return result
+
+
+def evaluate(
+    experiment_configs: Iterable[ExperimentConfigLike],
+    executor: Executor | None = None,
+    result_cache: ResultCache | None = None,
+) -> list[ExperimentResult]:
+    """Evaluates experiments and returns their results in the same order.
+
+    Args:
+        experiment_configs: Experiment configs, or dicts accepted by
+            ExperimentConfig.from_dict
+        executor: Executor to evaluate on (e.g., a ProcessPoolExecutor); defaults
+            to evaluating in the calling thread
+        result_cache: If given, results of configs which were already evaluated
+            are taken from it (in the calling thread), and only the others are
+            evaluated and then added to it
+
+    Raises:
+        jsonschema.ValidationError, AssertionError: If a config is invalid
+    """
+    experiment_configs = [_to_experiment_config(c) for c in experiment_configs]
+    if result_cache is None:
+        results: list[ExperimentResult | None] = [None] * len(experiment_configs)
+    else:
+        results = [result_cache.get(c) for c in experiment_configs]
+    miss_indices = [i for i, result in enumerate(results) if result is None]
+    miss_configs = [experiment_configs[i] for i in miss_indices]
+    if executor is None:
+        miss_results = map(ExperimentResult.from_config, miss_configs)
+    else:
+        miss_results = executor.map(ExperimentResult.from_config, miss_configs)
+    for i, result in zip(miss_indices, miss_results):
+        results[i] = result
+        if result_cache is not None:
+            result_cache.put(experiment_configs[i], result)
+    return results
+
+
+async def _aiter(
+    experiment_configs: Iterable[ExperimentConfigLike]
+    | AsyncIterable[ExperimentConfigLike],
+) -> AsyncIterator[ExperimentConfigLike]:
+    if isinstance(experiment_configs, AsyncIterable):
+        async for experiment_config in experiment_configs:
+            yield experiment_config
+    else:
+        for experiment_config in experiment_configs:
+            yield experiment_config
+
+
+async def evaluate_many_async(
+    experiment_configs: Iterable[ExperimentConfigLike]
+    | AsyncIterable[ExperimentConfigLike],
+    executor: Executor | None = None,
+    max_pending: int = DEFAULT_MAX_PENDING,
+) -> AsyncIterator[tuple[int, ExperimentResult]]:
+    """Evaluates experiments on an executor, yielding results as they complete.
+
+    The event loop is never blocked by calculations. Configs are consumed lazily:
+    at most max_pending experiments are submitted but not yet yielded, so a slow
+    consumer (or a large or infinite input) does not make results pile up in
+    memory.
+
+    If iteration stops early (e.g., break, aclose(), or cancelling the consuming
+    task), experiments which have not started are cancelled. Experiments already
+    running on the executor finish, but their results are discarded.
+
+    Args:
+        experiment_configs: Experiment configs, or dicts accepted by
+            ExperimentConfig.from_dict; either a regular or an async iterable
+        executor: Executor to evaluate on; defaults to the event loop's default
+            executor (a thread pool). Use a ProcessPoolExecutor to evaluate
+            experiments in parallel, since the calculations hold the GIL.
+        max_pending: Maximum number of experiments in flight at once
+
+    Yields:
+        tuple[int, ExperimentResult]: Index of the config in experiment_configs and
+            its result, in order of completion
+
+    Raises:
+        jsonschema.ValidationError, AssertionError: If a config is invalid
+    """
+    assert max_pending > 0, "max_pending must be positive"
+    loop = asyncio.get_running_loop()
+    # future -> index of its config
+    pending: dict[asyncio.Future, int] = {}
+    try:
+        index = 0
+        async for experiment_config in _aiter(experiment_configs):
+            while len(pending) >= max_pending:
+                done, _ = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield pending.pop(future), future.result()
+            future = loop.run_in_executor(
+                executor,
+                ExperimentResult.from_config,
+                _to_experiment_config(experiment_config),
+            )
+            pending[future] = index
+            index += 1
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,157 @@
+import asyncio
+import builtins
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from rent_buy_invest import api
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.core.result_cache import ResultCache
+from rent_buy_invest.io.experiment_writer import ExperimentWriter
+
+EXPERIMENT_CONFIG_PATH = (
+    "rent_buy_invest/core/test_resources/test-experiment-config.yaml"
+)
+NUM_YEARS = [2, 5, 10, 20, 3, 7]
+
+
+def _get_experiment_configs() -> list[ExperimentConfig]:
+    experiment_config = ExperimentConfig.parse(EXPERIMENT_CONFIG_PATH)
+    return [experiment_config.with_overrides(num_years=n) for n in NUM_YEARS]
+
+
+def _get_final_states(results: list[ExperimentResult]) -> list:
+    return [result.final_state for result in results]
+
+
+def test_run_experiment(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    experiment_config = _get_experiment_configs()[0]
+    exp_result = ExperimentResult.from_config(experiment_config)
+    config_dict = experiment_config.to_dict()
+    # load the schemas, which are read once per process
+    api.run_experiment(config_dict)
+
+    def _raise(*args, **kwargs) -> None:
+        raise AssertionError("Unexpected filesystem access")
+
+    with monkeypatch.context() as m:
+        m.setattr(builtins, "open", _raise)
+        m.setattr(os, "makedirs", _raise)
+        m.setattr(os, "stat", _raise)
+        result = api.run_experiment(config_dict)
+    assert result.final_state == exp_result.final_state
+    assert result.initial_state == exp_result.initial_state
+    assert result.projection.equals(exp_result.projection)
+
+    experiment_writer = ExperimentWriter("test_run_experiment", str(tmp_path))
+    api.run_experiment(config_dict, experiment_writer, output_formats=["csv"])
+    assert sorted(os.listdir(experiment_writer.output_dir)) == [
+        "configs.yaml",
+        "final_state.csv",
+        "initial_state.csv",
+        "projection.csv",
+    ]
+
+
+def test_evaluate() -> None:
+    experiment_configs = _get_experiment_configs()
+    exp_results = [ExperimentResult.from_config(c) for c in experiment_configs]
+    results = api.evaluate(experiment_configs)
+    assert _get_final_states(results) == _get_final_states(exp_results)
+    assert results[0].projection.equals(exp_results[0].projection)
+
+    # dicts and an executor
+    config_dicts = [c.to_dict() for c in experiment_configs]
+    with ThreadPoolExecutor(2) as executor:
+        results = api.evaluate(config_dicts, executor=executor)
+    assert _get_final_states(results) == _get_final_states(exp_results)
+
+    with pytest.raises(AssertionError):
+        api.evaluate([{**config_dicts[0], "num_years": -1}])
+
+
+def test_result_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    experiment_configs = _get_experiment_configs()
+    exp_results = [ExperimentResult.from_config(c) for c in experiment_configs]
+    result_cache = ResultCache()
+    result = api.run_experiment(experiment_configs[0], result_cache=result_cache)
+    assert result.final_state == exp_results[0].final_state
+    assert result_cache.get_stats()["misses"] == 1
+
+    # only the configs which weren't evaluated yet are calculated
+    calculated = []
+    from_config = ExperimentResult.from_config
+
+    def _from_config(experiment_config: ExperimentConfig) -> ExperimentResult:
+        calculated.append(experiment_config.num_years)
+        return from_config(experiment_config)
+
+    monkeypatch.setattr(ExperimentResult, "from_config", _from_config)
+    with ThreadPoolExecutor(2) as executor:
+        results = api.evaluate(
+            [c.to_dict() for c in experiment_configs],
+            executor=executor,
+            result_cache=result_cache,
+        )
+    assert _get_final_states(results) == _get_final_states(exp_results)
+    assert sorted(calculated) == sorted(NUM_YEARS[1:])
+    assert len(result_cache) == len(NUM_YEARS)
+
+    calculated.clear()
+    results = api.evaluate(experiment_configs, result_cache=result_cache)
+    assert _get_final_states(results) == _get_final_states(exp_results)
+    result = api.run_experiment(experiment_configs[1], result_cache=result_cache)
+    assert result.projection.equals(exp_results[1].projection)
+    assert calculated == []
+
+
+async def _collect(experiment_configs, **kwargs) -> dict[int, ExperimentResult]:
+    return {
+        index: result
+        async for index, result in api.evaluate_many_async(experiment_configs, **kwargs)
+    }
+
+
+def test_evaluate_many_async() -> None:
+    experiment_configs = _get_experiment_configs()
+    exp_final_states = _get_final_states(api.evaluate(experiment_configs))
+
+    results = asyncio.run(_collect(experiment_configs, max_pending=2))
+    assert sorted(results) == list(range(len(NUM_YEARS)))
+    assert [results[i].final_state for i in range(len(NUM_YEARS))] == exp_final_states
+
+    async def _aiter_configs():
+        for experiment_config in experiment_configs:
+            await asyncio.sleep(0)
+            yield experiment_config
+
+    with ProcessPoolExecutor(2) as executor:
+        results = asyncio.run(_collect(_aiter_configs(), executor=executor))
+    assert [results[i].final_state for i in range(len(NUM_YEARS))] == exp_final_states
+
+
+def test_evaluate_many_async_backpressure_and_cancellation() -> None:
+    experiment_configs = _get_experiment_configs()
+    num_consumed = 0
+
+    def _iter_configs():
+        nonlocal num_consumed
+        for experiment_config in experiment_configs:
+            num_consumed += 1
+            yield experiment_config
+
+    async def _take_first(executor) -> None:
+        results = api.evaluate_many_async(
+            _iter_configs(), executor=executor, max_pending=2
+        )
+        async for _ in results:
+            break
+        await results.aclose()
+
+    with ThreadPoolExecutor(1) as executor:
+        asyncio.run(_take_first(executor))
+    # the first result is yielded once at most max_pending are in flight, and
+    # nothing is consumed after iteration stops
+    assert num_consumed == 3
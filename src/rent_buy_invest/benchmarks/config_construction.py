@@ -0,0 +1,70 @@
+"""Benchmarks the per-config construction cost of each way of building a config.
+
+Run with: python -m rent_buy_invest.benchmarks.config_construction
+"""
+import timeit
+from collections.abc import Callable
+
+from rent_buy_invest.configs.buy_config import BuyConfig
+from rent_buy_invest.configs.config import Config
+from rent_buy_invest.configs.market_config import MarketConfig
+from rent_buy_invest.configs.personal_config import PersonalConfig
+from rent_buy_invest.configs.rent_config import RentConfig
+
+EXAMPLE_CONFIGS_DIR = "rent_buy_invest/configs/examples/example-1"
+
+# config class -> (example config file name, field to override, override value)
+CONFIGS: dict[type[Config], tuple[str, str, float]] = {
+    BuyConfig: ("buy-config.yaml", "sale_price", 600000.0),
+    RentConfig: ("rent-config.yaml", "monthly_rent", 2500.0),
+    MarketConfig: ("market-config.yaml", "market_rate_of_return", 0.06),
+    PersonalConfig: ("personal-config.yaml", "ordinary_income", 150000.0),
+}
+
+
+def time_per_call(func: Callable[[], object], num_calls: int) -> float:
+    """Returns the best average time per call in seconds over a few repeats."""
+    return min(timeit.repeat(func, number=num_calls, repeat=3)) / num_calls
+
+
+def get_construction_timings(num_calls: int = 200) -> dict[str, dict[str, float]]:
+    """Returns config class name -> construction method -> seconds per config."""
+    timings = {}
+    for clz, (filename, field, value) in CONFIGS.items():
+        path = f"{EXAMPLE_CONFIGS_DIR}/{filename}"
+        config = clz.parse(path)
+        config_dict = config.to_dict()
+        frozen_config = config.freeze()
+        timings[clz.__name__] = {
+            "parse (uncached)": time_per_call(
+                lambda: clz.parse(path, use_cache=False), num_calls
+            ),
+            "parse (cached)": time_per_call(lambda: clz.parse(path), num_calls),
+            "from_dict": time_per_call(lambda: clz.from_dict(config_dict), num_calls),
+            "from_dict (trusted)": time_per_call(
+                lambda: clz.from_dict(config_dict, validate_schema=False), num_calls
+            ),
+            "with_overrides": time_per_call(
+                lambda: config.with_overrides(**{field: value}), num_calls
+            ),
+            "FrozenConfig.replace + thaw": time_per_call(
+                lambda: frozen_config.replace(**{field: value}).thaw(), num_calls
+            ),
+        }
+    return timings
+
+
+def main() -> None:
+    timings = get_construction_timings()
+    for class_name, class_timings in timings.items():
+        print(class_name)
+        parse_time = class_timings["parse (uncached)"]
+        for method, seconds in class_timings.items():
+            print(
+                f"  {method:<30}{seconds * 1e6:>10.1f} us/config"
+                f"{parse_time / seconds:>8.1f}x faster than uncached parse"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""Benchmarks the hot paths of the calculations and outputs, and compares runs
+against a baseline.
+
+Run with:
+    python -m rent_buy_invest.benchmarks.hot_paths run [--output <path>] [--baseline <path>] [--filter <substring>]
+    python -m rent_buy_invest.benchmarks.hot_paths compare <baseline> <current> [--threshold 0.1]
+
+'run' writes the results as JSON (see run_benchmarks); keep the results of a known
+good commit as the baseline. 'compare' (and 'run --baseline') prints the change of
+each benchmark and exits with status 1 if any benchmark is slower than the baseline
+by more than the threshold. Timings are only comparable on the same machine.
+"""
+import argparse
+import datetime
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.calculator import Calculator
+from rent_buy_invest.core.fixed_point_calculator import FixedPointCalculator
+from rent_buy_invest.core.initial_state import InitialState
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.io.experiment_writer import ExperimentWriter
+from rent_buy_invest.utils import math_utils
+
+EXAMPLE_EXPERIMENT_CONFIG_PATHS = {
+    "example-1": "rent_buy_invest/configs/examples/example-1/experiment-config.yaml",
+    "apples-to-apples": "rent_buy_invest/configs/examples/apples-to-apples/experiment-config.yaml",
+}
+# horizons of the calculator benchmarks
+NUM_YEARS = (1, 30, 100, 300)
+# horizons of the fixed-point calculator benchmarks (to compare with the above)
+FIXED_POINT_NUM_YEARS = (30, 300)
+# horizon of the projection written by the xlsx benchmark
+XLSX_NUM_YEARS = 30
+DEFAULT_OUTPUT_PROJECT_PATH = "rent_buy_invest/out/benchmarks/hot-paths.json"
+DEFAULT_NUM_REPEATS = 5
+# a benchmark regresses if it is more than this fraction slower than the baseline
+DEFAULT_THRESHOLD = 0.1
+
+
+def _get_calculator(
+    experiment_config: ExperimentConfig,
+    calculator_class: type[Calculator] = Calculator,
+) -> Calculator:
+    return calculator_class(
+        experiment_config.buy_config,
+        experiment_config.rent_config,
+        experiment_config.market_config,
+        experiment_config.personal_config,
+        experiment_config.num_years,
+        experiment_config.start_date,
+        InitialState.from_configs(
+            experiment_config.buy_config,
+            experiment_config.rent_config,
+            experiment_config.market_config,
+            experiment_config.personal_config,
+        ),
+    )
+
+
+def get_benchmarks(output_dir: str) -> dict[str, Callable[[], object]]:
+    """Returns benchmark name -> function to time.
+
+    Everything the functions need (configs, calculators, DataFrames) is set up here,
+    so that only the hot path itself is timed.
+
+    Args:
+        output_dir: Absolute path of a directory to write outputs to
+    """
+    experiment_config = ExperimentConfig.parse(
+        EXAMPLE_EXPERIMENT_CONFIG_PATHS["example-1"]
+    )
+    market_config = experiment_config.market_config
+    benchmarks: dict[str, Callable[[], object]] = {}
+    for num_years in NUM_YEARS:
+        calculator = _get_calculator(
+            experiment_config.with_overrides(num_years=num_years)
+        )
+        benchmarks[f"calculator.calculate[{num_years}y]"] = calculator.calculate
+    for num_years in FIXED_POINT_NUM_YEARS:
+        calculator = _get_calculator(
+            experiment_config.with_overrides(num_years=num_years), FixedPointCalculator
+        )
+        benchmarks[
+            f"fixed_point_calculator.calculate[{num_years}y]"
+        ] = calculator.calculate
+
+    # a month in the 10th year, so that the tax brackets are inflated
+    month = 10 * math_utils.MONTHS_PER_YEAR
+    benchmarks["market_config.get_tax"] = lambda: market_config.get_tax(
+        month, 150000.0, long_term_capital_gains=20000.0
+    )
+    benchmarks[
+        "market_config.get_income_tax_savings_from_deduction"
+    ] = lambda: market_config.get_income_tax_savings_from_deduction(
+        month, 150000.0, 20000.0
+    )
+    benchmarks["math_utils.project_growth[30y]"] = lambda: math_utils.project_growth(
+        500000.0, 0.03, True, 30 * math_utils.MONTHS_PER_YEAR
+    )
+
+    for name, path in EXAMPLE_EXPERIMENT_CONFIG_PATHS.items():
+        # parses the experiment config and all of its sub-config files
+        benchmarks[
+            f"experiment_config.parse[{name}]"
+        ] = lambda path=path: ExperimentConfig.parse(path, use_cache=False)
+
+    experiment_writer = ExperimentWriter(
+        "hot_paths", output_dir_project_path=output_dir
+    )
+    projection = _get_calculator(
+        experiment_config.with_overrides(num_years=XLSX_NUM_YEARS)
+    ).calculate()
+    benchmarks[
+        f"experiment_writer.write_xlsx_df[{XLSX_NUM_YEARS}y]"
+    ] = lambda: experiment_writer.write_xlsx_df("projection.xlsx", projection, 2)
+    return benchmarks
+
+
+def time_benchmark(
+    func: Callable[[], object], num_repeats: int = DEFAULT_NUM_REPEATS
+) -> dict[str, float]:
+    """Times the function like the timeit command does.
+
+    The number of calls per repeat is chosen so that a repeat takes at least 0.2
+    seconds.
+
+    Returns:
+        dict[str, float]: {"seconds": best time per call, "median_seconds": median
+            time per call, "num_calls": calls per repeat, "num_repeats"}
+    """
+    timer = timeit.Timer(func)
+    num_calls, _ = timer.autorange()
+    times = [t / num_calls for t in timer.repeat(repeat=num_repeats, number=num_calls)]
+    return {
+        "seconds": min(times),
+        "median_seconds": statistics.median(times),
+        "num_calls": num_calls,
+        "num_repeats": num_repeats,
+    }
+
+
+def run_benchmarks(
+    name_filter: str = "", num_repeats: int = DEFAULT_NUM_REPEATS
+) -> dict[str, Any]:
+    """Runs the benchmarks whose names contain name_filter.
+
+    Returns:
+        dict[str, Any]: {"benchmarks": {name: timings (see time_benchmark)},
+            "timestamp", "python_version", "platform"}
+    """
+    output_dir = tempfile.mkdtemp()
+    try:
+        benchmarks = get_benchmarks(output_dir)
+        results = {}
+        for name, func in benchmarks.items():
+            if name_filter in name:
+                results[name] = time_benchmark(func, num_repeats)
+                print(f"{name:<60}{results[name]['seconds'] * 1e6:>14.1f} us/call")
+    finally:
+        shutil.rmtree(output_dir)
+    return {
+        "benchmarks": results,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[str]:
+    """Compares the best time per call of the benchmarks in both results.
+
+    Args:
+        baseline: Results of run_benchmarks to compare against
+        current: Results of run_benchmarks
+        threshold: A benchmark regresses if it is more than this fraction slower
+            than the baseline (e.g., 0.1 for 10%)
+
+    Returns:
+        list[str]: Names of the regressed benchmarks
+    """
+    assert threshold >= 0, "Threshold must be non-negative"
+    regressions = []
+    for name, timings in current["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            print(f"{name:<60}{'(not in baseline)':>16}")
+            continue
+        change = timings["seconds"] / baseline["benchmarks"][name]["seconds"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<60}{change:>+15.1%}{flag}")
+    print(
+        f"{len(regressions)} of {len(current['benchmarks'])} benchmarks are more than {threshold:.0%} slower than the baseline"
+    )
+    return regressions
+
+
+def _get_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rent_buy_invest.benchmarks.hot_paths",
+        description="Benchmarks the hot paths of the calculations and outputs, and compares runs against a baseline.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="Runs the benchmarks.")
+    run_parser.add_argument(
+        "--output",
+        type=str,
+        default=DEFAULT_OUTPUT_PROJECT_PATH,
+        help=f"Path (from 'rent_buy_invest' directory) of the results JSON file; defaults to '{DEFAULT_OUTPUT_PROJECT_PATH}'.",
+    )
+    run_parser.add_argument(
+        "--baseline",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) of baseline results to compare against.",
+    )
+    run_parser.add_argument(
+        "--filter",
+        type=str,
+        default="",
+        help="Only run the benchmarks whose names contain this.",
+    )
+    run_parser.add_argument(
+        "--num-repeats",
+        type=int,
+        default=DEFAULT_NUM_REPEATS,
+        help=f"Number of times each benchmark is repeated; defaults to {DEFAULT_NUM_REPEATS}.",
+    )
+    compare_parser = subparsers.add_parser(
+        "compare", help="Compares results against baseline results."
+    )
+    compare_parser.add_argument(
+        "baseline",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) of the baseline results.",
+    )
+    compare_parser.add_argument(
+        "current",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) of the results to compare.",
+    )
+    for subparser in (run_parser, compare_parser):
+        subparser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f"Fraction by which a benchmark must be slower than the baseline to regress; defaults to {DEFAULT_THRESHOLD}.",
+        )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Exits with status 1 if any benchmark regressed."""
+    args = _get_args(argv)
+    if args.command == "run":
+        current = run_benchmarks(args.filter, args.num_repeats)
+        io_utils.make_dirs(os.path.dirname(args.output))
+        io_utils.write_json(args.output, current)
+        print(f"Results: {args.output}")
+        if not args.baseline:
+            return
+        baseline = io_utils.read_json(args.baseline)
+    else:
+        baseline = io_utils.read_json(args.baseline)
+        current = io_utils.read_json(args.current)
+    if compare(baseline, current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import pytest
+
+from rent_buy_invest.benchmarks import hot_paths
+from rent_buy_invest.io import io_utils
+
+DIR = "rent_buy_invest/temp/test_hot_paths"
+
+
+def _get_results(seconds: dict[str, float]) -> dict:
+    return {
+        "benchmarks": {name: {"seconds": s} for name, s in seconds.items()},
+    }
+
+
+def test_compare() -> None:
+    baseline = _get_results({"a": 1.0, "b": 1.0, "c": 1.0})
+    current = _get_results({"a": 1.05, "b": 1.2, "c": 0.5, "d": 1.0})
+    assert hot_paths.compare(baseline, current, threshold=0.1) == ["b"]
+    assert hot_paths.compare(baseline, current, threshold=0.01) == ["a", "b"]
+    assert hot_paths.compare(baseline, current, threshold=0.5) == []
+
+
+def test_main(capsys: pytest.CaptureFixture) -> None:
+    output = f"{DIR}/current.json"
+    hot_paths.main(
+        ["run", "--output", output, "--filter", "get_tax", "--num-repeats", "1"]
+    )
+    results = io_utils.read_json(output)
+    assert list(results["benchmarks"]) == ["market_config.get_tax"]
+    timings = results["benchmarks"]["market_config.get_tax"]
+    assert 0 < timings["seconds"] <= timings["median_seconds"]
+    assert timings["num_repeats"] == 1
+
+    # compared with itself, nothing regresses
+    hot_paths.main(["compare", output, output])
+    assert "0 of 1 benchmarks" in capsys.readouterr().out
+
+    baseline = _get_results({"market_config.get_tax": timings["seconds"] / 2})
+    io_utils.write_json(f"{DIR}/baseline.json", baseline)
+    with pytest.raises(SystemExit):
+        hot_paths.main(["compare", f"{DIR}/baseline.json", output])
+    assert "REGRESSION" in capsys.readouterr().out
+    io_utils.delete_dir(DIR)
+
+
+def test_get_benchmarks(tmp_path) -> None:
+    benchmarks = hot_paths.get_benchmarks(str(tmp_path))
+    assert [f"calculator.calculate[{n}y]" for n in hot_paths.NUM_YEARS] == list(
+        benchmarks
+    )[: len(hot_paths.NUM_YEARS)]
+    # every benchmark runs
+    for func in benchmarks.values():
+        func()
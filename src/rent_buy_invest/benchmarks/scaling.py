@@ -0,0 +1,313 @@
+"""Measures how the runtime and peak memory scale with the horizon (num_years) and
+with the number of scenarios in a sweep, and how sweeps scale across cores.
+
+Run with: python -m rent_buy_invest.benchmarks.scaling [--output <path>] [--no-check]
+
+Each horizon and batch size is measured in a fresh (spawned) process, so that its
+peak RSS is not hidden by earlier, larger measurements. The empirical complexity
+exponent k of time ~ size^k is fitted by least squares on a log-log scale.
+
+The report is printed and written as JSON. Unless --no-check is given, the command
+exits with status 1 if the calculator is not linear in months (its exponent is
+above MAX_LINEAR_EXPONENT), or if a sweep on several cores has a parallel
+efficiency below MIN_PARALLEL_EFFICIENCY. Parallel efficiency is only measured
+with more than one available core.
+"""
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
+
+EXPERIMENT_CONFIG_PATH = (
+    "rent_buy_invest/configs/examples/example-1/experiment-config.yaml"
+)
+# horizons are large enough that the fixed cost per experiment doesn't dominate
+DEFAULT_NUM_YEARS = (25, 50, 100, 200, 300)
+DEFAULT_BATCH_SIZES = (4, 16, 64)
+# horizon of each scenario in the batch and parallel sweeps
+BATCH_NUM_YEARS = 30
+# batch size of the parallel sweep
+PARALLEL_BATCH_SIZE = 64
+DEFAULT_NUM_REPEATS = 5
+DEFAULT_OUTPUT_PROJECT_PATH = "rent_buy_invest/out/benchmarks/scaling.json"
+# the calculator is linear in months if its fitted exponent is at most this (a
+# little above 1 to allow for noise)
+MAX_LINEAR_EXPONENT = 1.15
+MIN_PARALLEL_EFFICIENCY = 0.6
+
+
+def get_num_cores() -> int:
+    """Returns the number of cores this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def _get_peak_rss() -> int:
+    """Returns the peak resident set size of this process so far in bytes."""
+    import resource
+
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def _calculate(experiment_config: ExperimentConfig) -> None:
+    ExperimentResult.calculate_cols(experiment_config)
+
+
+def _measure(num_years: int, batch_size: int, num_repeats: int) -> dict[str, float]:
+    """Calculates batch_size experiments with the given horizon, one after the other.
+
+    Meant to run in a fresh process.
+
+    Returns:
+        dict[str, float]: {"seconds": best time of the batch, "peak_rss_bytes": peak
+            RSS of the process, "peak_rss_increase_bytes": peak RSS minus the peak
+            RSS before the batch (after imports and parsing configs)}
+    """
+    experiment_config = ExperimentConfig.parse(EXPERIMENT_CONFIG_PATH).with_overrides(
+        num_years=num_years
+    )
+    # warm up (e.g., lazy imports)
+    _calculate(experiment_config.with_overrides(num_years=2))
+    rss_before = _get_peak_rss()
+    best_seconds = math.inf
+    for _ in range(num_repeats):
+        start = time.perf_counter()
+        for _ in range(batch_size):
+            _calculate(experiment_config)
+        best_seconds = min(best_seconds, time.perf_counter() - start)
+    peak_rss = _get_peak_rss()
+    return {
+        "seconds": best_seconds,
+        "peak_rss_bytes": peak_rss,
+        "peak_rss_increase_bytes": peak_rss - rss_before,
+    }
+
+
+def _measure_in_new_process(
+    num_years: int, batch_size: int, num_repeats: int
+) -> dict[str, float]:
+    with ProcessPoolExecutor(
+        1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        return executor.submit(_measure, num_years, batch_size, num_repeats).result()
+
+
+def fit_exponent(sizes: Sequence[float], seconds: Sequence[float]) -> float:
+    """Returns the least-squares slope k of log(seconds) = k * log(size) + c."""
+    assert len(sizes) == len(seconds) >= 2, "Need at least two measurements"
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(s) for s in seconds]
+    x_mean = sum(xs) / len(xs)
+    y_mean = sum(ys) / len(ys)
+    return sum((x - x_mean) * (y - y_mean) for x, y in zip(xs, ys)) / sum(
+        (x - x_mean) ** 2 for x in xs
+    )
+
+
+def _time_sweep(num_workers: int, batch_size: int) -> float:
+    """Returns the seconds to calculate batch_size experiments on num_workers
+    processes, excluding starting the processes."""
+    experiment_config = ExperimentConfig.parse(EXPERIMENT_CONFIG_PATH).with_overrides(
+        num_years=BATCH_NUM_YEARS
+    )
+    with ProcessPoolExecutor(num_workers) as executor:
+        # start (and warm up) every worker
+        list(
+            executor.map(
+                _calculate,
+                [experiment_config.with_overrides(num_years=2)] * num_workers,
+            )
+        )
+        start = time.perf_counter()
+        list(executor.map(_calculate, [experiment_config] * batch_size))
+        return time.perf_counter() - start
+
+
+def measure_parallel_efficiency(
+    num_workers: int, batch_size: int = PARALLEL_BATCH_SIZE
+) -> dict[str, float]:
+    """Measures the speedup of a sweep on num_workers processes over one process.
+
+    Returns:
+        dict[str, float]: {"num_workers", "seconds_1_worker", "seconds",
+            "speedup", "efficiency" (speedup / num_workers)}
+    """
+    seconds_1_worker = _time_sweep(1, batch_size)
+    seconds = _time_sweep(num_workers, batch_size)
+    speedup = seconds_1_worker / seconds
+    return {
+        "num_workers": num_workers,
+        "seconds_1_worker": seconds_1_worker,
+        "seconds": seconds,
+        "speedup": speedup,
+        "efficiency": speedup / num_workers,
+    }
+
+
+def run_scaling(
+    num_years: Sequence[int] = DEFAULT_NUM_YEARS,
+    batch_sizes: Sequence[int] = DEFAULT_BATCH_SIZES,
+    num_workers: int | None = None,
+    num_repeats: int = DEFAULT_NUM_REPEATS,
+) -> dict[str, Any]:
+    """Measures scaling with the horizon, the batch size, and the number of cores.
+
+    Args:
+        num_years: Horizons of single experiments
+        batch_sizes: Numbers of experiments (of BATCH_NUM_YEARS years) calculated
+            one after the other
+        num_workers: Number of processes of the parallel sweep; defaults to the
+            number of available cores. Not measured if 1.
+        num_repeats: Number of times each horizon and batch is timed
+
+    Returns:
+        dict[str, Any]: {
+            "num_years": {"sizes", "measurements", "time_exponent", "rss_exponent"},
+            "batch_size": {same as num_years},
+            "parallel": measure_parallel_efficiency(...) or None,
+            "num_cores": number of available cores,
+        }; exponents are of the time and of the peak RSS increase
+    """
+    report: dict[str, Any] = {"num_cores": get_num_cores()}
+    for name, sizes, get_args in (
+        ("num_years", num_years, lambda size: (size, 1)),
+        ("batch_size", batch_sizes, lambda size: (BATCH_NUM_YEARS, size)),
+    ):
+        measurements = []
+        for size in sizes:
+            measurements.append(
+                _measure_in_new_process(*get_args(size), num_repeats=num_repeats)
+            )
+            print(
+                f"{name}={size}: {measurements[-1]['seconds'] * 1e3:.1f} ms, "
+                f"peak RSS {measurements[-1]['peak_rss_bytes'] / 1024**2:.1f} MiB "
+                f"(+{measurements[-1]['peak_rss_increase_bytes'] / 1024**2:.1f} MiB)"
+            )
+        report[name] = {
+            "sizes": list(sizes),
+            "measurements": measurements,
+            "time_exponent": fit_exponent(sizes, [m["seconds"] for m in measurements]),
+            # +1 byte, since the increase can be 0
+            "rss_exponent": fit_exponent(
+                sizes, [m["peak_rss_increase_bytes"] + 1 for m in measurements]
+            ),
+        }
+    num_workers = num_workers or report["num_cores"]
+    report["parallel"] = (
+        measure_parallel_efficiency(num_workers) if num_workers > 1 else None
+    )
+    return report
+
+
+def check(report: dict[str, Any]) -> list[str]:
+    """Returns the failed checks of a report of run_scaling (empty if all pass)."""
+    failures = []
+    time_exponent = report["num_years"]["time_exponent"]
+    if time_exponent > MAX_LINEAR_EXPONENT:
+        failures.append(
+            f"The calculator is not linear in months: time ~ num_years^{time_exponent:.2f}"
+        )
+    parallel = report["parallel"]
+    if parallel and parallel["efficiency"] < MIN_PARALLEL_EFFICIENCY:
+        failures.append(
+            f"Parallel efficiency on {parallel['num_workers']} workers is {parallel['efficiency']:.0%}, "
+            f"below {MIN_PARALLEL_EFFICIENCY:.0%}"
+        )
+    return failures
+
+
+def get_summary(report: dict[str, Any]) -> str:
+    """Returns a human-readable summary of a report of run_scaling."""
+    lines = []
+    for name in ("num_years", "batch_size"):
+        lines.append(
+            f"{name}: time ~ {name}^{report[name]['time_exponent']:.2f}, "
+            f"peak RSS increase ~ {name}^{report[name]['rss_exponent']:.2f}"
+        )
+    parallel = report["parallel"]
+    if parallel:
+        lines.append(
+            f"parallel: {parallel['speedup']:.2f}x speedup on {parallel['num_workers']} workers "
+            f"({parallel['efficiency']:.0%} efficiency)"
+        )
+    else:
+        lines.append(
+            f"parallel: not measured ({report['num_cores']} core(s) available)"
+        )
+    return "\n".join(lines)
+
+
+def _get_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rent_buy_invest.benchmarks.scaling",
+        description="Measures how runtime and peak memory scale with num_years, the number of scenarios, and the number of cores.",
+    )
+    parser.add_argument(
+        "--num-years",
+        type=int,
+        nargs="+",
+        default=DEFAULT_NUM_YEARS,
+        help=f"Horizons to measure; defaults to {' '.join(map(str, DEFAULT_NUM_YEARS))}.",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_BATCH_SIZES,
+        help=f"Numbers of scenarios to measure; defaults to {' '.join(map(str, DEFAULT_BATCH_SIZES))}.",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        help="Number of processes of the parallel sweep; defaults to the number of available cores.",
+    )
+    parser.add_argument(
+        "--num-repeats",
+        type=int,
+        default=DEFAULT_NUM_REPEATS,
+        help=f"Number of times each measurement is repeated; defaults to {DEFAULT_NUM_REPEATS}.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=DEFAULT_OUTPUT_PROJECT_PATH,
+        help=f"Path (from 'rent_buy_invest' directory) of the report JSON file; defaults to '{DEFAULT_OUTPUT_PROJECT_PATH}'.",
+    )
+    parser.add_argument(
+        "--no-check",
+        action="store_true",
+        help="Don't exit with an error if the calculator isn't linear or the parallel efficiency is too low.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _get_args(argv)
+    report = run_scaling(
+        args.num_years, args.batch_sizes, args.num_workers, args.num_repeats
+    )
+    report["failures"] = check(report)
+    io_utils.make_dirs(os.path.dirname(args.output))
+    io_utils.write_json(args.output, report)
+    print(get_summary(report))
+    print(f"Report: {args.output}")
+    for failure in report["failures"]:
+        print(f"FAILED: {failure}")
+    if report["failures"] and not args.no_check:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import pytest
+
+from rent_buy_invest.benchmarks import scaling
+from rent_buy_invest.io import io_utils
+
+DIR = "rent_buy_invest/temp/test_scaling"
+
+
+def test_fit_exponent() -> None:
+    sizes = [1, 2, 4, 8]
+    assert scaling.fit_exponent(sizes, [3 * s for s in sizes]) == pytest.approx(1)
+    assert scaling.fit_exponent(sizes, [s**2 for s in sizes]) == pytest.approx(2)
+    assert scaling.fit_exponent(sizes, [5 for _ in sizes]) == pytest.approx(0)
+
+
+def test_check() -> None:
+    report = {"num_years": {"time_exponent": 1.0}, "parallel": None}
+    assert scaling.check(report) == []
+    report["num_years"]["time_exponent"] = 2.0
+    report["parallel"] = {"num_workers": 4, "efficiency": 0.25}
+    assert len(scaling.check(report)) == 2
+
+
+def test_main() -> None:
+    output = f"{DIR}/scaling.json"
+    scaling.main(
+        [
+            "--num-years",
+            "2",
+            "4",
+            "--batch-sizes",
+            "1",
+            "2",
+            "--num-workers",
+            "1",
+            "--num-repeats",
+            "1",
+            "--output",
+            output,
+            "--no-check",
+        ]
+    )
+    report = io_utils.read_json(output)
+    assert report["num_years"]["sizes"] == [2, 4]
+    assert report["batch_size"]["sizes"] == [1, 2]
+    for measurement in report["num_years"]["measurements"]:
+        assert measurement["seconds"] > 0
+        assert measurement["peak_rss_bytes"] >= measurement["peak_rss_increase_bytes"]
+    assert report["parallel"] is None
+    io_utils.delete_dir(DIR)
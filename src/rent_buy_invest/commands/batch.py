@@ -0,0 +1,206 @@
+"""The 'batch' subcommand: evaluates experiments from JSON Lines, streaming results.
+
+Run with: python -m rent_buy_invest batch [input] [options] < input.jsonl > output.jsonl
+
+Each input line is a JSON object like the body of a 'serve' request (see
+commands/serve.py): {"experiment_config": {...}, "include_projection": false}, plus
+an optional "id" which is copied to the output. Each output line is a JSON object
+with the 1-based input "line" number, the "id" (if given), and either
+"initial_state", "final_state" (and "projection"), or "error". Results are written
+as soon as they are calculated, so with more than one worker they are not in input
+order.
+
+Memory use is constant: input is read lazily, at most --max-pending experiments
+are in flight at once, nothing is written to disk, and no DataFrames are built.
+"""
+import argparse
+import contextlib
+import json
+import sys
+from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, TextIO
+
+from rent_buy_invest.commands.serve import SubConfigCache, evaluate
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.utils.metrics_utils import MetricsRegistry, collect_metrics
+
+DEFAULT_NUM_WORKERS = 2
+
+
+def _write_line(out: TextIO, obj: dict[str, Any]) -> None:
+    out.write(json.dumps(obj) + "\n")
+    out.flush()
+
+
+def _get_error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}"
+
+
+def _evaluate_with_metrics(
+    experiment_config: ExperimentConfig, include_projection: bool
+) -> tuple[dict[str, Any], dict[str, dict[str, float]]]:
+    """Same as evaluate, but also returns the metrics of the calculation."""
+    with collect_metrics() as metrics:
+        result = evaluate(experiment_config, include_projection)
+    return result, metrics.to_dict()
+
+
+def run_batch(
+    lines: Iterable[str],
+    out: TextIO,
+    num_workers: int = DEFAULT_NUM_WORKERS,
+    max_pending: int | None = None,
+    metrics: MetricsRegistry | None = None,
+) -> tuple[int, int]:
+    """Evaluates the experiments in the given JSON lines and writes the results.
+
+    Args:
+        lines: Input lines (see module docstring); blank lines are skipped
+        out: Output stream, written to (and flushed) once per result
+        num_workers: Number of worker processes; 0 evaluates in this process
+        max_pending: Maximum number of experiments in flight at once; defaults to
+            four times num_workers
+        metrics: If given, the metrics of every calculation (see
+            utils/metrics_utils.py) are collected in the worker processes and added
+            to it
+
+    Returns:
+        tuple[int, int]: Number of results and number of errors
+    """
+    assert num_workers >= 0, "num_workers must be non-negative"
+    max_pending = max_pending or 4 * max(num_workers, 1)
+    assert max_pending > 0, "max_pending must be positive"
+    sub_config_cache = SubConfigCache()
+    # future -> output line without the results
+    pending: dict[Future, dict[str, Any]] = {}
+    num_results = 0
+    num_errors = 0
+
+    evaluate_func = evaluate if metrics is None else _evaluate_with_metrics
+
+    def _write_output(output: dict[str, Any]) -> None:
+        nonlocal num_results, num_errors
+        num_results += 1
+        num_errors += "error" in output
+        _write_line(out, output)
+
+    def _write_result(output: dict[str, Any], get_result: Any) -> None:
+        try:
+            result = get_result()
+            if metrics is not None:
+                result, result_metrics = result
+                metrics.merge(result_metrics)
+            output.update(result)
+        except Exception as e:
+            # any error (e.g., invalid values, overflow in an edge case, or a broken
+            # worker pool) fails only this experiment, not the whole stream
+            output["error"] = _get_error(e)
+        _write_output(output)
+
+    def _write_done() -> None:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            _write_result(pending.pop(future), future.result)
+
+    with (
+        ProcessPoolExecutor(num_workers) if num_workers else contextlib.nullcontext()
+    ) as executor:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            output: dict[str, Any] = {"line": line_number}
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise TypeError("Each line must be a JSON object")
+                if "id" in request:
+                    output["id"] = request["id"]
+                experiment_config = sub_config_cache.get_experiment_config(
+                    request["experiment_config"]
+                )
+            except Exception as e:
+                # e.g., invalid JSON or config, or a missing sub-config file
+                output["error"] = _get_error(e)
+                _write_output(output)
+                continue
+            include_projection = bool(request.get("include_projection"))
+
+            if executor is None:
+                _write_result(
+                    output, lambda: evaluate_func(experiment_config, include_projection)
+                )
+                continue
+            # backpressure: don't read more input while too many are in flight
+            if len(pending) >= max_pending:
+                _write_done()
+            try:
+                future = executor.submit(
+                    evaluate_func, experiment_config, include_projection
+                )
+            except Exception as e:
+                output["error"] = _get_error(e)
+                _write_output(output)
+                continue
+            pending[future] = output
+        while pending:
+            _write_done()
+    return num_results, num_errors
+
+
+def _get_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="rent_buy_invest batch",
+        description="Evaluates experiments read as JSON Lines and writes one JSON result per line to stdout as soon as it is calculated. See commands/batch.py for the formats.",
+    )
+    parser.add_argument(
+        "input",
+        type=str,
+        nargs="?",
+        default="-",
+        help="Path (from 'rent_buy_invest' directory) to the input JSON Lines file; defaults to '-' (stdin).",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=DEFAULT_NUM_WORKERS,
+        help=f"Number of worker processes, or 0 to evaluate in this process; defaults to {DEFAULT_NUM_WORKERS}.",
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        help="Maximum number of experiments in flight at once; defaults to four times --num-workers.",
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) to a JSON file to write the metrics of all calculations to "
+        "(call counts and cumulative times of tax calculations, growth projections, ...).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> None:
+    """Entrypoint of the 'batch' subcommand.
+
+    Exits with status 1 if any experiment failed.
+
+    Args:
+        argv: Command line arguments after 'batch'
+    """
+    args = _get_args(argv)
+    with (
+        contextlib.nullcontext(sys.stdin)
+        if args.input == "-"
+        else io_utils.RentBuyInvestFileOpener(args.input, "r")
+    ) as lines:
+        metrics = MetricsRegistry() if args.metrics else None
+        num_results, num_errors = run_batch(
+            lines, sys.stdout, args.num_workers, args.max_pending, metrics
+        )
+    print(f"Evaluated {num_results} experiments ({num_errors} errors)", file=sys.stderr)
+    if metrics is not None:
+        io_utils.write_json(args.metrics, metrics.to_dict())
+    if num_errors:
+        sys.exit(1)
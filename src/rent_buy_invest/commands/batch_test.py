@@ -0,0 +1,146 @@
+import dataclasses
+import io
+import json
+
+import pytest
+
+from rent_buy_invest.commands import batch
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.utils import hash_utils
+from rent_buy_invest.utils.metrics_utils import MetricsRegistry, collect_metrics
+
+DIR = "rent_buy_invest/temp/test_batch"
+EXPERIMENT_CONFIG_PATH = (
+    "rent_buy_invest/core/test_resources/test-experiment-config.yaml"
+)
+NUM_YEARS = [2, 5, 10, 20]
+
+
+def _get_lines() -> list[str]:
+    experiment_config = ExperimentConfig.parse(EXPERIMENT_CONFIG_PATH)
+    config_dict = json.loads(hash_utils.to_canonical_json(experiment_config.to_dict()))
+    lines = [
+        json.dumps(
+            {"id": f"{n}y", "experiment_config": {**config_dict, "num_years": n}}
+        )
+        for n in NUM_YEARS
+    ]
+    lines.insert(2, "")
+    lines.append("not json")
+    lines.append(json.dumps({"experiment_config": {**config_dict, "num_years": 1}}))
+    return [line + "\n" for line in lines]
+
+
+def _get_exp_outputs() -> list[dict]:
+    experiment_config = ExperimentConfig.parse(EXPERIMENT_CONFIG_PATH)
+    exp_outputs = []
+    for line_number, n in zip([1, 2, 4, 5], NUM_YEARS):
+        result = ExperimentResult.from_config(
+            experiment_config.with_overrides(num_years=n)
+        )
+        exp_outputs.append(
+            {
+                "line": line_number,
+                "id": f"{n}y",
+                "initial_state": dataclasses.asdict(result.initial_state),
+                "final_state": dataclasses.asdict(result.final_state),
+            }
+        )
+    return exp_outputs
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_run_batch(num_workers: int) -> None:
+    out = io.StringIO()
+    assert batch.run_batch(
+        _get_lines(), out, num_workers=num_workers, max_pending=1
+    ) == (6, 2)
+    outputs = sorted(
+        (json.loads(line) for line in out.getvalue().splitlines()),
+        key=lambda output: output["line"],
+    )
+    assert outputs[:4] == _get_exp_outputs()
+    assert outputs[4]["line"] == 6
+    assert outputs[4]["error"].startswith("JSONDecodeError")
+    assert outputs[5]["line"] == 7
+    assert outputs[5]["error"].startswith("AssertionError")
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_run_batch_bad_path(num_workers: int) -> None:
+    config_dict = io_utils.read_yaml(EXPERIMENT_CONFIG_PATH)
+    config_dict["start_date"] = config_dict["start_date"].strftime("%Y-%m-%d")
+    lines = [
+        json.dumps(
+            {
+                "experiment_config": {
+                    **config_dict,
+                    "market_config_path": "rent_buy_invest/missing.yaml",
+                }
+            }
+        ),
+        _get_lines()[0],
+    ]
+    out = io.StringIO()
+    assert batch.run_batch(lines, out, num_workers=num_workers) == (2, 1)
+    outputs = sorted(
+        (json.loads(line) for line in out.getvalue().splitlines()),
+        key=lambda output: output["line"],
+    )
+    assert outputs[0]["line"] == 1
+    assert outputs[0]["error"].startswith("FileNotFoundError")
+    assert outputs[1] == {**_get_exp_outputs()[0], "line": 2}
+
+
+def test_run_batch_calculation_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    def _evaluate(experiment_config: ExperimentConfig, include_projection: bool):
+        if experiment_config.num_years == NUM_YEARS[0]:
+            raise ZeroDivisionError("division by zero")
+        return evaluate(experiment_config, include_projection)
+
+    evaluate = batch.evaluate
+    monkeypatch.setattr(batch, "evaluate", _evaluate)
+    out = io.StringIO()
+    assert batch.run_batch(_get_lines()[:2], out, num_workers=0) == (2, 1)
+    outputs = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert outputs[0] == {
+        "line": 1,
+        "id": f"{NUM_YEARS[0]}y",
+        "error": "ZeroDivisionError: division by zero",
+    }
+    assert outputs[1] == _get_exp_outputs()[1]
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_run_batch_metrics(num_workers: int) -> None:
+    metrics = MetricsRegistry()
+    batch.run_batch(_get_lines(), io.StringIO(), num_workers, metrics=metrics)
+
+    # same counts as calculating the valid lines in this process
+    experiment_config = ExperimentConfig.parse(EXPERIMENT_CONFIG_PATH)
+    with collect_metrics() as exp_metrics:
+        for n in NUM_YEARS:
+            ExperimentResult.from_config(experiment_config.with_overrides(num_years=n))
+    assert metrics.counters == exp_metrics.counters
+    assert metrics.counters["calculator.rental_income_tax"] == sum(NUM_YEARS)
+    assert set(metrics.timers) == set(exp_metrics.timers)
+
+
+def test_main(capsys: pytest.CaptureFixture) -> None:
+    io_utils.make_dirs(DIR)
+    with io_utils.RentBuyInvestFileOpener(f"{DIR}/input.jsonl", "w") as f:
+        f.writelines(_get_lines()[:2])
+    batch.main([f"{DIR}/input.jsonl", "--num-workers", "0"])
+    captured = capsys.readouterr()
+    assert [json.loads(line) for line in captured.out.splitlines()] == (
+        _get_exp_outputs()[:2]
+    )
+    assert captured.err == "Evaluated 2 experiments (0 errors)\n"
+
+    with io_utils.RentBuyInvestFileOpener(f"{DIR}/input.jsonl", "w") as f:
+        f.write("not json\n")
+    with pytest.raises(SystemExit):
+        batch.main([f"{DIR}/input.jsonl", "--num-workers", "0"])
+    io_utils.delete_dir(DIR)
@@ -0,0 +1,39 @@
+"""The 'client' subcommand: runs an experiment on the daemon, if it is running.
+
+Takes the same arguments as a single experiment run (see
+'python -m rent_buy_invest --help') and sends them to the daemon (see
+commands/daemon.py), which runs them on a warm worker process. If the daemon isn't
+running, the experiment is run in this process instead, so scripts can always use
+the client. Output and exit code are the same either way.
+
+Run with: python -m rent_buy_invest client [--socket <path>] <experiment_config> [options]
+"""
+import argparse
+import sys
+
+from rent_buy_invest.commands import daemon
+
+
+def main(argv: list[str]) -> None:
+    """Entrypoint of the 'client' subcommand.
+
+    Args:
+        argv: Command line arguments after 'client'
+    """
+    # every other argument (including --help) is forwarded to the run
+    parser = argparse.ArgumentParser(prog="rent_buy_invest client", add_help=False)
+    parser.add_argument(
+        "--socket", type=str, default=daemon.DEFAULT_SOCKET_PROJECT_PATH
+    )
+    args, run_argv = parser.parse_known_args(argv)
+
+    response = daemon.request(args.socket, {"argv": run_argv})
+    if response is None:
+        from rent_buy_invest import main as main_module
+
+        main_module.run(main_module._get_args(run_argv))
+        return
+    sys.stdout.write(response["stdout"])
+    sys.stderr.write(response["stderr"])
+    if response["exit_code"]:
+        sys.exit(response["exit_code"])
@@ -0,0 +1,332 @@
+"""The 'daemon' subcommand: serves experiment runs from warm, pre-forked workers.
+
+Every CLI run pays for starting the interpreter and importing pandas, openpyxl,
+etc., which takes much longer than the calculation itself. The daemon pays that
+once: it imports everything, then forks worker processes which accept runs over a
+Unix domain socket. Each worker also keeps the experiment configs it has parsed,
+and reparses them only when one of their files changes. Send runs with the
+'client' subcommand, which runs them in-process when the daemon isn't running.
+
+Run with: python -m rent_buy_invest daemon [--socket <path>] [--num-workers N]
+Stop with: python -m rent_buy_invest daemon --stop (or Ctrl-C / SIGTERM)
+
+Protocol: the client connects, sends one JSON object followed by a newline, and
+receives one JSON object ({"exit_code": int, "stdout": str, "stderr": str}) followed
+by a newline. Requests are {"argv": [...]}, with the arguments of a single
+experiment run, {"command": "ping"}, or {"command": "stop"}.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from typing import Any
+
+from rent_buy_invest.io import io_utils
+
+DEFAULT_SOCKET_PROJECT_PATH = "rent_buy_invest/cache/daemon.sock"
+DEFAULT_NUM_WORKERS = 2
+# imported before forking so that workers start warm and share the loaded modules
+PRELOADED_MODULES = (
+    "numpy",
+    "pandas",
+    "openpyxl",
+    "jsonschema",
+    "rent_buy_invest.main",
+)
+
+
+def send_message(conn: socket.socket, message: dict[str, Any]) -> None:
+    """Sends a JSON object followed by a newline."""
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def receive_message(conn: socket.socket) -> dict[str, Any]:
+    """Receives a JSON object followed by a newline (or the end of the stream)."""
+    chunks = []
+    while not chunks or not chunks[-1].endswith(b"\n"):
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    assert chunks, "Connection closed before a message was received"
+    return json.loads(b"".join(chunks))
+
+
+class ExperimentConfigCache:
+    """Parsed experiment configs, reparsed only when one of their files changes.
+
+    Files are identified by their modification times, so a hit costs a stat() per
+    file instead of reading and validating them.
+    """
+
+    def __init__(self) -> None:
+        # experiment config project path -> (paths of its files, their modification
+        # times, config)
+        self._entries: dict[str, tuple[list[str], tuple[int, ...], Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _get_mtimes(project_paths: list[str]) -> tuple[int, ...]:
+        return tuple(
+            os.stat(io_utils.get_abs_path(path)).st_mtime_ns for path in project_paths
+        )
+
+    def get(self, experiment_config_path: str) -> Any:
+        """Returns the parsed ExperimentConfig at the given project path."""
+        from rent_buy_invest.configs.experiment_config import ExperimentConfig
+
+        entry = self._entries.get(experiment_config_path)
+        if entry is not None:
+            paths, mtimes, experiment_config = entry
+            with contextlib.suppress(OSError):
+                if self._get_mtimes(paths) == mtimes:
+                    return experiment_config
+
+        # the modification times are read before parsing, so that changes made
+        # while parsing are picked up next time
+        config_dict = io_utils.read_yaml(experiment_config_path)
+        paths = [experiment_config_path] + [
+            value for name, value in config_dict.items() if name.endswith("_path")
+        ]
+        mtimes = self._get_mtimes(paths)
+        experiment_config = ExperimentConfig.parse(experiment_config_path)
+        self._entries[experiment_config_path] = (paths, mtimes, experiment_config)
+        return experiment_config
+
+
+def request(socket_path: str, message: dict[str, Any]) -> dict[str, Any] | None:
+    """Sends a request to the daemon and returns its response.
+
+    Args:
+        socket_path: Project path of the daemon's socket
+        message: Request (see the protocol above)
+
+    Returns:
+        dict[str, Any] | None: The response, or None if the daemon isn't running
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(io_utils.get_abs_path(socket_path))
+            send_message(conn, message)
+            return receive_message(conn)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return None
+
+
+def get_request_error(request: Any) -> str | None:
+    """Returns why the request is invalid, or None if it is valid.
+
+    A valid request is a JSON object with either a 'command' ('ping' or 'stop') or
+    an 'argv' list of strings.
+    """
+    if not isinstance(request, dict):
+        return "Request must be a JSON object"
+    if "command" in request:
+        if request["command"] not in ("ping", "stop"):
+            return f"Unknown command {request['command']!r}; expected 'ping' or 'stop'"
+        return None
+    argv = request.get("argv")
+    if not isinstance(argv, list) or not all(isinstance(arg, str) for arg in argv):
+        return "Request must have a 'command' ('ping' or 'stop') or an 'argv' list of strings"
+    return None
+
+
+def _get_invalid_request_response(error: str) -> dict[str, Any]:
+    # exit code 2, like argument errors
+    return {"exit_code": 2, "stdout": "", "stderr": f"Invalid request: {error}\n"}
+
+
+def handle_run(argv: list[str], config_cache: ExperimentConfigCache) -> dict[str, Any]:
+    """Runs a single experiment like the CLI would and returns the response.
+
+    Output is captured instead of printed, and errors (including argument errors)
+    become a non-zero exit code instead of raising.
+    """
+    from rent_buy_invest import main
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            args = main._get_args(argv)
+            main.run(args, config_cache.get(args.experiment_config))
+        except SystemExit as e:
+            if isinstance(e.code, int) or e.code is None:
+                exit_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                exit_code = 1
+        except Exception:
+            traceback.print_exc()
+            exit_code = 1
+    return {
+        "exit_code": exit_code,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue(),
+    }
+
+
+def _work(listener: socket.socket) -> None:
+    """Accepts and handles connections forever; runs in each worker process."""
+    # the parent handles Ctrl-C and stops the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    config_cache = ExperimentConfigCache()
+    while True:
+        conn, _ = listener.accept()
+        with conn:
+            try:
+                request = receive_message(conn)
+                error = get_request_error(request)
+                if error is not None:
+                    send_message(conn, _get_invalid_request_response(error))
+                elif request.get("command") == "ping":
+                    send_message(conn, {"exit_code": 0, "stdout": "", "stderr": ""})
+                elif request.get("command") == "stop":
+                    # reply first, since the parent stops this worker too
+                    send_message(conn, {"exit_code": 0, "stdout": "", "stderr": ""})
+                    os.kill(os.getppid(), signal.SIGTERM)
+                else:
+                    send_message(conn, handle_run(request["argv"], config_cache))
+            except Exception as e:
+                # e.g., the client disconnected or sent invalid JSON; reply if the
+                # client is still listening, and keep serving other clients
+                traceback.print_exc()
+                with contextlib.suppress(OSError):
+                    send_message(
+                        conn,
+                        _get_invalid_request_response(f"{type(e).__name__}: {e}"),
+                    )
+
+
+def _fork_worker(listener: socket.socket) -> int:
+    """Forks a worker process and returns its pid."""
+    pid = os.fork()
+    if pid == 0:
+        exit_code = 0
+        try:
+            _work(listener)
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            # never return into the parent's code
+            os._exit(exit_code)
+    return pid
+
+
+def serve(socket_path: str, num_workers: int) -> None:
+    """Serves runs on the given Unix domain socket until stopped.
+
+    Args:
+        socket_path: Project path of the socket file
+        num_workers: Number of pre-forked worker processes, i.e., the maximum number
+            of concurrent runs
+    """
+    assert num_workers > 0, "num_workers must be positive"
+    abs_socket_path = io_utils.get_abs_path(socket_path)
+    assert not request(
+        socket_path, {"command": "ping"}
+    ), f"A daemon is already listening on '{socket_path}'"
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(abs_socket_path)
+    io_utils.make_dirs(os.path.dirname(socket_path))
+
+    for module in PRELOADED_MODULES:
+        importlib.import_module(module)
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # only the current user may connect
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(abs_socket_path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(128)
+
+    def _stop(signum, frame) -> None:
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _stop)
+    workers: set[int] = set()
+    try:
+        for _ in range(num_workers):
+            workers.add(_fork_worker(listener))
+        print(
+            f"Listening on '{socket_path}' with {num_workers} workers (pid {os.getpid()})",
+            flush=True,
+        )
+        while True:
+            pid, _ = os.wait()
+            # replace workers which died unexpectedly
+            if pid in workers:
+                workers.remove(pid)
+                workers.add(_fork_worker(listener))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in workers:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+        for pid in workers:
+            with contextlib.suppress(ChildProcessError):
+                os.waitpid(pid, 0)
+        listener.close()
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(abs_socket_path)
+
+
+def stop(socket_path: str) -> bool:
+    """Stops the daemon listening on the given socket.
+
+    Returns:
+        bool: Whether a daemon was running
+    """
+    return request(socket_path, {"command": "stop"}) is not None
+
+
+def _get_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="rent_buy_invest daemon",
+        description="Serves experiment runs from warm, pre-forked worker processes, which makes repeated runs with the 'client' subcommand much faster.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        default=DEFAULT_SOCKET_PROJECT_PATH,
+        help=f"Path (from 'rent_buy_invest' directory) to the Unix domain socket; defaults to '{DEFAULT_SOCKET_PROJECT_PATH}'.",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=DEFAULT_NUM_WORKERS,
+        help=f"Number of worker processes, i.e., the maximum number of concurrent runs; defaults to {DEFAULT_NUM_WORKERS}.",
+    )
+    parser.add_argument(
+        "--stop",
+        action="store_true",
+        help="Stop the running daemon instead.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> None:
+    """Entrypoint of the 'daemon' subcommand.
+
+    Args:
+        argv: Command line arguments after 'daemon'
+    """
+    args = _get_args(argv)
+    if args.stop:
+        if not stop(args.socket):
+            print(f"No daemon is listening on '{args.socket}'")
+        return
+    serve(args.socket, args.num_workers)
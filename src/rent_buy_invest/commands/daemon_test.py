@@ -0,0 +1,139 @@
+import os
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from rent_buy_invest.commands import client, daemon
+from rent_buy_invest.io import io_utils
+
+DIR = "rent_buy_invest/temp/test_daemon"
+SOCKET_PATH = f"{DIR}/daemon.sock"
+EXPERIMENT_CONFIG_PATH = (
+    "rent_buy_invest/configs/examples/example-1/experiment-config.yaml"
+)
+
+
+@pytest.fixture
+def experiment_config_path() -> str:
+    """Copy of the example experiment config with its own market config file."""
+    config_dict = io_utils.read_yaml(EXPERIMENT_CONFIG_PATH)
+    io_utils.make_dirs(DIR)
+    io_utils.write_yaml(
+        f"{DIR}/market-config.yaml",
+        io_utils.read_yaml(config_dict["market_config_path"]),
+    )
+    config_dict["market_config_path"] = f"{DIR}/market-config.yaml"
+    io_utils.write_yaml(f"{DIR}/experiment-config.yaml", config_dict)
+    yield f"{DIR}/experiment-config.yaml"
+    io_utils.delete_dir(DIR)
+
+
+def test_experiment_config_cache(experiment_config_path: str) -> None:
+    config_cache = daemon.ExperimentConfigCache()
+    experiment_config = config_cache.get(experiment_config_path)
+    assert config_cache.get(experiment_config_path) is experiment_config
+    assert len(config_cache) == 1
+
+    # changing a sub-config file reparses the experiment config
+    market_config_path = f"{DIR}/market-config.yaml"
+    market_config_dict = io_utils.read_yaml(market_config_path)
+    market_config_dict["market_rate_of_return"] += 0.01
+    io_utils.write_yaml(market_config_path, market_config_dict)
+    abs_path = io_utils.get_abs_path(market_config_path)
+    mtime_ns = os.stat(abs_path).st_mtime_ns + 1_000_000_000
+    os.utime(abs_path, ns=(mtime_ns, mtime_ns))
+    reparsed = config_cache.get(experiment_config_path)
+    assert reparsed is not experiment_config
+    assert (
+        reparsed.market_config.market_rate_of_return
+        == experiment_config.market_config.market_rate_of_return + 0.01
+    )
+    assert config_cache.get(experiment_config_path) is reparsed
+
+
+def test_handle_run(capsys: pytest.CaptureFixture) -> None:
+    config_cache = daemon.ExperimentConfigCache()
+    response = daemon.handle_run(
+        [EXPERIMENT_CONFIG_PATH, "--summary-only"], config_cache
+    )
+    client.main([EXPERIMENT_CONFIG_PATH, "--summary-only"])
+    assert response == {
+        "exit_code": 0,
+        "stdout": capsys.readouterr().out,
+        "stderr": "",
+    }
+
+    response = daemon.handle_run([EXPERIMENT_CONFIG_PATH, "--bogus"], config_cache)
+    assert response["exit_code"] == 2
+    assert "unrecognized arguments" in response["stderr"]
+
+    response = daemon.handle_run(
+        ["rent_buy_invest/does-not-exist.yaml", "--summary-only"], config_cache
+    )
+    assert response["exit_code"] == 1
+    assert "FileNotFoundError" in response["stderr"]
+
+
+def test_get_request_error() -> None:
+    assert daemon.get_request_error({"command": "ping"}) is None
+    assert daemon.get_request_error({"command": "stop"}) is None
+    assert daemon.get_request_error({"argv": ["a.yaml", "--no-cache"]}) is None
+    assert "JSON object" in daemon.get_request_error([])
+    assert "Unknown command 'run'" in daemon.get_request_error({"command": "run"})
+    for request in ({}, {"argv": "a.yaml"}, {"argv": [1]}):
+        assert "'argv' list of strings" in daemon.get_request_error(request)
+
+
+def test_serve() -> None:
+    assert daemon.request(SOCKET_PATH, {"command": "ping"}) is None
+    assert not daemon.stop(SOCKET_PATH)
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.path.dirname(io_utils.get_abs_path("rent_buy_invest")),
+    }
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "rent_buy_invest",
+            "daemon",
+            "--socket",
+            SOCKET_PATH,
+            "--num-workers",
+            "2",
+        ],
+        env=env,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        # wait until the daemon is listening
+        assert process.stdout.readline().startswith("Listening on")
+        exp_response = daemon.handle_run(
+            [EXPERIMENT_CONFIG_PATH, "--summary-only"], daemon.ExperimentConfigCache()
+        )
+        for _ in range(3):
+            response = daemon.request(
+                SOCKET_PATH, {"argv": [EXPERIMENT_CONFIG_PATH, "--summary-only"]}
+            )
+            assert response == exp_response
+        # invalid requests get an error response instead of a closed connection
+        response = daemon.request(SOCKET_PATH, {})
+        assert response["exit_code"] == 2
+        assert response["stderr"].startswith("Invalid request: Request must have")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(io_utils.get_abs_path(SOCKET_PATH))
+            conn.sendall(b"not json\n")
+            response = daemon.receive_message(conn)
+        assert response["exit_code"] == 2
+        assert response["stderr"].startswith("Invalid request: JSONDecodeError")
+        assert daemon.stop(SOCKET_PATH)
+        assert process.wait(timeout=10) == 0
+    finally:
+        process.kill()
+        process.stdout.close()
+    assert not os.path.exists(io_utils.get_abs_path(SOCKET_PATH))
+    io_utils.delete_dir(DIR)
@@ -0,0 +1,174 @@
+"""The 'query' subcommand: filters, ranks, and pivots runs in a results database.
+
+Run with: python -m rent_buy_invest query <results-db> [options]
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import os
+from typing import TYPE_CHECKING
+
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.io.results_store import RUN_COLUMN_TYPES, RUN_COLUMNS, ResultsStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def _parse_filter(
+    filter_str: str,
+) -> tuple[str, tuple[float | str | None, float | str | None]]:
+    """Parses '<column>=<min>:<max>' (either bound may be empty) or '<column>=<value>'.
+
+    Bounds of numeric columns are numbers; bounds of text columns (e.g.,
+    start_date, as 'YYYY-MM-DD') are compared as strings.
+
+    Examples:
+    >>> _parse_filter("sale_price=400000:600000")
+    ('sale_price', (400000.0, 600000.0))
+    >>> _parse_filter("monthly_rent=:2500")
+    ('monthly_rent', (None, 2500.0))
+    >>> _parse_filter("num_years=30")
+    ('num_years', (30.0, 30.0))
+    >>> _parse_filter("start_date=2025-01-01:")
+    ('start_date', ('2025-01-01', None))
+    """
+    column, sep, bounds = filter_str.partition("=")
+    if not sep or not column:
+        raise argparse.ArgumentTypeError(
+            f"Filters must look like '<column>=<min>:<max>'; received '{filter_str}'"
+        )
+    if column not in RUN_COLUMNS:
+        raise argparse.ArgumentTypeError(_get_unknown_column_message(column))
+    low, sep, high = bounds.partition(":")
+    if not sep:
+        high = low
+    if RUN_COLUMN_TYPES[column] == "TEXT":
+        if column == "start_date":
+            try:
+                for bound in filter(None, (low, high)):
+                    datetime.date.fromisoformat(bound)
+            except ValueError:
+                raise argparse.ArgumentTypeError(
+                    f"start_date bounds must be 'YYYY-MM-DD' dates; received '{filter_str}'"
+                ) from None
+        return column, (low if low else None, high if high else None)
+    try:
+        return column, (
+            float(low) if low else None,
+            float(high) if high else None,
+        )
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Bounds of {column} must be numbers; received '{filter_str}'"
+        ) from None
+
+
+def _get_unknown_column_message(column: str) -> str:
+    return f"Unknown column '{column}'; valid columns are: {', '.join(RUN_COLUMNS)}"
+
+
+def _get_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="rent_buy_invest query",
+        description="Filters, ranks, and pivots runs stored in a results database (see --results-db) without recomputing anything.",
+        epilog=f"Columns: {', '.join(RUN_COLUMNS)}",
+    )
+    parser.add_argument(
+        "results_db",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) to the SQLite results database.",
+    )
+    parser.add_argument(
+        "--where",
+        type=_parse_filter,
+        action="append",
+        default=[],
+        metavar="COLUMN=MIN:MAX",
+        help="Only include runs with MIN <= COLUMN <= MAX; either bound may be omitted, and COLUMN=VALUE matches a single value. May be repeated.",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        help="Only show the top N runs.",
+    )
+    parser.add_argument(
+        "--order-by",
+        type=str,
+        default="wealth_difference",
+        help="Column to rank runs by, in descending order; defaults to 'wealth_difference' (wealth if buying minus wealth if renting).",
+    )
+    parser.add_argument(
+        "--ascending",
+        action="store_true",
+        help="Rank in ascending order instead.",
+    )
+    parser.add_argument(
+        "--columns",
+        type=str,
+        nargs="+",
+        help="Columns to show.",
+    )
+    parser.add_argument(
+        "--pivot",
+        type=str,
+        nargs=2,
+        metavar=("INDEX", "COLUMNS"),
+        help="Instead of listing runs, show the average of --value over a grid of INDEX x COLUMNS (e.g., 'sale_price monthly_rent').",
+    )
+    parser.add_argument(
+        "--value",
+        type=str,
+        default="wealth_difference",
+        help="Column aggregated in the --pivot grid; defaults to 'wealth_difference'.",
+    )
+    parser.add_argument(
+        "--csv",
+        action="store_true",
+        help="Print csv instead of a table.",
+    )
+    args = parser.parse_args(argv)
+    for column in [
+        args.order_by,
+        args.value,
+        *(args.columns or []),
+        *(args.pivot or []),
+    ]:
+        if column not in RUN_COLUMNS:
+            parser.error(_get_unknown_column_message(column))
+    return args
+
+
+def query(args: argparse.Namespace) -> pd.DataFrame:
+    """Returns the runs or pivot grid requested by the parsed args."""
+    assert os.path.isfile(
+        io_utils.get_abs_path(args.results_db)
+    ), f"Results database '{args.results_db}' does not exist"
+    filters = dict(args.where)
+    with ResultsStore(args.results_db) as results_store:
+        if args.pivot:
+            return results_store.get_pivot(
+                *args.pivot, values=args.value, filters=filters
+            )
+        return results_store.query_runs(
+            filters=filters,
+            columns=args.columns,
+            order_by=args.order_by,
+            descending=not args.ascending,
+            limit=args.top,
+        )
+
+
+def main(argv: list[str]) -> None:
+    """Entrypoint of the 'query' subcommand.
+
+    Args:
+        argv: Command line arguments after 'query'
+    """
+    args = _get_args(argv)
+    df = query(args)
+    if args.csv:
+        print(df.to_csv(index=bool(args.pivot)), end="")
+    else:
+        print(df.to_string(index=bool(args.pivot)))
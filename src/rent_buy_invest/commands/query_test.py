@@ -0,0 +1,84 @@
+import argparse
+
+import pytest
+
+from rent_buy_invest.commands import query
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.io.results_store import ResultsStore
+from rent_buy_invest.io.results_store_test import write_sweep
+
+DIR = "rent_buy_invest/temp/test_query"
+DB_PATH = f"{DIR}/results.sqlite"
+
+
+def test_parse_filter() -> None:
+    assert query._parse_filter("sale_price=1:2") == ("sale_price", (1.0, 2.0))
+    assert query._parse_filter("sale_price=1:") == ("sale_price", (1.0, None))
+    assert query._parse_filter("sale_price=:2") == ("sale_price", (None, 2.0))
+    assert query._parse_filter("sale_price=3") == ("sale_price", (3.0, 3.0))
+    with pytest.raises(argparse.ArgumentTypeError):
+        query._parse_filter("sale_price")
+    with pytest.raises(argparse.ArgumentTypeError):
+        query._parse_filter("sale_price=a:b")
+    # text columns
+    assert query._parse_filter("start_date=2025-01-01:2030-06-30") == (
+        "start_date",
+        ("2025-01-01", "2030-06-30"),
+    )
+    assert query._parse_filter("experiment_name=sweep") == (
+        "experiment_name",
+        ("sweep", "sweep"),
+    )
+    with pytest.raises(argparse.ArgumentTypeError, match="YYYY-MM-DD"):
+        query._parse_filter("start_date=2025:2030")
+    with pytest.raises(argparse.ArgumentTypeError, match="valid columns"):
+        query._parse_filter("sale_prices=1:2")
+
+
+def test_main(capsys: pytest.CaptureFixture) -> None:
+    write_sweep(DB_PATH)
+    with ResultsStore(DB_PATH) as results_store:
+        exp_top = results_store.query_runs(
+            filters={"monthly_rent": (None, 2500)},
+            columns=["id", "sale_price"],
+            limit=2,
+        )
+        exp_pivot = results_store.get_pivot("sale_price", "monthly_rent")
+
+    query.main(
+        [
+            DB_PATH,
+            "--where",
+            "monthly_rent=:2500",
+            "--top",
+            "2",
+            "--columns",
+            "id",
+            "sale_price",
+            "--csv",
+        ]
+    )
+    assert capsys.readouterr().out == exp_top.to_csv(index=False)
+
+    query.main([DB_PATH, "--pivot", "sale_price", "monthly_rent"])
+    assert capsys.readouterr().out == exp_pivot.to_string() + "\n"
+
+    # start_date is filtered as a date
+    query.main([DB_PATH, "--where", "start_date=2025-01-01", "--csv"])
+    assert len(capsys.readouterr().out.splitlines()) == 1 + 6
+    query.main([DB_PATH, "--where", "start_date=2025-01-02:", "--csv"])
+    assert len(capsys.readouterr().out.splitlines()) == 1
+
+    # unknown columns are usage errors
+    for argv in (
+        ["--where", "sale_prices=1:2"],
+        ["--order-by", "sale_prices"],
+        ["--pivot", "sale_price", "monthly_rents"],
+    ):
+        with pytest.raises(SystemExit):
+            query.main([DB_PATH, *argv])
+        assert "valid columns are" in capsys.readouterr().err
+
+    io_utils.delete_dir(DIR)
+    with pytest.raises(AssertionError):
+        query.main([DB_PATH])
@@ -0,0 +1,393 @@
+"""The 'serve' subcommand: evaluates experiments sent as JSON over HTTP.
+
+Run with: python -m rent_buy_invest serve [--host HOST] [--port PORT] [options]
+
+Endpoints:
+    GET /health: Returns {"status": "ok"}
+    POST /evaluate: Evaluates one experiment. The body is a JSON object with:
+        experiment_config: Experiment config as accepted by ExperimentConfig.from_dict,
+            i.e., like the yaml file, except that each sub-config can be given by
+            contents (e.g., 'market_config') instead of by path (e.g.,
+            'market_config_path'), and start_date is a 'YYYY-MM-DD' string. Paths
+            must be project paths of files inside the rent_buy_invest package, so
+            that clients cannot make the server read other files
+        include_projection (optional): Whether to also return the monthly
+            projection; defaults to false
+        timeout (optional): Deadline in seconds; defaults to --timeout and is
+            capped by --max-timeout
+      and the response is a JSON object with 'initial_state', 'final_state', and,
+      if requested, 'projection' ({"months": [...], "columns": {"<Buy|Rent>:
+      <column>": [...]}}). Errors are returned as {"error": "..."} with status 400
+      (invalid request or config), 503 (too many concurrent requests until the
+      deadline), 504 (deadline exceeded), or 500.
+
+Calculations run on a process pool, so they neither block the server nor share the
+GIL. At most --max-concurrency requests are calculated (or waiting for a worker) at
+once; other requests wait for a slot until their deadline. Validated sub-configs
+sent by contents are cached by contents, so, e.g., a large market config with tax
+brackets shared by many requests is only validated once.
+"""
+import argparse
+import dataclasses
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+import jsonschema
+
+from rent_buy_invest.configs.config import Config
+from rent_buy_invest.configs.experiment_config import (
+    SUB_CONFIG_CLASSES,
+    ExperimentConfig,
+)
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.utils import hash_utils
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_NUM_WORKERS = 2
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_MAX_TIMEOUT_SECONDS = 60.0
+MAX_REQUEST_BYTES = 1024 * 1024
+# errors raised when constructing a config from invalid contents (or from a path
+# to a missing sub-config file)
+CONFIG_ERRORS = (
+    jsonschema.ValidationError,
+    AssertionError,
+    KeyError,
+    TypeError,
+    ValueError,
+    OSError,
+)
+
+
+class RequestError(Exception):
+    """Error returned to the client with the given HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status: HTTPStatus = status
+
+
+def evaluate(experiment_config: ExperimentConfig, include_projection: bool) -> dict:
+    """Evaluates an experiment and returns the JSON response; runs on the pool."""
+    (
+        initial_state,
+        projection_cols,
+        months,
+        final_state,
+    ) = ExperimentResult.calculate_cols(experiment_config)
+    response = {
+        "initial_state": dataclasses.asdict(initial_state),
+        "final_state": dataclasses.asdict(final_state),
+    }
+    if include_projection:
+        response["projection"] = {"months": months, "columns": projection_cols}
+    return response
+
+
+class SubConfigCache:
+    """Thread-safe LRU cache of validated sub-configs, keyed by their contents."""
+
+    DEFAULT_MAX_ENTRIES: int = 256
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        assert max_entries > 0, "max_entries must be positive"
+        self.max_entries: int = max_entries
+        self._entries: OrderedDict[tuple[type[Config], str], Config] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, clz: type[Config], config_dict: dict[str, Any]) -> Config:
+        """Returns the config of the given class with the given contents.
+
+        NOTE: the config is shared by every request with the same contents, so it
+        must not be modified.
+
+        Raises:
+            jsonschema.ValidationError, AssertionError: If the contents are invalid
+        """
+        key = (clz, hash_utils.get_hash(clz.__name__, config_dict))
+        with self._lock:
+            config = self._entries.get(key)
+            if config is not None:
+                self._entries.move_to_end(key)
+                return config
+        # validate outside the lock; concurrent misses may validate the same
+        # contents twice, which is harmless
+        config = clz.from_dict(config_dict)
+        with self._lock:
+            self._entries[key] = config
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return config
+
+    def get_experiment_config(self, config_dict: dict[str, Any]) -> ExperimentConfig:
+        """Returns ExperimentConfig.from_dict(config_dict), with the sub-configs
+        given by contents taken from this cache.
+
+        Raises:
+            CONFIG_ERRORS: If the config is invalid
+        """
+        config_dict = dict(config_dict)
+        for name, clz in SUB_CONFIG_CLASSES.items():
+            if isinstance(config_dict.get(name), dict):
+                config_dict[name] = self.get(clz, config_dict[name])
+        return ExperimentConfig.from_dict(config_dict)
+
+
+def _is_package_path(path: Any) -> bool:
+    """Returns whether path is a project path of a file inside the rent_buy_invest
+    package (after resolving '..' and symlinks)."""
+    if not isinstance(path, str) or os.path.isabs(path):
+        return False
+    try:
+        abs_path = io_utils.get_abs_path(path)
+    except ValueError:
+        return False
+    package_dir = os.path.realpath(io_utils.get_abs_path("rent_buy_invest"))
+    return os.path.commonpath([package_dir, os.path.realpath(abs_path)]) == package_dir
+
+
+class EvaluationServer(ThreadingHTTPServer):
+    """HTTP server which evaluates experiments on a process pool.
+
+    Attributes:
+        executor (ProcessPoolExecutor): Pool running the calculations
+        semaphore (threading.BoundedSemaphore): Slots for concurrent calculations
+        sub_config_cache (SubConfigCache): Validated sub-configs sent by contents
+        timeout (float): Default deadline of a request in seconds
+        max_timeout (float): Maximum deadline of a request in seconds
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address: tuple[str, int],
+        num_workers: int = DEFAULT_NUM_WORKERS,
+        max_concurrency: int | None = None,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        max_timeout: float = DEFAULT_MAX_TIMEOUT_SECONDS,
+    ) -> None:
+        """Initializes the server; call serve_forever() to start serving.
+
+        Args:
+            server_address: (host, port); port 0 picks a free port
+            num_workers: Number of worker processes
+            max_concurrency: Maximum number of requests calculated (or waiting for a
+                worker) at once; defaults to twice num_workers
+            timeout: Default deadline of a request in seconds
+            max_timeout: Maximum deadline of a request in seconds
+        """
+        assert num_workers > 0, "num_workers must be positive"
+        assert 0 < timeout <= max_timeout, "timeout must be in (0, max_timeout]"
+        max_concurrency = max_concurrency or 2 * num_workers
+        assert max_concurrency > 0, "max_concurrency must be positive"
+        super().__init__(server_address, _RequestHandler)
+        self.executor: ProcessPoolExecutor = ProcessPoolExecutor(num_workers)
+        self.semaphore: threading.BoundedSemaphore = threading.BoundedSemaphore(
+            max_concurrency
+        )
+        self.sub_config_cache: SubConfigCache = SubConfigCache()
+        self.timeout: float = timeout
+        self.max_timeout: float = max_timeout
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_experiment_config(self, config_dict: Any) -> ExperimentConfig:
+        if not isinstance(config_dict, dict):
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, "'experiment_config' must be an object"
+            )
+        for name in SUB_CONFIG_CLASSES:
+            path = config_dict.get(f"{name}_path")
+            if path is not None and not _is_package_path(path):
+                raise RequestError(
+                    HTTPStatus.BAD_REQUEST,
+                    f"'{name}_path' must be a path inside the rent_buy_invest "
+                    f"package (starting with 'rent_buy_invest/'); send '{name}' "
+                    "by contents instead",
+                )
+        return self.sub_config_cache.get_experiment_config(config_dict)
+
+    def _get_timeout(self, timeout: Any) -> float:
+        if timeout is None:
+            return self.timeout
+        if (
+            isinstance(timeout, bool)
+            or not isinstance(timeout, (int, float))
+            or not timeout > 0
+        ):
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, "'timeout' must be a positive number"
+            )
+        return min(timeout, self.max_timeout)
+
+    def handle_evaluate(self, request: Any) -> dict:
+        """Returns the response to a POST /evaluate request.
+
+        Raises:
+            RequestError: If the request fails
+        """
+        start = time.monotonic()
+        if not isinstance(request, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, "Request must be an object")
+        deadline = start + self._get_timeout(request.get("timeout"))
+        try:
+            experiment_config = self._get_experiment_config(
+                request.get("experiment_config")
+            )
+        except CONFIG_ERRORS as e:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST,
+                f"Invalid experiment config: {type(e).__name__}: {e}",
+            ) from None
+
+        if not self.semaphore.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            raise RequestError(
+                HTTPStatus.SERVICE_UNAVAILABLE, "Too many concurrent requests"
+            )
+        try:
+            future: Future = self.executor.submit(
+                evaluate, experiment_config, bool(request.get("include_projection"))
+            )
+        except BaseException:
+            self.semaphore.release()
+            raise
+        # the slot is freed when the calculation finishes (or is cancelled), not
+        # when the request times out, so the number of calculations stays bounded
+        future.add_done_callback(lambda _: self.semaphore.release())
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeoutError:
+            future.cancel()
+            raise RequestError(
+                HTTPStatus.GATEWAY_TIMEOUT, "Deadline exceeded"
+            ) from None
+        except AssertionError as e:
+            raise RequestError(
+                HTTPStatus.BAD_REQUEST, f"Invalid experiment: AssertionError: {e}"
+            ) from None
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: EvaluationServer
+
+    def _send_json(self, status: HTTPStatus, obj: Any) -> None:
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(HTTPStatus.OK, {"status": "ok"})
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+
+    def do_POST(self) -> None:
+        if self.path != "/evaluate":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+            return
+        try:
+            num_bytes = int(self.headers.get("Content-Length", 0))
+            if num_bytes > MAX_REQUEST_BYTES:
+                raise RequestError(
+                    HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+                    f"Request must be at most {MAX_REQUEST_BYTES} bytes",
+                )
+            try:
+                request = json.loads(self.rfile.read(num_bytes))
+            except ValueError:
+                raise RequestError(
+                    HTTPStatus.BAD_REQUEST, "Request must be valid JSON"
+                ) from None
+            self._send_json(HTTPStatus.OK, self.server.handle_evaluate(request))
+        except RequestError as e:
+            self._send_json(e.status, {"error": str(e)})
+        except Exception as e:
+            self.log_error("Error evaluating request: %r", e)
+            self._send_json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"}
+            )
+
+
+def _get_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="rent_buy_invest serve",
+        description="Serves experiment evaluations over HTTP: POST an experiment config as JSON to /evaluate. See commands/serve.py for the request and response formats.",
+    )
+    parser.add_argument(
+        "--host",
+        type=str,
+        default=DEFAULT_HOST,
+        help=f"Host to listen on; defaults to '{DEFAULT_HOST}' (local only).",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_PORT,
+        help=f"Port to listen on; defaults to {DEFAULT_PORT}.",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        default=DEFAULT_NUM_WORKERS,
+        help=f"Number of worker processes; defaults to {DEFAULT_NUM_WORKERS}.",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Maximum number of requests calculated at once; others wait until their deadline. Defaults to twice --num-workers.",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT_SECONDS,
+        help=f"Default deadline of a request in seconds; defaults to {DEFAULT_TIMEOUT_SECONDS}.",
+    )
+    parser.add_argument(
+        "--max-timeout",
+        type=float,
+        default=DEFAULT_MAX_TIMEOUT_SECONDS,
+        help=f"Maximum deadline a request may ask for in seconds; defaults to {DEFAULT_MAX_TIMEOUT_SECONDS}.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> None:
+    """Entrypoint of the 'serve' subcommand.
+
+    Args:
+        argv: Command line arguments after 'serve'
+    """
+    args = _get_args(argv)
+    with EvaluationServer(
+        (args.host, args.port),
+        num_workers=args.num_workers,
+        max_concurrency=args.max_concurrency,
+        timeout=args.timeout,
+        max_timeout=args.max_timeout,
+    ) as server:
+        host, port = server.server_address[:2]
+        print(f"Serving on http://{host}:{port}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
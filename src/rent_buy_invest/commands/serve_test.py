@@ -0,0 +1,171 @@
+import dataclasses
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+
+import pytest
+
+from rent_buy_invest.commands import serve
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.utils import hash_utils
+
+EXPERIMENT_CONFIG_PATH = (
+    "rent_buy_invest/core/test_resources/test-experiment-config.yaml"
+)
+
+
+@pytest.fixture(scope="module")
+def server() -> Iterator[serve.EvaluationServer]:
+    with serve.EvaluationServer(
+        ("127.0.0.1", 0), num_workers=1, max_concurrency=1
+    ) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        thread.join()
+
+
+@pytest.fixture(scope="module")
+def experiment_config() -> ExperimentConfig:
+    return ExperimentConfig.parse(EXPERIMENT_CONFIG_PATH)
+
+
+def _get_request(experiment_config: ExperimentConfig, **kwargs) -> dict:
+    # sub-configs by contents, as JSON
+    return {
+        "experiment_config": json.loads(
+            hash_utils.to_canonical_json(experiment_config.to_dict())
+        ),
+        **kwargs,
+    }
+
+
+def _post(server: serve.EvaluationServer, body: bytes) -> tuple[int, dict]:
+    host, port = server.server_address[:2]
+    request = urllib.request.Request(
+        f"http://{host}:{port}/evaluate", data=body, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_health(server: serve.EvaluationServer) -> None:
+    host, port = server.server_address[:2]
+    with urllib.request.urlopen(f"http://{host}:{port}/health") as response:
+        assert json.loads(response.read()) == {"status": "ok"}
+
+
+def test_evaluate(
+    server: serve.EvaluationServer, experiment_config: ExperimentConfig
+) -> None:
+    exp_result = ExperimentResult.from_config(experiment_config)
+    status, response = _post(
+        server, json.dumps(_get_request(experiment_config)).encode()
+    )
+    assert status == 200
+    assert response == {
+        "initial_state": dataclasses.asdict(exp_result.initial_state),
+        "final_state": dataclasses.asdict(exp_result.final_state),
+    }
+    assert len(server.sub_config_cache) == 4
+
+    # sub-configs by path, with the projection
+    config_dict = {
+        **json.loads(
+            hash_utils.to_canonical_json(
+                {"num_years": 2, "start_date": experiment_config.start_date}
+            )
+        ),
+        **{
+            name: value
+            for name, value in io_utils.read_yaml(EXPERIMENT_CONFIG_PATH).items()
+            if name.endswith("_path")
+        },
+    }
+    status, response = _post(
+        server,
+        json.dumps(
+            {"experiment_config": config_dict, "include_projection": True}
+        ).encode(),
+    )
+    assert status == 200
+    projection = ExperimentResult.from_config(
+        experiment_config.with_overrides(num_years=2)
+    ).projection
+    assert response["projection"]["months"] == [str(m) for m in projection.index]
+    assert response["projection"]["columns"]["Buy: Home Value"] == list(
+        projection[("Buy", "Home Value")]
+    )
+
+
+def test_evaluate_errors(
+    server: serve.EvaluationServer, experiment_config: ExperimentConfig
+) -> None:
+    status, response = _post(server, b"not json")
+    assert status == 400
+    assert "JSON" in response["error"]
+
+    request = _get_request(experiment_config)
+    request["experiment_config"]["num_years"] = -1
+    status, response = _post(server, json.dumps(request).encode())
+    assert status == 400
+    assert "Invalid experiment config" in response["error"]
+
+    status, _ = _post(
+        server, json.dumps(_get_request(experiment_config, timeout="1")).encode()
+    )
+    assert status == 400
+
+    # sub-configs by path are only read from inside the package
+    abs_path = io_utils.get_abs_path(
+        io_utils.read_yaml(EXPERIMENT_CONFIG_PATH)["market_config_path"]
+    )
+    for path in (
+        abs_path,
+        "/etc/passwd",
+        "rent_buy_invest/../../../etc/passwd",
+        "etc/passwd",
+    ):
+        request = _get_request(experiment_config)
+        del request["experiment_config"]["market_config"]
+        request["experiment_config"]["market_config_path"] = path
+        status, response = _post(server, json.dumps(request).encode())
+        assert status == 400
+        assert "'market_config_path' must be a path inside" in response["error"]
+    # missing file
+    request["experiment_config"]["market_config_path"] = "rent_buy_invest/missing.yaml"
+    status, response = _post(server, json.dumps(request).encode())
+    assert status == 400
+    assert "Invalid experiment config: FileNotFoundError" in response["error"]
+
+    # all slots are taken until the deadline
+    server.semaphore.acquire()
+    try:
+        status, response = _post(
+            server,
+            json.dumps(_get_request(experiment_config, timeout=0.01)).encode(),
+        )
+    finally:
+        server.semaphore.release()
+    assert status == 503
+
+
+def test_evaluate_deadline(
+    server: serve.EvaluationServer, experiment_config: ExperimentConfig
+) -> None:
+    # wait for earlier calculations to free their slot
+    with server.semaphore:
+        pass
+    status, response = _post(
+        server, json.dumps(_get_request(experiment_config, timeout=1e-6)).encode()
+    )
+    assert status == 504
+    assert response == {"error": "Deadline exceeded"}
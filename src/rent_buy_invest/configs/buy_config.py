@@ -253,6 +253,12 @@ class BuyConfig(Config):
             self.rental_income_config = None
         self._validate()
 
+    def to_dict(self) -> dict[str, Any]:
+        config_dict = dict(vars(self))
+        if self.rental_income_config:
+            config_dict["rental_income_config"] = dict(vars(self.rental_income_config))
+        return config_dict
+
     def _validate(self) -> None:
         """Sanity checks the configs.
 
@@ -634,7 +640,8 @@ class BuyConfig(Config):
         if self.rental_income_config:
             return self.rental_income_config.get_monthly_rental_incomes(num_months)
         else:
-            return [0 for _ in range(num_months)]
+            # num_months + 1 values, like with a rental income config
+            return [0 for _ in range(num_months + 1)]
 
     def get_deductible_selling_costs(self, sale_price: float) -> float:
         return (
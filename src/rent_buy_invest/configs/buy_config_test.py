@@ -84,6 +84,12 @@ class TestBuyConfig(TestConfig):
             BuyConfig, attributes, nullable_attributes
         )
 
+    def test_freeze(self) -> None:
+        self._test_freeze(BuyConfig, "sale_price", 400000.0)
+
+    def test_from_dict_and_with_overrides(self) -> None:
+        self._test_from_dict_and_with_overrides(BuyConfig, "sale_price", 400000.0, -1.0)
+
     def test_invalid_inputs(self) -> None:
         config_kwargs = io_utils.read_yaml(TestBuyConfig.TEST_CONFIG_PATH)
         test_buy_config = BuyConfig(**config_kwargs)
@@ -682,6 +688,12 @@ class TestBuyConfig(TestConfig):
         )
         assert actual == pytest.approx(expected)
 
+        # no rental income
+        buy_config_copy.rental_income_config = None
+        assert buy_config_copy.get_monthly_rental_incomes(num_months) == [
+            0 for _ in range(num_months + 1)
+        ]
+
     def test_get_deductible_selling_costs(self) -> None:
         sale_price = 600000  # arbitrary
         actual = TestBuyConfig.BUY_CONFIG.get_deductible_selling_costs(sale_price)
@@ -1,9 +1,63 @@
-from abc import ABC, abstractmethod
+from __future__ import annotations
 
-import jsonschema
+import copy
+import hashlib
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
 
+from rent_buy_invest.configs.frozen_config import FrozenConfig
 from rent_buy_invest.io import io_utils
 
+# jsonschema is slow to import, so it is only imported once a schema is validated
+if TYPE_CHECKING:
+    import jsonschema
+
+# schema path -> parsed schema
+_SCHEMAS: dict[str, dict[str, Any]] = {}
+# (schema path, part of the schema) -> compiled validator; see _get_validator
+_VALIDATORS: dict[tuple, jsonschema.protocols.Validator] = {}
+# (config class, absolute path) -> (sha256 of file contents, parsed config); see parse
+_PARSED_CONFIGS: dict[tuple[type, str], tuple[str, "Config"]] = {}
+
+
+def clear_caches() -> None:
+    """Clears the parsed config, schema and validator caches."""
+    _SCHEMAS.clear()
+    _VALIDATORS.clear()
+    _PARSED_CONFIGS.clear()
+
+
+def _get_validator(
+    key: tuple, schema: dict[str, Any]
+) -> jsonschema.protocols.Validator:
+    """Returns a validator for the schema, compiling it only the first time for the key.
+
+    The schema itself is not checked against its metaschema here, since that is
+    much more expensive than validating a (small) config and would be repeated
+    by every process; the schema files are checked by config_test.py instead.
+    """
+    validator = _VALIDATORS.get(key)
+    if validator is None:
+        import jsonschema
+
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator = validator_class(schema)
+        _VALIDATORS[key] = validator
+    return validator
+
+
+def _validate(validator: jsonschema.protocols.Validator, instance: Any) -> None:
+    """Same as jsonschema.validate, but with an already compiled validator.
+
+    Raises:
+        jsonschema.ValidationError: If the instance is invalid
+    """
+    import jsonschema
+
+    error = jsonschema.exceptions.best_match(validator.iter_errors(instance))
+    if error is not None:
+        raise error
+
 
 class Config(ABC):
     """Abstract config class."""
@@ -18,21 +72,140 @@ class Config(ABC):
         pass
 
     @classmethod
-    def parse(cls, project_path: str) -> "Config":
+    def parse(cls, project_path: str, use_cache: bool = True) -> "Config":
         """Returns object with type equal to the calling class using arguments
         provided in the yaml file with the given path.
 
+        Parsed and validated configs are cached by path and hash of the file
+        contents, so parsing an unchanged file again (e.g., a market config shared
+        by many experiment configs) only reads and hashes it. Editing the file
+        invalidates its entry. Each call returns a new copy, so callers can modify
+        the result without affecting the cache.
+
         Args:
             project_path (str): Path (from the 'rent_buy_invest' directory) to yaml file
+            use_cache (bool): If False, neither read from nor write to the cache
 
         Returns:
             cls: Object with type equal to the calling class (whicch will be a
                 descendent of this class)
         """
-        config_schema = io_utils.read_json(cls.schema_path())
-        config_kwargs = io_utils.read_yaml(project_path)
-        jsonschema.validate(instance=config_kwargs, schema=config_schema)
-        return cls(**config_kwargs)
+        content = io_utils.read_bytes(project_path)
+        key = (cls, io_utils.get_abs_path(project_path))
+        digest = hashlib.sha256(content).hexdigest()
+        if use_cache:
+            cached = _PARSED_CONFIGS.get(key)
+            if cached is not None and cached[0] == digest:
+                return copy.deepcopy(cached[1])
+        config = cls.from_dict(io_utils.load_yaml(content))
+        if use_cache:
+            _PARSED_CONFIGS[key] = (digest, copy.deepcopy(config))
+        return config
+
+    @classmethod
+    def from_dict(
+        cls, config_dict: dict[str, Any], validate_schema: bool = True
+    ) -> "Config":
+        """Returns object with type equal to the calling class using arguments
+        provided in the given dict, without reading a yaml file.
+
+        This is the fast path for configs generated in code (e.g., sweeps).
+
+        Args:
+            config_dict: Same contents as the yaml file would have (equivalently,
+                the output of to_dict())
+            validate_schema: If False, skip jsonschema validation. Only do this
+                for trusted in-process inputs (e.g., the output of to_dict() or
+                FrozenConfig.to_dict()). The config is sanity checked with
+                _validate either way.
+
+        Returns:
+            cls: Object with type equal to the calling class
+        """
+        if validate_schema:
+            cls._validate_schema(config_dict)
+        return cls(**config_dict)
+
+    @classmethod
+    def _get_schema(cls) -> dict[str, Any]:
+        """Returns the (parsed) json schema of the calling class."""
+        schema_path = cls.schema_path()
+        if schema_path not in _SCHEMAS:
+            _SCHEMAS[schema_path] = io_utils.read_json(schema_path)
+        return _SCHEMAS[schema_path]
+
+    @classmethod
+    def _validate_schema(
+        cls, config_dict: dict[str, Any], required: tuple[str, ...] | None = None
+    ) -> None:
+        """Validates config_dict against the json schema of the calling class.
+
+        Args:
+            config_dict: Config contents to validate
+            required: If given, overrides the schema's list of required fields
+
+        Raises:
+            jsonschema.ValidationError: If config_dict does not match the schema
+        """
+        schema = cls._get_schema()
+        if required is not None:
+            schema = {**schema, "required": list(required)}
+        validator = _get_validator((cls.schema_path(), required), schema)
+        _validate(validator, config_dict)
+
+    @classmethod
+    def _validate_fields_schema(cls, fields: dict[str, Any]) -> None:
+        """Validates only the given top-level fields against their part of the schema.
+
+        Fields that are not described by the schema are not checked.
+
+        Raises:
+            jsonschema.ValidationError: If any field does not match its schema
+        """
+        properties = cls._get_schema()["properties"]
+        for name, value in fields.items():
+            if name in properties:
+                validator = _get_validator(
+                    (cls.schema_path(), "properties", name), properties[name]
+                )
+                _validate(validator, value)
+
+    def with_overrides(self, **overrides: Any) -> "Config":
+        """Returns a new config equal to this one except for the given fields.
+
+        Only the overridden fields are validated against the schema; the other
+        fields were already validated when this config was constructed. The new
+        config is still sanity checked as a whole with _validate since some of its
+        rules relate several fields (e.g., a maximum as a fraction of another
+        field). Nothing is read from disk.
+
+        Raises:
+            AssertionError: If an override is not an existing field, or if the new
+                config is invalid
+            jsonschema.ValidationError: If an override does not match the schema
+        """
+        config_dict = self.to_dict()
+        for name in overrides:
+            assert name in config_dict, f"{type(self).__name__} has no field '{name}'"
+        self._validate_fields_schema(overrides)
+        config_dict.update(overrides)
+        return type(self).from_dict(config_dict, validate_schema=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the kwargs with which an equal config can be constructed.
+
+        Subclasses whose attributes differ from their constructor kwargs must
+        override this.
+        """
+        return dict(vars(self))
+
+    def freeze(self) -> FrozenConfig:
+        """Returns an immutable, hashable snapshot of this config."""
+        return FrozenConfig(type(self), self.to_dict())
+
+    def fingerprint(self) -> str:
+        """Returns a deterministic hex digest of the contents of this config."""
+        return self.freeze().fingerprint()
 
     def _validate_max_value(self, attr_name: str, max_value: float) -> None:
         attr_val = getattr(self, attr_name)
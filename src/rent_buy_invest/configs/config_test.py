@@ -1,3 +1,4 @@
+import pickle
 from collections.abc import Collection, Sequence
 from copy import deepcopy
 
@@ -8,6 +9,15 @@ from rent_buy_invest.configs.config import Config
 from rent_buy_invest.io import io_utils
 
 
+def test_schemas() -> None:
+    # schemas aren't checked against the metaschema at runtime (see _get_validator)
+    for project_path in io_utils.glob_project_paths(
+        "rent_buy_invest/configs/schemas/*.json"
+    ):
+        schema = io_utils.read_json(project_path)
+        jsonschema.validators.validator_for(schema).check_schema(schema)
+
+
 class TestConfig:
     # override this in subclasses
     TEST_CONFIG_PATH = ""
@@ -55,3 +65,66 @@ class TestConfig:
                 clz.parse(project_path)
 
         io_utils.delete_dir(dir)
+
+    def _test_freeze(self, clz, field_to_replace: str, replacement_value) -> None:
+        config = clz.parse(self.TEST_CONFIG_PATH)
+        frozen_config = config.freeze()
+        assert frozen_config.config_class is clz
+        # round trip
+        assert config.to_dict() == frozen_config.to_dict()
+        assert frozen_config.thaw().to_dict() == config.to_dict()
+        assert frozen_config.thaw().freeze() == frozen_config
+        assert pickle.loads(pickle.dumps(frozen_config)) == frozen_config
+
+        # immutable and hashable
+        with pytest.raises(AttributeError):
+            setattr(frozen_config, field_to_replace, replacement_value)
+        assert hash(frozen_config) == hash(clz.parse(self.TEST_CONFIG_PATH).freeze())
+
+        # fingerprint is deterministic and depends on contents
+        fingerprint = config.fingerprint()
+        assert fingerprint == frozen_config.fingerprint()
+        assert fingerprint == clz.parse(self.TEST_CONFIG_PATH).fingerprint()
+        replaced = frozen_config.replace(**{field_to_replace: replacement_value})
+        assert getattr(replaced, field_to_replace) == replacement_value
+        assert replaced.fingerprint() != fingerprint
+        assert replaced != frozen_config
+        assert getattr(replaced.thaw(), field_to_replace) == replacement_value
+        # original is unchanged
+        assert frozen_config.fingerprint() == fingerprint
+        with pytest.raises(AssertionError):
+            frozen_config.replace(nonexistent_field=0)
+
+    def _test_from_dict_and_with_overrides(
+        self, clz, field_to_override: str, valid_value, invalid_value
+    ) -> None:
+        config = clz.parse(self.TEST_CONFIG_PATH)
+        config_dict = config.to_dict()
+        for validate_schema in (True, False):
+            act = clz.from_dict(config_dict, validate_schema=validate_schema)
+            assert act.fingerprint() == config.fingerprint()
+        # schema validation can be skipped, but the fields are still sanity checked
+        invalid_schema_config_dict = {**config_dict, field_to_override: "string"}
+        with pytest.raises(jsonschema.ValidationError):
+            clz.from_dict(invalid_schema_config_dict)
+        with pytest.raises(AssertionError):
+            clz.from_dict(
+                {**config_dict, field_to_override: invalid_value},
+                validate_schema=False,
+            )
+
+        overridden = config.with_overrides(**{field_to_override: valid_value})
+        assert getattr(overridden, field_to_override) == valid_value
+        assert getattr(config, field_to_override) != valid_value
+        assert (
+            overridden.fingerprint()
+            == clz.from_dict(
+                {**config_dict, field_to_override: valid_value}
+            ).fingerprint()
+        )
+        with pytest.raises(jsonschema.ValidationError):
+            config.with_overrides(**{field_to_override: "string"})
+        with pytest.raises(AssertionError):
+            config.with_overrides(**{field_to_override: invalid_value})
+        with pytest.raises(AssertionError):
+            config.with_overrides(nonexistent_field=0)
@@ -1,10 +1,20 @@
 import datetime
+from typing import Any
 
 from rent_buy_invest.configs.buy_config import BuyConfig
 from rent_buy_invest.configs.config import Config
 from rent_buy_invest.configs.market_config import MarketConfig
 from rent_buy_invest.configs.personal_config import PersonalConfig
 from rent_buy_invest.configs.rent_config import RentConfig
+from rent_buy_invest.io import io_utils
+
+# keys of sub-configs (by contents) in ExperimentConfig.from_dict
+SUB_CONFIG_CLASSES = {
+    "market_config": MarketConfig,
+    "rent_config": RentConfig,
+    "buy_config": BuyConfig,
+    "personal_config": PersonalConfig,
+}
 
 
 class ExperimentConfig(Config):
@@ -61,6 +71,149 @@ class ExperimentConfig(Config):
         self.start_date: datetime.datetime = start_date
         self._validate()
 
+    @classmethod
+    def parse(cls, project_path: str, use_cache: bool = True) -> "ExperimentConfig":
+        """See Config.parse.
+
+        Only the sub-configs are cached (each by the contents of its own file): a
+        cached experiment config would keep its old sub-configs after one of their
+        files is edited.
+        """
+        config_dict = io_utils.read_yaml(project_path)
+        cls.validate_file_schema(config_dict)
+        for name, clz in SUB_CONFIG_CLASSES.items():
+            config_dict[name] = clz.parse(config_dict.pop(f"{name}_path"), use_cache)
+        return cls.from_dict(config_dict, validate_schema=False)
+
+    @classmethod
+    def validate_file_schema(cls, config_dict: dict[str, Any]) -> None:
+        """Validates the contents of an experiment config file (i.e., with every
+        sub-config given by path) against the json schema, like parse does.
+
+        Raises:
+            jsonschema.ValidationError: If config_dict does not match the schema
+        """
+        cls._validate_schema(config_dict)
+
+    @classmethod
+    def from_configs(
+        cls,
+        num_years: int,
+        market_config: MarketConfig,
+        rent_config: RentConfig,
+        buy_config: BuyConfig,
+        personal_config: PersonalConfig,
+        start_date: datetime.date,
+    ) -> "ExperimentConfig":
+        """Returns an ExperimentConfig made of already constructed sub-configs.
+
+        Unlike __init__, this does not read any sub-config files.
+        """
+        experiment_config = cls.__new__(cls)
+        experiment_config.num_years = num_years
+        experiment_config.market_config = market_config
+        experiment_config.rent_config = rent_config
+        experiment_config.buy_config = buy_config
+        experiment_config.personal_config = personal_config
+        experiment_config.start_date = start_date
+        experiment_config._validate()
+        return experiment_config
+
+    @classmethod
+    def from_dict(
+        cls, config_dict: dict[str, Any], validate_schema: bool = True
+    ) -> "ExperimentConfig":
+        """Returns an ExperimentConfig using the arguments in the given dict.
+
+        Each sub-config can be given either by path, as in the yaml file (e.g.,
+        'market_config_path'), or by contents (e.g., 'market_config'), as either a
+        config object or a dict like the one returned by its to_dict(). The start
+        date can also be given as a 'YYYY-MM-DD' string.
+
+        See Config.from_dict for details, including on validate_schema.
+        """
+        if validate_schema:
+            # sub-configs given by contents are validated by their own class, and
+            # their paths are then not required
+            cls._validate_schema(
+                {
+                    name: value
+                    for name, value in config_dict.items()
+                    if name not in SUB_CONFIG_CLASSES
+                },
+                required=tuple(
+                    name
+                    for name in cls._get_schema()["required"]
+                    if name.removesuffix("_path") not in config_dict
+                ),
+            )
+        config_dict = dict(config_dict)
+        if isinstance(config_dict["start_date"], str):
+            config_dict["start_date"] = datetime.date.fromisoformat(
+                config_dict["start_date"]
+            )
+        sub_configs = {}
+        for name, clz in SUB_CONFIG_CLASSES.items():
+            if name in config_dict:
+                sub_config = config_dict[name]
+                if not isinstance(sub_config, clz):
+                    sub_config = clz.from_dict(sub_config, validate_schema)
+            else:
+                sub_config = clz.parse(config_dict[f"{name}_path"])
+            sub_configs[name] = sub_config
+        return cls.from_configs(
+            num_years=config_dict["num_years"],
+            start_date=config_dict["start_date"],
+            **sub_configs,
+        )
+
+    def with_overrides(self, **overrides: Any) -> "ExperimentConfig":
+        """Returns a new ExperimentConfig equal to this one except for the given fields.
+
+        Sub-configs can be overridden with config objects or dicts (see
+        from_dict); only the overridden fields are validated. Sub-configs that are
+        not overridden are shared with this config, not copied.
+        """
+        config_dict = {
+            "num_years": self.num_years,
+            "market_config": self.market_config,
+            "rent_config": self.rent_config,
+            "buy_config": self.buy_config,
+            "personal_config": self.personal_config,
+            "start_date": self.start_date,
+        }
+        overrides = dict(overrides)
+        for name, value in overrides.items():
+            assert name in config_dict, f"ExperimentConfig has no field '{name}'"
+            clz = SUB_CONFIG_CLASSES.get(name)
+            if clz and not isinstance(value, clz):
+                overrides[name] = clz.from_dict(value)
+        self._validate_fields_schema(
+            {
+                name: value
+                for name, value in overrides.items()
+                if name not in SUB_CONFIG_CLASSES
+            }
+        )
+        config_dict.update(overrides)
+        return ExperimentConfig.from_dict(config_dict, validate_schema=False)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the contents of this config, with each sub-config as a dict.
+
+        NOTE: unlike the other configs, the result cannot be passed to __init__,
+        which takes sub-config paths rather than sub-config contents; pass it to
+        from_dict instead.
+        """
+        return {
+            "num_years": self.num_years,
+            "market_config": self.market_config.to_dict(),
+            "rent_config": self.rent_config.to_dict(),
+            "buy_config": self.buy_config.to_dict(),
+            "personal_config": self.personal_config.to_dict(),
+            "start_date": self.start_date,
+        }
+
     def _validate(self) -> None:
         """Sanity checks the configs.
 
@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from rent_buy_invest.configs.config import Config
+from rent_buy_invest.configs.experiment_config import (
+    SUB_CONFIG_CLASSES,
+    ExperimentConfig,
+)
+from rent_buy_invest.io import io_utils
+
+
+def get_experiment_config_paths(project_path_or_pattern: str) -> list[str]:
+    """Returns the sorted project paths of experiment config files.
+
+    Args:
+        project_path_or_pattern: Either a directory, in which case every '.yaml' and
+            '.yml' file directly in it is returned, or a glob pattern (see
+            io_utils.glob_project_paths). Both start with 'rent_buy_invest'.
+    """
+    if os.path.isdir(io_utils.get_abs_path(project_path_or_pattern)):
+        return sorted(
+            io_utils.glob_project_paths(f"{project_path_or_pattern}/*.yaml")
+            + io_utils.glob_project_paths(f"{project_path_or_pattern}/*.yml")
+        )
+    return io_utils.glob_project_paths(project_path_or_pattern)
+
+
+def load_experiment_configs(
+    project_path_or_pattern: str, max_workers: int | None = None
+) -> dict[str, ExperimentConfig]:
+    """Loads many experiment configs at once.
+
+    Experiment configs usually reference a small pool of sub-config files, so
+    instead of parsing every sub-config once per experiment (as
+    ExperimentConfig.parse does), every distinct sub-config file is parsed and
+    validated exactly once, and the resulting object is shared by all experiment
+    configs that reference it. Files are read on a thread pool. The load time
+    therefore scales with the number of unique files, not the number of
+    experiments.
+
+    NOTE: since sub-config objects are shared, modifying one (e.g.,
+    experiment_config.market_config.market_rate_of_return = ...) modifies it for
+    every experiment config which references the same file. Use with_overrides
+    to change a single experiment config.
+
+    Args:
+        project_path_or_pattern: Experiment config directory or glob pattern; see
+            get_experiment_config_paths
+        max_workers: Maximum number of threads for reading files; defaults to the
+            ThreadPoolExecutor default
+
+    Returns:
+        dict[str, ExperimentConfig]: experiment config project path -> experiment
+            config, ordered by path
+    """
+    experiment_config_paths = get_experiment_config_paths(project_path_or_pattern)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        experiment_config_dicts = list(
+            executor.map(
+                lambda path: io_utils.load_yaml(io_utils.read_bytes(path)),
+                experiment_config_paths,
+            )
+        )
+
+        # validate all experiment configs before loading any sub-configs, just
+        # like ExperimentConfig.parse would
+        for config_dict in experiment_config_dicts:
+            ExperimentConfig.validate_file_schema(config_dict)
+
+        # (sub-config class, normalized path) for every distinct sub-config file
+        sub_config_keys = {
+            (clz, os.path.normpath(config_dict[f"{name}_path"]))
+            for config_dict in experiment_config_dicts
+            for name, clz in SUB_CONFIG_CLASSES.items()
+        }
+        sub_config_keys = sorted(sub_config_keys, key=lambda k: (k[0].__name__, k[1]))
+        sub_configs: dict[tuple[type[Config], str], Config] = dict(
+            zip(
+                sub_config_keys,
+                executor.map(lambda key: key[0].parse(key[1]), sub_config_keys),
+            )
+        )
+
+    experiment_configs = {}
+    for path, config_dict in zip(experiment_config_paths, experiment_config_dicts):
+        experiment_configs[path] = ExperimentConfig.from_dict(
+            {
+                "num_years": config_dict["num_years"],
+                "start_date": config_dict["start_date"],
+                **{
+                    name: sub_configs[
+                        (clz, os.path.normpath(config_dict[f"{name}_path"]))
+                    ]
+                    for name, clz in SUB_CONFIG_CLASSES.items()
+                },
+            },
+            validate_schema=False,
+        )
+    return experiment_configs
@@ -0,0 +1,55 @@
+import jsonschema
+import pytest
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.experiment_config_loader import (
+    get_experiment_config_paths,
+    load_experiment_configs,
+)
+from rent_buy_invest.configs.experiment_config_test import TestExperimentConfig
+from rent_buy_invest.io import io_utils
+
+DIR = "rent_buy_invest/temp/test_experiment_config_loader"
+
+
+def _write_experiment_configs(num_configs: int) -> list[str]:
+    config_kwargs = io_utils.read_yaml(TestExperimentConfig.TEST_CONFIG_PATH)
+    project_paths = []
+    for i in range(num_configs):
+        project_path = f"{DIR}/experiment-config-{i}.yaml"
+        io_utils.write_yaml(project_path, {**config_kwargs, "num_years": 10 + i})
+        project_paths.append(project_path)
+    return project_paths
+
+
+def test_get_experiment_config_paths() -> None:
+    project_paths = _write_experiment_configs(3)
+    io_utils.write_yaml(f"{DIR}/not-a-config.txt", {})
+    assert get_experiment_config_paths(DIR) == project_paths
+    assert get_experiment_config_paths(f"{DIR}/*-1.yaml") == project_paths[1:2]
+    assert get_experiment_config_paths("rent_buy_invest/temp/**/*-2.yaml") == [
+        project_paths[2]
+    ]
+    io_utils.delete_dir(DIR)
+
+
+def test_load_experiment_configs() -> None:
+    project_paths = _write_experiment_configs(5)
+    experiment_configs = load_experiment_configs(DIR, max_workers=4)
+    assert list(experiment_configs) == project_paths
+    for project_path, experiment_config in experiment_configs.items():
+        exp = ExperimentConfig.parse(project_path)
+        assert experiment_config.fingerprint() == exp.fingerprint()
+    # each sub-config file is loaded once and shared
+    first, *rest = experiment_configs.values()
+    for experiment_config in rest:
+        assert experiment_config.market_config is first.market_config
+        assert experiment_config.rent_config is first.rent_config
+        assert experiment_config.buy_config is first.buy_config
+        assert experiment_config.personal_config is first.personal_config
+
+    # invalid experiment configs are still rejected
+    io_utils.write_yaml(f"{DIR}/invalid.yaml", {"num_years": 10})
+    with pytest.raises(jsonschema.ValidationError):
+        load_experiment_configs(DIR)
+    io_utils.delete_dir(DIR)
@@ -25,6 +25,14 @@ class TestExperimentConfig(TestConfig):
         ]
         self._test_inputs_with_invalid_schema(ExperimentConfig, attributes)
 
+    def test_validate_file_schema(self) -> None:
+        config_dict = io_utils.read_yaml(TestExperimentConfig.TEST_CONFIG_PATH)
+        ExperimentConfig.validate_file_schema(config_dict)
+        # sub-configs must be given by path
+        config_dict.pop("market_config_path")
+        with pytest.raises(jsonschema.ValidationError):
+            ExperimentConfig.validate_file_schema(config_dict)
+
     def test_invalid_inputs(self) -> None:
         test_config_kwargs = io_utils.read_yaml(TestExperimentConfig.TEST_CONFIG_PATH)
         check_float_field(
@@ -50,3 +58,92 @@ class TestExperimentConfig(TestConfig):
             test_config_kwargs,
             ["buy_config_path"],
         )
+
+    def test_fingerprint(self) -> None:
+        experiment_config = ExperimentConfig.parse(
+            TestExperimentConfig.TEST_CONFIG_PATH
+        )
+        fingerprint = experiment_config.fingerprint()
+        assert (
+            fingerprint
+            == ExperimentConfig.parse(
+                TestExperimentConfig.TEST_CONFIG_PATH
+            ).fingerprint()
+        )
+        # a change to the contents of a sub-config changes the fingerprint
+        experiment_config.market_config.market_rate_of_return += 0.01
+        assert experiment_config.fingerprint() != fingerprint
+
+    def test_parse_after_editing_sub_config(self) -> None:
+        dir = "rent_buy_invest/temp/test_parse_after_editing_sub_config"
+        config_dict = io_utils.read_yaml(TestExperimentConfig.TEST_CONFIG_PATH)
+        market_config_dict = io_utils.read_yaml(config_dict["market_config_path"])
+        config_dict["market_config_path"] = f"{dir}/market-config.yaml"
+        io_utils.make_dirs(dir)
+        io_utils.write_yaml(f"{dir}/market-config.yaml", market_config_dict)
+        io_utils.write_yaml(f"{dir}/experiment-config.yaml", config_dict)
+        experiment_config = ExperimentConfig.parse(f"{dir}/experiment-config.yaml")
+
+        # only the sub-config file changes
+        market_config_dict["market_rate_of_return"] += 0.01
+        io_utils.write_yaml(f"{dir}/market-config.yaml", market_config_dict)
+        assert (
+            ExperimentConfig.parse(
+                f"{dir}/experiment-config.yaml"
+            ).market_config.market_rate_of_return
+            == experiment_config.market_config.market_rate_of_return + 0.01
+        )
+        io_utils.delete_dir(dir)
+
+    def test_from_dict_and_with_overrides(self) -> None:
+        experiment_config = ExperimentConfig.parse(
+            TestExperimentConfig.TEST_CONFIG_PATH
+        )
+        fingerprint = experiment_config.fingerprint()
+
+        # sub-configs by path, by contents, or as objects
+        config_kwargs = io_utils.read_yaml(TestExperimentConfig.TEST_CONFIG_PATH)
+        config_dict = experiment_config.to_dict()
+        config_dict_with_objects = {
+            **config_dict,
+            "market_config": experiment_config.market_config,
+        }
+        for validate_schema in (True, False):
+            for act_config_dict in (
+                config_kwargs,
+                config_dict,
+                config_dict_with_objects,
+            ):
+                act = ExperimentConfig.from_dict(act_config_dict, validate_schema)
+                assert act.fingerprint() == fingerprint
+        act = ExperimentConfig.from_dict(
+            {**config_dict, "start_date": experiment_config.start_date.isoformat()}
+        )
+        assert act.fingerprint() == fingerprint
+        with pytest.raises(jsonschema.ValidationError):
+            ExperimentConfig.from_dict({**config_dict, "num_years": "string"})
+        missing_config_dict = dict(config_dict)
+        del missing_config_dict["rent_config"]
+        with pytest.raises(jsonschema.ValidationError):
+            ExperimentConfig.from_dict(missing_config_dict)
+
+        overridden = experiment_config.with_overrides(num_years=30)
+        assert overridden.num_years == 30
+        # sub-configs are shared, not copied
+        assert overridden.market_config is experiment_config.market_config
+        overridden = experiment_config.with_overrides(
+            rent_config={**config_dict["rent_config"], "monthly_rent": 2100.0}
+        )
+        assert overridden.rent_config.monthly_rent == 2100.0
+        assert overridden.buy_config is experiment_config.buy_config
+        with pytest.raises(jsonschema.ValidationError):
+            experiment_config.with_overrides(num_years="string")
+        with pytest.raises(AssertionError):
+            experiment_config.with_overrides(num_years=0)
+        with pytest.raises(AssertionError):
+            experiment_config.with_overrides(
+                rent_config={**config_dict["rent_config"], "monthly_rent": -1.0}
+            )
+
+        # frozen experiment configs can be thawed too
+        assert experiment_config.freeze().thaw().fingerprint() == fingerprint
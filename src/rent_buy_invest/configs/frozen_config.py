@@ -0,0 +1,131 @@
+from collections.abc import Mapping
+from types import MappingProxyType
+from typing import Any
+
+from rent_buy_invest.utils import hash_utils
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively converts dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Inverse of _freeze."""
+    if isinstance(value, Mapping):
+        return {k: _thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(v) for v in value]
+    return value
+
+
+class FrozenConfig:
+    """Immutable, hashable snapshot of a config's fields.
+
+    Config objects are mutable and hold nested dicts/objects (e.g., tax brackets),
+    so they cannot be used as dict keys or compared cheaply. A FrozenConfig holds
+    the same fields as the kwargs used to construct the config (see
+    Config.to_dict), with nested dicts and lists converted to read-only mappings
+    and tuples. It can be used as a cache key, compared, and copied with changes
+    via replace(). Fields are accessible as attributes.
+
+    Create one with Config.freeze() and turn it back into a (validated) config
+    with thaw().
+    """
+
+    __slots__ = ("_config_class", "_fields", "_fingerprint")
+
+    def __init__(self, config_class: type, fields: Mapping[str, Any]) -> None:
+        self._init(config_class, {name: _freeze(v) for name, v in fields.items()})
+
+    def _init(self, config_class: type, frozen_fields: dict[str, Any]) -> None:
+        object.__setattr__(self, "_config_class", config_class)
+        object.__setattr__(self, "_fields", MappingProxyType(frozen_fields))
+        object.__setattr__(self, "_fingerprint", None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __getattr__(self, name: str) -> Any:
+        # only called when normal attribute lookup fails, i.e., for config fields
+        try:
+            return self._fields[name]
+        except KeyError:
+            raise AttributeError(
+                f"{self._config_class.__name__} has no field '{name}'"
+            ) from None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FrozenConfig):
+            return NotImplemented
+        return self.fingerprint() == other.fingerprint()
+
+    def __hash__(self) -> int:
+        return hash(self.fingerprint())
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._config_class.__name__}, {self.to_dict()})"
+
+    def __reduce__(self) -> tuple:
+        # needed for pickling (e.g., sending to worker processes) since
+        # __setattr__ is disabled
+        return (FrozenConfig, (self._config_class, self.to_dict()))
+
+    @property
+    def config_class(self) -> type:
+        return self._config_class
+
+    def fingerprint(self) -> str:
+        """Returns a deterministic hex digest of the config class and its fields.
+
+        Two FrozenConfigs have the same fingerprint if and only if they are for
+        the same config class and have equal fields, regardless of how or in
+        which process they were created.
+        """
+        if self._fingerprint is None:
+            object.__setattr__(
+                self,
+                "_fingerprint",
+                hash_utils.get_hash(self._config_class.__name__, self.to_dict()),
+            )
+        return self._fingerprint
+
+    def replace(self, **overrides: Any) -> "FrozenConfig":
+        """Returns a copy with the given fields replaced.
+
+        This is cheap: unchanged fields are shared with this object and nothing
+        is validated. Validation happens in thaw().
+
+        Raises:
+            AssertionError: If an override is not an existing field
+        """
+        for name in overrides:
+            assert (
+                name in self._fields
+            ), f"{self._config_class.__name__} has no field '{name}'"
+        frozen_fields = dict(self._fields)
+        frozen_fields.update({name: _freeze(v) for name, v in overrides.items()})
+        replaced = object.__new__(FrozenConfig)
+        replaced._init(self._config_class, frozen_fields)
+        return replaced
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the fields as (mutable) kwargs for constructing the config."""
+        return {name: _thaw(v) for name, v in self._fields.items()}
+
+    def thaw(self) -> Any:
+        """Returns a new config object with these fields.
+
+        The config is sanity checked (see Config._validate) but not validated
+        against the json schema again, since the fields come from a config object.
+        NOTE: this means fields changed with replace() are never checked against
+        the schema; use Config.with_overrides for untrusted values.
+        """
+        return self._config_class.from_dict(self.to_dict(), validate_schema=False)
@@ -1,7 +1,9 @@
 import math
+from typing import Any
 
 from rent_buy_invest.configs.config import Config
 from rent_buy_invest.utils import math_utils
+from rent_buy_invest.utils.metrics_utils import METRICS
 
 DEFAULT_VALIDATE_NON_REGRESSIVE_TAX_BRACKETS = True
 
@@ -93,6 +95,8 @@ class MarketConfig(Config):
                 upper_limit = bracket["upper_limit"]
 
         def get_inflated(self, inflation_factor: float) -> "MarketConfig.TaxBrackets":
+            if METRICS.enabled:
+                METRICS.increment("tax_brackets.get_inflated")
             inflated_tax_brackets = [
                 {
                     "upper_limit": bracket["upper_limit"] * inflation_factor,
@@ -126,6 +130,8 @@ class MarketConfig(Config):
             Returns:
                 tax: non-negative tax owed
             """
+            if METRICS.enabled:
+                METRICS.increment("tax_brackets._get_tax")
             # this is the range that is taxed
             taxable_range_lower_limit = offset
             taxable_range_upper_limit = offset + income
@@ -184,6 +190,25 @@ class MarketConfig(Config):
         )
         self._validate()
 
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "market_rate_of_return": self.market_rate_of_return,
+            "tax_brackets_inflation": self.tax_brackets_inflation,
+            "tax_brackets": {
+                "ordinary_income_tax_brackets": [
+                    dict(bracket)
+                    for bracket in self.ordinary_income_tax_brackets.tax_brackets
+                ],
+                "long_term_capital_gains_tax_brackets": [
+                    dict(bracket)
+                    for bracket in self.long_term_capital_gains_tax_brackets.tax_brackets
+                ],
+            },
+            "validate_non_regressive_tax_brackets": (
+                self.ordinary_income_tax_brackets.validate_non_regressive_tax_brackets
+            ),
+        }
+
     def _validate(self) -> None:
         """Sanity checks the configs.
 
@@ -225,6 +250,8 @@ class MarketConfig(Config):
         Returns:
             tax: non-negative tax owed
         """
+        if METRICS.enabled:
+            METRICS.increment("market_config.get_tax")
         assert month >= 0, "Month must be non-negative"
         assert ordinary_income >= 0, "Ordinary income must be non-negative"
         assert (
@@ -28,6 +28,25 @@ class TestMarketConfig(TestConfig):
         ]
         self._test_inputs_with_invalid_schema(MarketConfig, attributes)
 
+    def test_freeze(self) -> None:
+        self._test_freeze(MarketConfig, "market_rate_of_return", 0.05)
+        # nested fields are frozen too
+        frozen_config = TestMarketConfig.MARKET_CONFIG.freeze()
+        with pytest.raises(TypeError):
+            frozen_config.tax_brackets["ordinary_income_tax_brackets"] = []
+        tax_brackets = frozen_config.to_dict()["tax_brackets"]
+        tax_brackets["ordinary_income_tax_brackets"][0]["tax_rate"] = 0.01
+        replaced = frozen_config.replace(tax_brackets=tax_brackets)
+        assert replaced.fingerprint() != frozen_config.fingerprint()
+        assert replaced.thaw().ordinary_income_tax_brackets.tax_brackets[0][
+            "tax_rate"
+        ] == pytest.approx(0.01)
+
+    def test_from_dict_and_with_overrides(self) -> None:
+        self._test_from_dict_and_with_overrides(
+            MarketConfig, "market_rate_of_return", 0.05, 1.0
+        )
+
     def test_invalid_inputs(self) -> None:
         config_kwargs = io_utils.read_yaml(TestMarketConfig.TEST_CONFIG_PATH)
 
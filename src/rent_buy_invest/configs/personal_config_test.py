@@ -23,6 +23,14 @@ class TestPersonalConfig(TestConfig):
         ]
         self._test_inputs_with_invalid_schema(PersonalConfig, attributes)
 
+    def test_freeze(self) -> None:
+        self._test_freeze(PersonalConfig, "ordinary_income", 120000.0)
+
+    def test_from_dict_and_with_overrides(self) -> None:
+        self._test_from_dict_and_with_overrides(
+            PersonalConfig, "ordinary_income", 120000.0, -1.0
+        )
+
     def test_invalid_inputs(self) -> None:
         config_kwargs = io_utils.read_yaml(TestPersonalConfig.TEST_CONFIG_PATH)
 
@@ -29,6 +29,32 @@ class TestRentConfig(TestConfig):
         ]
         self._test_inputs_with_invalid_schema(RentConfig, attributes)
 
+    def test_freeze(self) -> None:
+        self._test_freeze(RentConfig, "monthly_rent", 2100.0)
+
+    def test_from_dict_and_with_overrides(self) -> None:
+        self._test_from_dict_and_with_overrides(
+            RentConfig, "monthly_rent", 2100.0, -1.0
+        )
+
+    def test_parse_cache(self) -> None:
+        config_kwargs = io_utils.read_yaml(TestRentConfig.TEST_CONFIG_PATH)
+        dir = "rent_buy_invest/temp/test_parse_cache"
+        project_path = f"{dir}/rent-config.yaml"
+        io_utils.write_yaml(project_path, config_kwargs)
+        config = RentConfig.parse(project_path)
+        # callers get their own copy
+        config.monthly_rent += 1
+        assert (
+            RentConfig.parse(project_path).monthly_rent == config_kwargs["monthly_rent"]
+        )
+        assert RentConfig.parse(project_path) is not RentConfig.parse(project_path)
+        # editing the file invalidates the cached config
+        io_utils.write_yaml(project_path, {**config_kwargs, "monthly_rent": 2100.0})
+        assert RentConfig.parse(project_path).monthly_rent == 2100.0
+        assert RentConfig.parse(project_path, use_cache=False).monthly_rent == 2100.0
+        io_utils.delete_dir(dir)
+
     def test_invalid_inputs(self) -> None:
         config_kwargs = io_utils.read_yaml(TestRentConfig.TEST_CONFIG_PATH)
 
@@ -0,0 +1,520 @@
+"""Generates random, valid experiment configs (scenarios) for benchmarks and fuzzing.
+
+Run with: python -m rent_buy_invest.configs.scenario_generator <num_scenarios> [--seed <seed>] [--output <path> | --output-dir <path>]
+
+By default, the scenarios are written to stdout as JSON Lines in the input format of
+the 'batch' subcommand (see commands/batch.py), e.g.:
+
+    python -m rent_buy_invest.configs.scenario_generator 100000 | python -m rent_buy_invest batch > results.jsonl
+
+With --output-dir, each scenario is written as a directory of yaml config files
+instead, which can be run like the examples.
+
+Scenario i of a seed is always the same, regardless of how many scenarios are
+generated, in what order, in which process, or on which platform.
+"""
+import argparse
+import datetime
+import json
+import math
+import random
+import sys
+from collections.abc import Iterator
+from typing import Any, TextIO
+
+from rent_buy_invest.configs.buy_config import BuyConfig
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.personal_config import PersonalConfig
+from rent_buy_invest.configs.rent_config import RentConfig
+from rent_buy_invest.core.initial_state import InitialState
+from rent_buy_invest.io import io_utils
+
+# probability that a field is set to one of its bounds rather than drawn from its
+# typical range, so that edge cases are covered
+EDGE_PROBABILITY = 0.05
+# probability that a buy config has rental income (and so is not an FHA loan)
+RENTAL_INCOME_PROBABILITY = 0.5
+FHA_LOAN_PROBABILITY = 0.2
+# the calculations need at least two years (see FinalState)
+MIN_NUM_YEARS = 2
+MAX_TAX_BRACKETS = 7
+# a scenario is redrawn if it is invalid (e.g., the upfront costs of a buy config
+# add up to too much); this many attempts are made
+MAX_ATTEMPTS = 100
+
+# field -> (typical low, typical high, lower bound, upper bound); values are drawn
+# uniformly from the typical range, or with probability edge_probability (see
+# ScenarioGenerator) set to a
+# bound. Upper bounds are the MAX_* of the config classes; fields without one get a
+# generous bound.
+BUY_CONFIG_FIELDS: dict[str, tuple[float, float, float, float]] = {
+    "annual_assessed_value_inflation_rate": (
+        -0.02,
+        0.08,
+        -0.05,
+        BuyConfig.MAX_ANNUAL_RENT_INFLATION_RATE,
+    ),
+    "down_payment_fraction": (0.0, 0.5, 0.0, 1.0),
+    "mortgage_annual_interest_rate": (
+        0.02,
+        0.1,
+        0.0,
+        BuyConfig.MAX_MORTGAGE_ANNUAL_INTEREST_RATE,
+    ),
+    "upfront_mortgage_insurance_fraction": (
+        0.0,
+        0.02,
+        0.0,
+        BuyConfig.MAX_UPFRONT_MORTGAGE_INSURANCE_FRACTION,
+    ),
+    "annual_mortgage_insurance_fraction": (
+        0.0,
+        0.01,
+        0.0,
+        BuyConfig.MAX_ANNUAL_MORTGAGE_INSURANCE_FRACTION,
+    ),
+    "mortgage_origination_points_fee_fraction": (
+        0.0,
+        0.02,
+        0.0,
+        BuyConfig.MAX_MORTGAGE_ORIGINATION_POINTS_FEE_FRACTION,
+    ),
+    "mortgage_processing_fee": (0.0, 500.0, 0.0, BuyConfig.MAX_MORTGAGE_PROCESSING_FEE),
+    "mortgage_underwriting_fee": (
+        0.0,
+        800.0,
+        0.0,
+        BuyConfig.MAX_MORTGAGE_UNDERWRITING_FEE,
+    ),
+    "mortgage_discount_points_fee_fraction": (
+        0.0,
+        0.01,
+        0.0,
+        BuyConfig.MAX_MORTGAGE_DISCOUNT_POINTS_FEE_FRACTION,
+    ),
+    "home_appraisal_cost": (300.0, 800.0, 0.0, BuyConfig.MAX_HOME_APPRAISAL_COST),
+    "credit_report_fee": (0.0, 100.0, 0.0, BuyConfig.MAX_CREDIT_REPORT_FEE),
+    "flood_certification_fee": (0.0, 50.0, 0.0, BuyConfig.MAX_FLOOD_CERTIFICATION_FEE),
+    "transfer_tax_fraction": (0.0, 0.004, 0.0, BuyConfig.MAX_TRANSFER_TAX_FRACTION),
+    "seller_burden_of_transfer_tax_fraction": (0.0, 1.0, 0.0, 1.0),
+    "recording_fee_fraction": (0.0, 0.03, 0.0, BuyConfig.MAX_RECORDING_FEE_FRACTION),
+    "annual_property_tax_rate": (
+        0.003,
+        0.025,
+        0.0,
+        BuyConfig.MAX_ANNUAL_PROPERTY_TAX_RATE,
+    ),
+    "buyer_realtor_commission_fraction": (
+        0.0,
+        0.03,
+        0.0,
+        BuyConfig.MAX_REALTOR_COMMISSION_FRACTION,
+    ),
+    "seller_realtor_commission_fraction": (
+        0.0,
+        0.03,
+        0.0,
+        BuyConfig.MAX_REALTOR_COMMISSION_FRACTION,
+    ),
+    "hoa_transfer_fee": (0.0, 500.0, 0.0, BuyConfig.MAX_HOA_TRANSFER_FEE),
+    "seller_burden_of_hoa_transfer_fee": (0.0, 1.0, 0.0, 1.0),
+    "home_inspection_cost": (300.0, 800.0, 0.0, BuyConfig.MAX_HOME_INSPECTION_COST),
+    "pest_inspection_cost": (0.0, 500.0, 0.0, BuyConfig.MAX_PEST_INSPECTION_COST),
+    "seller_one_time_home_warranty": (0.0, 800.0, 0.0, 5000.0),
+    "escrow_fixed_fee": (0.0, 1000.0, 0.0, BuyConfig.MAX_ESCROW_FIXED_FEE),
+    "seller_burden_of_escrow_fixed_fee": (0.0, 1.0, 0.0, 1.0),
+    "title_search_fee": (0.0, 300.0, 0.0, BuyConfig.MAX_TITLE_SEARCH_FEE),
+    "seller_burden_of_title_search_fee": (0.0, 1.0, 0.0, 1.0),
+    "title_search_abstract_fee": (0.0, 500.0, 0.0, BuyConfig.MAX_SEARCH_ABSTRACT_FEE),
+    "seller_burden_of_title_search_abstract_fee": (0.0, 1.0, 0.0, 1.0),
+    "title_courier_fee": (0.0, 100.0, 0.0, 1000.0),
+    "buyer_attorney_fee": (0.0, 1500.0, 0.0, BuyConfig.MAX_ATTORNEY_FEE),
+    "seller_attorney_fee": (0.0, 1500.0, 0.0, BuyConfig.MAX_ATTORNEY_FEE),
+    "lenders_title_insurance_fraction": (0.0, 0.02, 0.0, 1.0),
+    "owners_title_insurance_fraction": (0.0, 0.02, 0.0, 1.0),
+    "endorsement_fees": (0.0, 300.0, 0.0, BuyConfig.MAX_ENDORSEMENT_FEES),
+    "closing_protection_letter_fee": (
+        0.0,
+        100.0,
+        0.0,
+        BuyConfig.MAX_CLOSING_PROTECTION_LETTER_FEE,
+    ),
+    "survey_fee": (0.0, 800.0, 0.0, BuyConfig.MAX_SURVEY_FEE),
+    "notary_fee": (0.0, 200.0, 0.0, BuyConfig.MAX_NOTARY_FEE),
+    "seller_deed_prep_fee": (0.0, 200.0, 0.0, BuyConfig.MAX_DEED_PREP_FEE),
+    "seller_natural_hazard_report_fee": (0.0, 200.0, 0.0, 1000.0),
+    "annual_homeowners_insurance_fraction": (
+        0.0,
+        0.01,
+        0.0,
+        BuyConfig.MAX_ANNUAL_HOMEOWNERS_INSURANCE_FRACTION,
+    ),
+    "annual_flood_insurance": (0.0, 2000.0, 0.0, 10000.0),
+    "monthly_utilities": (50.0, 500.0, 0.0, BuyConfig.MAX_MONTHLY_UTILITIES),
+    "annual_maintenance_cost_fraction": (
+        0.005,
+        0.02,
+        0.0,
+        BuyConfig.MAX_ANNUAL_MAINTENANCE_COST_FRACTION,
+    ),
+    "annual_home_warranty": (0.0, 800.0, 0.0, 5000.0),
+    "monthly_hoa_fees": (0.0, 500.0, 0.0, BuyConfig.MAX_MONTHLY_HOA_FEES),
+}
+RENTAL_INCOME_CONFIG_FIELDS: dict[str, tuple[float, float, float, float]] = {
+    "annual_management_cost_fraction": (
+        0.0,
+        0.02,
+        0.0,
+        BuyConfig.MAX_ANNUAL_MANAGEMENT_COST_FRACTION,
+    ),
+    "rental_income_annual_inflation_rate": (
+        0.0,
+        0.06,
+        -0.05,
+        BuyConfig.MAX_MONTHLY_RENTAL_INCOME_INFLATION_RATE,
+    ),
+    "occupancy_rate": (0.5, 1.0, 0.0, 1.0),
+}
+# fields which are fractions of the monthly rent
+RENT_CONFIG_FRACTION_FIELDS: dict[str, tuple[float, float, float, float]] = {
+    "monthly_utilities": (
+        0.0,
+        0.15,
+        0.0,
+        RentConfig.MAX_MONTHLY_UTILITIES_AS_FRACTION_OF_RENT,
+    ),
+    "monthly_renters_insurance": (
+        0.0,
+        0.02,
+        0.0,
+        RentConfig.MAX_MONTHLY_RENTERS_INSURANCE_AS_FRACTION_OF_RENT,
+    ),
+    "monthly_parking_fee": (
+        0.0,
+        0.1,
+        0.0,
+        RentConfig.MAX_MONTHLY_PARKING_FEE_AS_FRACTION_OF_RENT,
+    ),
+    "security_deposit": (
+        0.0,
+        2.0,
+        0.0,
+        RentConfig.MAX_SECURITY_DEPOSIT_AS_FRACTION_OF_RENT,
+    ),
+}
+RENT_CONFIG_FIELDS: dict[str, tuple[float, float, float, float]] = {
+    "annual_rent_inflation_rate": (
+        0.0,
+        0.08,
+        -0.05,
+        RentConfig.MAX_ANNUAL_RENT_INFLATION_RATE,
+    ),
+    "unrecoverable_fraction_of_security_deposit": (0.0, 1.0, 0.0, 1.0),
+    "subsidy_fraction": (0.0, 0.0, 0.0, 1.0),
+}
+PERSONAL_CONFIG_FIELDS: dict[str, tuple[float, float, float, float]] = {
+    "ordinary_income_growth_rate": (
+        -0.01,
+        0.06,
+        -1.0,
+        PersonalConfig.MAX_ORDINARY_INCOME_GROWTH_RATE,
+    ),
+}
+
+
+class ScenarioGenerator:
+    """Generates random, valid experiment configs, reproducibly from a seed.
+
+    Every field is within the bounds of the config classes (e.g., their MAX_*
+    constants), passes their _validate, and the configs are consistent with each
+    other (e.g., InitialState can be calculated from them). Each scenario is drawn with its own
+    random.Random seeded with the seed and the scenario's index, so scenario i is
+    the same however it is generated.
+
+    Attributes:
+        seed: Seed of all scenarios
+        edge_probability: Probability that a field is set to one of its bounds
+            (e.g., 0 for only typical values)
+    """
+
+    def __init__(
+        self, seed: int = 0, edge_probability: float = EDGE_PROBABILITY
+    ) -> None:
+        assert 0 <= edge_probability <= 1, "edge_probability must be in [0, 1]"
+        self.seed = seed
+        self.edge_probability = edge_probability
+
+    def get_config_dict(self, index: int) -> dict[str, Any]:
+        """Returns scenario `index` as a dict accepted by ExperimentConfig.from_dict.
+
+        All sub-configs are given by contents, and the dict is JSON-serializable
+        (except for the infinite upper limits of the top tax brackets, which the
+        json module writes as Infinity).
+        """
+        rng = random.Random(f"{self.seed}:{index}")
+        for _ in range(MAX_ATTEMPTS):
+            config_dict = {
+                "num_years": self._draw_int(rng, 2, 60, MIN_NUM_YEARS, 300),
+                "start_date": datetime.date(
+                    rng.randint(2000, 2060), rng.randint(1, 12), 1
+                ).isoformat(),
+                "market_config": self._get_market_config_dict(rng),
+                "rent_config": self._get_rent_config_dict(rng),
+                "buy_config": self._get_buy_config_dict(rng),
+                "personal_config": self._get_personal_config_dict(rng),
+            }
+            try:
+                experiment_config = ExperimentConfig.from_dict(
+                    config_dict, validate_schema=False
+                )
+                # e.g., the upfront cost of renting must not exceed that of buying
+                InitialState.from_configs(
+                    experiment_config.buy_config,
+                    experiment_config.rent_config,
+                    experiment_config.market_config,
+                    experiment_config.personal_config,
+                )
+            except AssertionError:
+                continue
+            return config_dict
+        raise AssertionError(
+            f"Could not generate a valid scenario {index} in {MAX_ATTEMPTS} attempts"
+        )
+
+    def iter_config_dicts(
+        self, num_scenarios: int, start_index: int = 0
+    ) -> Iterator[dict[str, Any]]:
+        """Lazily yields scenarios start_index to start_index + num_scenarios - 1
+        (see get_config_dict)."""
+        for index in range(start_index, start_index + num_scenarios):
+            yield self.get_config_dict(index)
+
+    def iter_experiment_configs(
+        self, num_scenarios: int, start_index: int = 0
+    ) -> Iterator[ExperimentConfig]:
+        """Same as iter_config_dicts, but yields ExperimentConfig objects."""
+        for config_dict in self.iter_config_dicts(num_scenarios, start_index):
+            yield ExperimentConfig.from_dict(config_dict, validate_schema=False)
+
+    def write_jsonl(
+        self, out: TextIO, num_scenarios: int, start_index: int = 0
+    ) -> None:
+        """Writes scenarios as JSON Lines in the input format of the 'batch'
+        subcommand, with the scenario index as the id."""
+        for index in range(start_index, start_index + num_scenarios):
+            line = {"id": index, "experiment_config": self.get_config_dict(index)}
+            out.write(json.dumps(line) + "\n")
+
+    def write_config_dirs(
+        self, project_dir: str, num_scenarios: int, start_index: int = 0
+    ) -> list[str]:
+        """Writes each scenario as '<project_dir>/scenario-<index>/', containing an
+        experiment config and its four sub-config yaml files.
+
+        Returns:
+            list[str]: Project paths of the experiment config files
+        """
+        experiment_config_paths = []
+        for index in range(start_index, start_index + num_scenarios):
+            scenario_dir = f"{project_dir}/scenario-{index}"
+            io_utils.make_dirs(scenario_dir)
+            config_dict = self.get_config_dict(index)
+            experiment_config_dict = {
+                "num_years": config_dict["num_years"],
+                "start_date": datetime.date.fromisoformat(config_dict["start_date"]),
+            }
+            for name in (
+                "market_config",
+                "rent_config",
+                "buy_config",
+                "personal_config",
+            ):
+                path = f"{scenario_dir}/{name.replace('_', '-')}.yaml"
+                io_utils.write_yaml(path, config_dict[name])
+                experiment_config_dict[f"{name}_path"] = path
+            path = f"{scenario_dir}/experiment-config.yaml"
+            io_utils.write_yaml(path, experiment_config_dict)
+            experiment_config_paths.append(path)
+        return experiment_config_paths
+
+    def _draw(
+        self,
+        rng: random.Random,
+        low: float,
+        high: float,
+        lower_bound: float,
+        upper_bound: float,
+        decimals: int = 4,
+    ) -> float:
+        if rng.random() < self.edge_probability:
+            return float(rng.choice((lower_bound, upper_bound)))
+        return round(rng.uniform(low, high), decimals)
+
+    def _draw_int(
+        self,
+        rng: random.Random,
+        low: int,
+        high: int,
+        lower_bound: int,
+        upper_bound: int,
+    ) -> int:
+        if rng.random() < self.edge_probability:
+            return rng.choice((lower_bound, upper_bound))
+        return rng.randint(low, high)
+
+    @staticmethod
+    def _draw_log_uniform(
+        rng: random.Random, low: float, high: float, decimals: int = 2
+    ) -> float:
+        return round(math.exp(rng.uniform(math.log(low), math.log(high))), decimals)
+
+    def _draw_fields(
+        self,
+        rng: random.Random,
+        fields: dict[str, tuple[float, float, float, float]],
+        scale: float | None = None,
+    ) -> dict[str, float]:
+        """Draws each field; if scale is given, the fields are fractions of it and
+        the drawn values are scale * fraction, rounded down to the cent (so as not to
+        exceed a bound)."""
+        values = {
+            name: self._draw(rng, *field_range) for name, field_range in fields.items()
+        }
+        if scale is None:
+            return values
+        return {
+            name: math.floor(scale * value * 100) / 100
+            for name, value in values.items()
+        }
+
+    def _get_tax_brackets(self, rng: random.Random) -> list[dict[str, float]]:
+        num_brackets = rng.randint(1, MAX_TAX_BRACKETS)
+        upper_limits = sorted(
+            {
+                self._draw_log_uniform(rng, 5000.0, 1000000.0, 0)
+                for _ in range(num_brackets - 1)
+            }
+        )
+        # non-decreasing, since the tax brackets must not be regressive
+        tax_rates = sorted(
+            self._draw(rng, 0.0, 0.5, 0.0, 1.0, 3) for _ in range(len(upper_limits) + 1)
+        )
+        return [
+            {"upper_limit": upper_limit, "tax_rate": tax_rate}
+            for upper_limit, tax_rate in zip(upper_limits + [math.inf], tax_rates)
+        ]
+
+    def _get_market_config_dict(self, rng: random.Random) -> dict[str, Any]:
+        return {
+            "market_rate_of_return": self._draw(rng, -0.02, 0.12, -0.1, 0.5),
+            "tax_brackets_inflation": self._draw(rng, 0.0, 0.04, 0.0, 0.1),
+            "tax_brackets": {
+                "ordinary_income_tax_brackets": self._get_tax_brackets(rng),
+                "long_term_capital_gains_tax_brackets": self._get_tax_brackets(rng),
+            },
+        }
+
+    def _get_rent_config_dict(self, rng: random.Random) -> dict[str, Any]:
+        monthly_rent = self._draw_log_uniform(rng, 500.0, 15000.0)
+        return {
+            "monthly_rent": monthly_rent,
+            **self._draw_fields(rng, RENT_CONFIG_FRACTION_FIELDS, scale=monthly_rent),
+            **self._draw_fields(rng, RENT_CONFIG_FIELDS),
+            "inflation_adjustment_period": rng.choice((1, 6, 12, 12, 12, 24)),
+        }
+
+    def _get_buy_config_dict(self, rng: random.Random) -> dict[str, Any]:
+        sale_price = self._draw_log_uniform(rng, 50000.0, 5000000.0)
+        buy_config_dict: dict[str, Any] = {
+            "sale_price": sale_price,
+            **self._draw_fields(rng, BUY_CONFIG_FIELDS),
+            "mortgage_term_months": (
+                rng.choice((1, BuyConfig.MAX_MORTGAGE_TERM))
+                if rng.random() < self.edge_probability
+                else rng.choice((120, 180, 240, 360))
+            ),
+        }
+        if rng.random() < RENTAL_INCOME_PROBABILITY:
+            buy_config_dict["is_fha_loan"] = False
+            buy_config_dict["rental_income_config"] = {
+                **self._draw_fields(rng, RENTAL_INCOME_CONFIG_FIELDS),
+                "rental_income_waiting_period_months": self._draw_int(
+                    rng, 0, 36, 0, 120
+                ),
+                # a fraction of the sale price per month
+                "monthly_rental_income": round(
+                    sale_price * self._draw(rng, 0.002, 0.008, 0.0, 0.02), 2
+                ),
+            }
+        else:
+            buy_config_dict["is_fha_loan"] = rng.random() < FHA_LOAN_PROBABILITY
+            buy_config_dict["rental_income_config"] = None
+        return buy_config_dict
+
+    def _get_personal_config_dict(self, rng: random.Random) -> dict[str, Any]:
+        return {
+            "ordinary_income": (
+                float(rng.choice((0, PersonalConfig.MAX_ORDINARY_INCOME)))
+                if rng.random() < self.edge_probability
+                else self._draw_log_uniform(rng, 20000.0, 1000000.0)
+            ),
+            **self._draw_fields(rng, PERSONAL_CONFIG_FIELDS),
+            "years_till_retirement": self._draw_int(
+                rng, 0, 45, 0, PersonalConfig.MAX_YEARS_TILL_RETIREMENT
+            ),
+        }
+
+
+def _get_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rent_buy_invest.configs.scenario_generator",
+        description="Generates random, valid experiment configs, reproducibly from a seed.",
+    )
+    parser.add_argument(
+        "num_scenarios", type=int, help="Number of scenarios to generate."
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the scenarios; defaults to 0."
+    )
+    parser.add_argument(
+        "--edge-probability",
+        type=float,
+        default=EDGE_PROBABILITY,
+        help=f"Probability that a field is set to one of its bounds; defaults to {EDGE_PROBABILITY}.",
+    )
+    parser.add_argument(
+        "--start-index",
+        type=int,
+        default=0,
+        help="Index of the first scenario, e.g., to generate a large set in parts; defaults to 0.",
+    )
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument(
+        "--output",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) of the JSON Lines file to write; defaults to stdout.",
+    )
+    output_group.add_argument(
+        "--output-dir",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) of a directory to write a folder of yaml config files per scenario to.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _get_args(argv)
+    generator = ScenarioGenerator(args.seed, args.edge_probability)
+    if args.output_dir:
+        generator.write_config_dirs(
+            args.output_dir, args.num_scenarios, args.start_index
+        )
+    elif args.output:
+        with io_utils.RentBuyInvestFileOpener(args.output, "w") as f:
+            generator.write_jsonl(f, args.num_scenarios, args.start_index)
+    else:
+        generator.write_jsonl(sys.stdout, args.num_scenarios, args.start_index)
+
+
+if __name__ == "__main__":
+    main()
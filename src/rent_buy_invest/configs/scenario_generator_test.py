@@ -0,0 +1,69 @@
+import io
+import json
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.scenario_generator import ScenarioGenerator, main
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
+
+DIR = "rent_buy_invest/temp/test_scenario_generator"
+NUM_SCENARIOS = 200
+
+
+def test_get_config_dict_is_valid() -> None:
+    config_dicts = list(ScenarioGenerator(seed=1).iter_config_dicts(NUM_SCENARIOS))
+    for config_dict in config_dicts:
+        # validates the schemas too
+        experiment_config = ExperimentConfig.from_dict(config_dict)
+        for name in ("market", "rent", "buy", "personal"):
+            schema = io_utils.read_json(
+                f"rent_buy_invest/configs/schemas/{name}-config-schema.json"
+            )
+            assert set(config_dict[f"{name}_config"]) == set(schema["properties"])
+    # edge cases are covered
+    assert any(d["buy_config"]["rental_income_config"] is None for d in config_dicts)
+    assert any(d["buy_config"]["is_fha_loan"] for d in config_dicts)
+    assert any(d["num_years"] == 2 for d in config_dicts)
+    # the projections can be calculated (not all, since it's slow)
+    for config_dict in config_dicts[:20]:
+        experiment_config = ExperimentConfig.from_dict(config_dict)
+        ExperimentResult.calculate_cols(experiment_config)
+
+
+def test_reproducible() -> None:
+    config_dicts = list(ScenarioGenerator(seed=2).iter_config_dicts(10))
+    assert list(ScenarioGenerator(seed=2).iter_config_dicts(10)) == config_dicts
+    # independent of the other scenarios generated
+    assert (
+        list(ScenarioGenerator(seed=2).iter_config_dicts(3, start_index=7))
+        == config_dicts[7:]
+    )
+    assert ScenarioGenerator(seed=2).get_config_dict(4) == config_dicts[4]
+    assert list(ScenarioGenerator(seed=3).iter_config_dicts(10)) != config_dicts
+
+
+def test_write_jsonl() -> None:
+    generator = ScenarioGenerator(seed=4)
+    out = io.StringIO()
+    generator.write_jsonl(out, 3, start_index=5)
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [line["id"] for line in lines] == [5, 6, 7]
+    assert [line["experiment_config"] for line in lines] == list(
+        generator.iter_config_dicts(3, start_index=5)
+    )
+
+
+def test_main() -> None:
+    main(["2", "--seed", "4", "--output-dir", DIR])
+    generator = ScenarioGenerator(seed=4)
+    for index in range(2):
+        experiment_config = ExperimentConfig.parse(
+            f"{DIR}/scenario-{index}/experiment-config.yaml"
+        )
+        expected = ExperimentConfig.from_dict(generator.get_config_dict(index))
+        assert experiment_config.to_dict() == expected.to_dict()
+
+    main(["2", "--seed", "4", "--output", f"{DIR}/scenarios.jsonl"])
+    with io_utils.RentBuyInvestFileOpener(f"{DIR}/scenarios.jsonl", "r") as f:
+        assert [json.loads(line)["id"] for line in f] == [0, 1]
+    io_utils.delete_dir(DIR)
@@ -1,6 +1,7 @@
-import datetime
+from __future__ import annotations
 
-import pandas as pd
+import datetime
+from typing import TYPE_CHECKING
 
 from rent_buy_invest.configs.buy_config import BuyConfig
 from rent_buy_invest.configs.market_config import MarketConfig
@@ -9,6 +10,10 @@ from rent_buy_invest.configs.rent_config import RentConfig
 from rent_buy_invest.core.initial_state import InitialState
 from rent_buy_invest.utils.data_utils import to_df
 from rent_buy_invest.utils.math_utils import MONTHS_PER_YEAR, avg, increment_month
+from rent_buy_invest.utils.metrics_utils import METRICS
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # PMI means Private Mortgage Insurance, and this is the mortgage insurance you'd get for a conventional
 # (i.e., non-FHA) loan.
@@ -38,6 +43,10 @@ FHA_MI_TERM_IF_BELOW_THRESHOLD = MONTHS_PER_YEAR * 11
 # For convenience sake, instead of doing it annually, I'll do it monthly in the calculations
 MAX_MORTGAGE_BALANCE_ON_WHICH_INTEREST_IS_DEDUCTIBLE = 375000
 
+# Version of the calculation engine. Bump this whenever a change to the calculations (here, in the configs'
+# projection methods, or in InitialState/FinalState) changes the results, so that cached results are invalidated.
+ENGINE_VERSION = 1
+
 
 class Calculator:
     def __init__(
@@ -59,6 +68,19 @@ class Calculator:
         self.initial_state: InitialState = initial_state
 
     def calculate(self) -> pd.DataFrame:
+        """Returns the monthly projection with (Buy|Rent, column) multi-index columns."""
+        cols, rows = self.calculate_cols()
+        return to_df(cols, rows, multi_col=True)
+
+    def calculate_cols(self) -> tuple[dict[str, list[float]], list[str]]:
+        """Same as calculate, but returns plain lists instead of a DataFrame.
+
+        This avoids importing pandas when only the final state is needed.
+
+        Returns:
+            tuple[dict[str, list[float]], list[str]]: Map from '<Buy|Rent>: <column>'
+                to monthly values, and the month labels
+        """
         num_months = self.num_years * MONTHS_PER_YEAR
 
         # Some housing costs/gains can be calculated independently at once
@@ -140,13 +162,15 @@ class Calculator:
                 annual_income = sum(
                     ordinary_incomes[month + 1 - MONTHS_PER_YEAR : month + 1]
                 )
-                mortgage_interest_deduction_saving = deductible_fraction_of_interest * (
-                    self.market_config.get_income_tax_savings_from_deduction(
-                        month,
-                        annual_income,
-                        mortgage_interest_for_the_year,
+                with METRICS.timer("calculator.mortgage_interest_deduction"):
+                    mortgage_interest_deduction_saving = (
+                        deductible_fraction_of_interest
+                        * self.market_config.get_income_tax_savings_from_deduction(
+                            month,
+                            annual_income,
+                            mortgage_interest_for_the_year,
+                        )
                     )
-                )
             else:
                 mortgage_interest_deduction_saving = 0
             mortgage_interest_deduction_savings.append(
@@ -201,11 +225,12 @@ class Calculator:
                 annual_rental_income = sum(
                     home_monthly_rental_incomes[month + 1 - MONTHS_PER_YEAR : month + 1]
                 )
-                rental_income_tax = (
-                    self.market_config.get_additional_tax_from_additional_income(
-                        month, annual_ordinary_income, annual_rental_income
+                with METRICS.timer("calculator.rental_income_tax"):
+                    rental_income_tax = (
+                        self.market_config.get_additional_tax_from_additional_income(
+                            month, annual_ordinary_income, annual_rental_income
+                        )
                     )
-                )
             else:
                 rental_income_tax = 0
             rental_income_taxes.append(rental_income_tax)
@@ -246,8 +271,8 @@ class Calculator:
                 )
                 housing_monthly_surpluses.append(0)
                 investment_values_if_buying.append(gain_in_investment_if_buying)
-            elif surplus < 0:
-                # if buy option has a relative surplus
+            else:
+                # if buy option has a relative surplus (or neither has)
                 # negate surplus to make it a positive from the perspective of housing
                 surplus = -surplus
                 rent_monthly_surpluses.append(0)
@@ -295,9 +320,13 @@ class Calculator:
             # Rent: relative surplus
             "Rent: Surplus": rent_monthly_surpluses,
         }
-        rows = []
+        return cols, self._get_months()
+
+    def _get_months(self) -> list[str]:
+        """Returns the month labels of the projection."""
+        months = []
         date = self.start_date
-        for _ in range(num_months + 1):
-            rows.append(date.strftime("%b %d, %Y"))
+        for _ in range(self.num_years * MONTHS_PER_YEAR + 1):
+            months.append(date.strftime("%b %d, %Y"))
             date = increment_month(date)
-        return to_df(cols, rows, multi_col=True)
+        return months
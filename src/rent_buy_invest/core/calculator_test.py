@@ -94,3 +94,58 @@ class TestCalculator:
             #     assert row["Buy"]["Surplus (vs renting)"] == pytest.approx(
             #         rent_monthly_cost - home_monthly_cost, abs=0.0001
             #     )
+
+    def test_calculate_cols_zero_surplus(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        experiment_config = EXPERIMENT_CONFIG.with_overrides(num_years=2)
+        num_months = experiment_config.num_years * MONTHS_PER_YEAR
+        initial_state = InitialState.from_configs(
+            experiment_config.buy_config,
+            experiment_config.rent_config,
+            experiment_config.market_config,
+            experiment_config.personal_config,
+        )
+
+        def _get_calculator() -> Calculator:
+            return Calculator(
+                experiment_config.buy_config,
+                experiment_config.rent_config,
+                experiment_config.market_config,
+                experiment_config.personal_config,
+                experiment_config.num_years,
+                experiment_config.start_date,
+                initial_state,
+            )
+
+        # make the monthly cost of renting equal to the net monthly cost of buying,
+        # so that the surplus is exactly zero every month
+        cols, _ = _get_calculator().calculate_cols()
+        housing_net_monthly_costs = [
+            rent_cost + rent_surplus - buy_surplus
+            for rent_cost, rent_surplus, buy_surplus in zip(
+                cols["Rent: Costs Tied to Inflation"],
+                cols["Rent: Surplus"],
+                cols["Buy: Surplus"],
+            )
+        ]
+        monkeypatch.setattr(
+            type(experiment_config.rent_config),
+            "get_monthly_costs_of_renting",
+            lambda self, n: housing_net_monthly_costs[: n + 1],
+        )
+        cols, months = _get_calculator().calculate_cols()
+
+        assert len(months) == num_months + 1
+        for name, values in cols.items():
+            assert len(values) == num_months + 1, name
+        # the zero surplus is recorded on the buy side
+        assert cols["Buy: Surplus"] == [0] * (num_months + 1)
+        assert cols["Rent: Surplus"] == [0] * (num_months + 1)
+        # so both investments only grow
+        market_config = experiment_config.market_config
+        for side in ("Buy", "Rent"):
+            investments = cols[f"{side}: Invested (Pre-Tax)"]
+            for month in range(num_months):
+                assert (
+                    investments[month + 1]
+                    == market_config.get_pretax_monthly_wealth(investments[month], 1)[1]
+                )
@@ -0,0 +1,485 @@
+"""Differential testing of alternate calculation engines against the reference loop.
+
+Run with: python -m rent_buy_invest.core.differential <candidate> [--num-scenarios <n>] [--seed <seed>] [--tolerance '<column>=<abs>[,<rel>]' ...]
+
+Random valid scenarios (see configs/scenario_generator.py) are run through both the
+reference engine (Calculator.calculate_cols, as used by ExperimentResult) and a
+candidate engine (see ENGINES). Every projection column and every FinalState field
+is compared month by month within a per-column tolerance. The report lists the
+worst divergence of each column (even if within tolerance) and the worst
+out-of-tolerance divergences, and is printed and optionally written as JSON. The
+command exits with status 1 if any value is out of tolerance, if a column is
+missing or has a different length, or if only one engine rejects a scenario.
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import heapq
+import math
+import sys
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.scenario_generator import (
+    EDGE_PROBABILITY,
+    ScenarioGenerator,
+)
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.core.final_state import FinalState
+from rent_buy_invest.io import io_utils
+
+# projection columns ('<Buy|Rent>: <column>') -> monthly values, and the final state
+EngineResult = tuple[Mapping[str, Sequence[float]], FinalState]
+Engine = Callable[[ExperimentConfig], EngineResult]
+
+DEFAULT_NUM_SCENARIOS = 200
+DEFAULT_MAX_FAILURES = 20
+# FinalState fields are compared as columns named like this
+FINAL_STATE_COLUMN_PREFIX = "FinalState: "
+
+
+@dataclass(frozen=True)
+class Tolerance:
+    """A value is within tolerance if |actual - expected| <= max(abs_tol, rel_tol * |expected|)."""
+
+    abs_tol: float
+    rel_tol: float = 0.0
+
+    def __post_init__(self) -> None:
+        assert (
+            self.abs_tol >= 0 and self.rel_tol >= 0
+        ), "Tolerances must be non-negative"
+
+
+# one cent, or float precision for amounts too large for a float to hold cents
+DEFAULT_TOLERANCE = Tolerance(abs_tol=0.01, rel_tol=1e-12)
+# Column -> tolerance, for columns which accumulate rounding differences (e.g., the
+# investments compound monthly, so a cent of difference grows with them)
+COLUMN_TOLERANCES: dict[str, Tolerance] = {
+    "Buy: Invested (Pre-Tax)": Tolerance(abs_tol=0.01, rel_tol=1e-9),
+    "Rent: Invested (Pre-Tax)": Tolerance(abs_tol=0.01, rel_tol=1e-9),
+    f"{FINAL_STATE_COLUMN_PREFIX}wealth_if_buying": Tolerance(
+        abs_tol=0.01, rel_tol=1e-9
+    ),
+    f"{FINAL_STATE_COLUMN_PREFIX}wealth_if_renting": Tolerance(
+        abs_tol=0.01, rel_tol=1e-9
+    ),
+}
+
+
+@dataclass(frozen=True)
+class Divergence:
+    """The largest difference of a column in a scenario.
+
+    Attributes:
+        scenario_index: Index of the scenario (see ScenarioGenerator)
+        column: Projection column, or FinalState field prefixed with
+            FINAL_STATE_COLUMN_PREFIX
+        month: Index of the month in the projection (None for FinalState fields)
+        expected: Value of the reference engine
+        actual: Value of the candidate engine
+        ratio: Difference divided by the allowed difference; above 1 is out of
+            tolerance
+    """
+
+    scenario_index: int
+    column: str
+    month: int | None
+    expected: float
+    actual: float
+    ratio: float
+
+    @property
+    def within_tolerance(self) -> bool:
+        return self.ratio <= 1
+
+
+@dataclass
+class DifferentialReport:
+    """Result of run_differential.
+
+    Attributes:
+        reference: Name of the reference engine
+        candidate: Name of the candidate engine
+        num_scenarios: Number of compared scenarios
+        num_rejected: Number of scenarios both engines rejected (with an
+            AssertionError)
+        worst_by_column: Column -> worst divergence over all scenarios
+        failures: Worst out-of-tolerance divergences, worst first
+        num_failures: Number of out-of-tolerance divergences (at most one per
+            column and scenario), including those not kept in failures
+        errors: Scenarios where the engines disagree structurally (missing
+            columns, different lengths, or only one engine raising)
+    """
+
+    reference: str
+    candidate: str
+    num_scenarios: int = 0
+    num_rejected: int = 0
+    worst_by_column: dict[str, Divergence] = dataclasses.field(default_factory=dict)
+    failures: list[Divergence] = dataclasses.field(default_factory=list)
+    num_failures: int = 0
+    errors: list[str] = dataclasses.field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return not self.num_failures and not self.errors
+
+    def get_summary(self) -> str:
+        """Returns a human-readable summary of the report."""
+        lines = [
+            f"{self.candidate} vs {self.reference}: {self.num_scenarios} scenarios "
+            f"({self.num_rejected} rejected by both), {self.num_failures} out-of-tolerance "
+            f"columns, {len(self.errors)} errors"
+        ]
+        lines.append("Worst divergence by column (difference / allowed difference):")
+        for column, divergence in sorted(
+            self.worst_by_column.items(), key=lambda item: -item[1].ratio
+        ):
+            lines.append(
+                f"  {column:<50}{divergence.ratio:>10.3g}  {_describe(divergence)}"
+            )
+        if self.failures:
+            lines.append("Worst out-of-tolerance divergences:")
+            lines.extend(f"  {_describe(d)}" for d in self.failures)
+        lines.extend(f"ERROR: {error}" for error in self.errors)
+        return "\n".join(lines)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Returns the report as a JSON-serializable dict."""
+        return {
+            **dataclasses.asdict(self),
+            "worst_by_column": {
+                column: dataclasses.asdict(divergence)
+                for column, divergence in self.worst_by_column.items()
+            },
+            "passed": self.passed,
+        }
+
+
+def _describe(divergence: Divergence) -> str:
+    month = "" if divergence.month is None else f", month {divergence.month}"
+    return (
+        f"scenario {divergence.scenario_index}{month}: {divergence.column} "
+        f"expected {divergence.expected!r}, got {divergence.actual!r}"
+    )
+
+
+def reference_engine(experiment_config: ExperimentConfig) -> EngineResult:
+    """Calculator.calculate_cols, with FinalState.from_projection_cols."""
+    _, projection_cols, _, final_state = ExperimentResult.calculate_cols(
+        experiment_config
+    )
+    return projection_cols, final_state
+
+
+def dataframe_engine(experiment_config: ExperimentConfig) -> EngineResult:
+    """ExperimentResult.from_config: the projection as a DataFrame, with
+    FinalState.from_projection."""
+    result = ExperimentResult.from_config(experiment_config)
+    projection_cols = {
+        f"{group}: {name}": result.projection[(group, name)].tolist()
+        for group, name in result.projection.columns
+    }
+    return projection_cols, result.final_state
+
+
+def fixed_point_engine(experiment_config: ExperimentConfig) -> EngineResult:
+    """ExperimentResult.calculate_cols in fixed-point mode (see
+    core/fixed_point_calculator.py)."""
+    _, projection_cols, _, final_state = ExperimentResult.calculate_cols(
+        experiment_config, fixed_point=True
+    )
+    return projection_cols, final_state
+
+
+# engine name -> engine; the reference engine is the one every other engine must match
+ENGINES: dict[str, Engine] = {
+    "reference": reference_engine,
+    "dataframe": dataframe_engine,
+    "fixed_point": fixed_point_engine,
+}
+# Engine name -> column -> tolerance, for engines which are not expected to match the
+# reference exactly; overrides COLUMN_TOLERANCES when checking the engine.
+_FIXED_POINT_MORTGAGE_TOLERANCE = Tolerance(abs_tol=1.0, rel_tol=5e-4)
+_FIXED_POINT_INVESTMENT_TOLERANCE = Tolerance(abs_tol=1.0, rel_tol=1e-5)
+ENGINE_TOLERANCES: dict[str, dict[str, Tolerance]] = {
+    # The fixed-point rounding rules move single roundings by a cent (e.g., the
+    # initial loan amount is rounded to the cent, so a later interest payment can
+    # round the other way). That adds up over the loan and compounds with the
+    # investments. With extreme mortgage rates, where the payment barely exceeds the
+    # interest, it can even move the payoff month, which no tolerance covers; check
+    # the engine with edge_probability=0 and review the divergences of edge cases.
+    "fixed_point": {
+        "Buy: Loan Amount": _FIXED_POINT_MORTGAGE_TOLERANCE,
+        "Buy: Home Equity": _FIXED_POINT_MORTGAGE_TOLERANCE,
+        "Buy: Mortgage Interest Payment": _FIXED_POINT_MORTGAGE_TOLERANCE,
+        "Buy: Mortgage Equity Payment": _FIXED_POINT_MORTGAGE_TOLERANCE,
+        "Buy: Mortgage Payment": _FIXED_POINT_MORTGAGE_TOLERANCE,
+        "Buy: Mortgage Interest Deduction Savings": Tolerance(abs_tol=0.05),
+        "Buy: Surplus": _FIXED_POINT_MORTGAGE_TOLERANCE,
+        "Rent: Surplus": _FIXED_POINT_MORTGAGE_TOLERANCE,
+        "Buy: Invested (Pre-Tax)": _FIXED_POINT_INVESTMENT_TOLERANCE,
+        "Rent: Invested (Pre-Tax)": _FIXED_POINT_INVESTMENT_TOLERANCE,
+        f"{FINAL_STATE_COLUMN_PREFIX}wealth_if_buying": _FIXED_POINT_INVESTMENT_TOLERANCE,
+        f"{FINAL_STATE_COLUMN_PREFIX}wealth_if_renting": _FIXED_POINT_INVESTMENT_TOLERANCE,
+    },
+}
+
+
+def _get_tolerance(
+    column: str, tolerances: Mapping[str, Tolerance] | None
+) -> Tolerance:
+    if tolerances and column in tolerances:
+        return tolerances[column]
+    return COLUMN_TOLERANCES.get(column, DEFAULT_TOLERANCE)
+
+
+def compare_results(
+    scenario_index: int,
+    expected: EngineResult,
+    actual: EngineResult,
+    tolerances: Mapping[str, Tolerance] | None = None,
+) -> tuple[list[Divergence], list[str]]:
+    """Compares the results of two engines for a scenario.
+
+    Args:
+        scenario_index: Index of the scenario, for the report
+        expected: Result of the reference engine
+        actual: Result of the candidate engine
+        tolerances: Column -> tolerance, overriding COLUMN_TOLERANCES and
+            DEFAULT_TOLERANCE
+
+    Returns:
+        tuple[list[Divergence], list[str]]: The worst divergence of each column
+            (whether or not within tolerance), and the structural errors
+            (missing or extra columns, different lengths)
+    """
+    import numpy as np
+
+    expected_cols, expected_final_state = expected
+    actual_cols, actual_final_state = actual
+    errors = []
+    if set(expected_cols) != set(actual_cols):
+        errors.append(
+            f"scenario {scenario_index}: missing columns "
+            f"{sorted(set(expected_cols) - set(actual_cols))}, extra columns "
+            f"{sorted(set(actual_cols) - set(expected_cols))}"
+        )
+    cols = {
+        column: (expected_cols[column], actual_cols[column])
+        for column in expected_cols
+        if column in actual_cols
+    }
+    for field in dataclasses.fields(FinalState):
+        cols[f"{FINAL_STATE_COLUMN_PREFIX}{field.name}"] = (
+            [getattr(expected_final_state, field.name)],
+            [getattr(actual_final_state, field.name)],
+        )
+
+    divergences = []
+    for column, (expected_values, actual_values) in cols.items():
+        if len(expected_values) != len(actual_values):
+            errors.append(
+                f"scenario {scenario_index}: {column} has {len(actual_values)} values, "
+                f"expected {len(expected_values)}"
+            )
+            continue
+        expected_array = np.asarray(expected_values, dtype=np.float64)
+        actual_array = np.asarray(actual_values, dtype=np.float64)
+        tolerance = _get_tolerance(column, tolerances)
+        allowed = np.maximum(
+            tolerance.abs_tol, tolerance.rel_tol * np.abs(expected_array)
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ratios = np.abs(actual_array - expected_array) / allowed
+        # equal values (including infinities and NaNs) never diverge; a NaN on one
+        # side only always does
+        ratios[
+            (actual_array == expected_array)
+            | (np.isnan(actual_array) & np.isnan(expected_array))
+        ] = 0
+        ratios[np.isnan(ratios)] = math.inf
+        month = int(np.argmax(ratios))
+        divergences.append(
+            Divergence(
+                scenario_index=scenario_index,
+                column=column,
+                month=None if column.startswith(FINAL_STATE_COLUMN_PREFIX) else month,
+                expected=float(expected_array[month]),
+                actual=float(actual_array[month]),
+                ratio=float(ratios[month]),
+            )
+        )
+    return divergences, errors
+
+
+def _run_engine(
+    engine: Engine, experiment_config: ExperimentConfig
+) -> EngineResult | AssertionError:
+    try:
+        return engine(experiment_config)
+    except AssertionError as e:
+        return e
+
+
+def run_differential(
+    candidate: str,
+    num_scenarios: int = DEFAULT_NUM_SCENARIOS,
+    seed: int = 0,
+    reference: str = "reference",
+    tolerances: Mapping[str, Tolerance] | None = None,
+    max_failures: int = DEFAULT_MAX_FAILURES,
+    start_index: int = 0,
+    edge_probability: float = EDGE_PROBABILITY,
+) -> DifferentialReport:
+    """Runs random scenarios through the reference and candidate engines and
+    compares their results.
+
+    Args:
+        candidate: Name of the engine to check (see ENGINES)
+        num_scenarios: Number of scenarios to compare
+        seed: Seed of the scenarios (see ScenarioGenerator)
+        reference: Name of the engine to compare against
+        tolerances: Column -> tolerance, overriding ENGINE_TOLERANCES of the
+            candidate, COLUMN_TOLERANCES, and DEFAULT_TOLERANCE
+        max_failures: Number of worst out-of-tolerance divergences to keep
+        start_index: Index of the first scenario
+        edge_probability: Probability that a field of a scenario is set to one of
+            its bounds (see ScenarioGenerator)
+
+    Returns:
+        DifferentialReport: Worst divergences and errors
+    """
+    assert (
+        candidate in ENGINES
+    ), f"Unknown engine '{candidate}', expected one of {list(ENGINES)}"
+    assert (
+        reference in ENGINES
+    ), f"Unknown engine '{reference}', expected one of {list(ENGINES)}"
+    tolerances = {**ENGINE_TOLERANCES.get(candidate, {}), **(tolerances or {})}
+    report = DifferentialReport(reference=reference, candidate=candidate)
+    # min-heap of (ratio, tie-breaker, divergence), holding the worst failures
+    worst_failures: list[tuple[float, int, Divergence]] = []
+    for experiment_config in ScenarioGenerator(
+        seed, edge_probability
+    ).iter_experiment_configs(num_scenarios, start_index):
+        scenario_index = start_index + report.num_scenarios
+        report.num_scenarios += 1
+        expected = _run_engine(ENGINES[reference], experiment_config)
+        actual = _run_engine(ENGINES[candidate], experiment_config)
+        if isinstance(expected, AssertionError) or isinstance(actual, AssertionError):
+            if isinstance(expected, AssertionError) and isinstance(
+                actual, AssertionError
+            ):
+                report.num_rejected += 1
+            else:
+                report.errors.append(
+                    f"scenario {scenario_index}: only one engine raised: "
+                    f"{expected if isinstance(expected, AssertionError) else actual!r}"
+                )
+            continue
+        divergences, errors = compare_results(
+            scenario_index, expected, actual, tolerances
+        )
+        report.errors.extend(errors)
+        for divergence in divergences:
+            worst = report.worst_by_column.get(divergence.column)
+            if worst is None or divergence.ratio > worst.ratio:
+                report.worst_by_column[divergence.column] = divergence
+            if not divergence.within_tolerance:
+                report.num_failures += 1
+                item = (divergence.ratio, report.num_failures, divergence)
+                if len(worst_failures) < max_failures:
+                    heapq.heappush(worst_failures, item)
+                elif max_failures:
+                    heapq.heappushpop(worst_failures, item)
+    report.failures = [
+        divergence for _, _, divergence in sorted(worst_failures, reverse=True)
+    ]
+    return report
+
+
+def _parse_tolerance(value: str) -> tuple[str, Tolerance]:
+    column, _, tolerance = value.rpartition("=")
+    assert column, f"Tolerance must be like '<column>=<abs>[,<rel>]', got '{value}'"
+    return column, Tolerance(*(float(t) for t in tolerance.split(",")))
+
+
+def _get_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m rent_buy_invest.core.differential",
+        description="Compares a calculation engine against the reference loop on random valid scenarios.",
+    )
+    parser.add_argument(
+        "candidate", type=str, choices=list(ENGINES), help="Engine to check."
+    )
+    parser.add_argument(
+        "--reference",
+        type=str,
+        choices=list(ENGINES),
+        default="reference",
+        help="Engine to compare against; defaults to 'reference'.",
+    )
+    parser.add_argument(
+        "--num-scenarios",
+        type=int,
+        default=DEFAULT_NUM_SCENARIOS,
+        help=f"Number of scenarios to compare; defaults to {DEFAULT_NUM_SCENARIOS}.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the scenarios; defaults to 0."
+    )
+    parser.add_argument(
+        "--edge-probability",
+        type=float,
+        default=EDGE_PROBABILITY,
+        help=f"Probability that a field of a scenario is set to one of its bounds; defaults to {EDGE_PROBABILITY}.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=_parse_tolerance,
+        action="append",
+        default=[],
+        help="Tolerance of a column like '<column>=<abs>[,<rel>]', e.g. 'Buy: Home Value=0.05' "
+        f"or '{FINAL_STATE_COLUMN_PREFIX}wealth_if_buying=0.01,1e-6'. Can be repeated.",
+    )
+    parser.add_argument(
+        "--max-failures",
+        type=int,
+        default=DEFAULT_MAX_FAILURES,
+        help=f"Number of worst out-of-tolerance divergences to report; defaults to {DEFAULT_MAX_FAILURES}.",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) of a JSON file to write the report to.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Exits with status 1 if the engines diverge."""
+    args = _get_args(argv)
+    report = run_differential(
+        args.candidate,
+        args.num_scenarios,
+        args.seed,
+        reference=args.reference,
+        tolerances=dict(args.tolerance),
+        max_failures=args.max_failures,
+        edge_probability=args.edge_probability,
+    )
+    print(report.get_summary())
+    if args.output:
+        io_utils.write_json(args.output, report.to_dict())
+        print(f"Report: {args.output}")
+    if not report.passed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import math
+
+import pytest
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core import differential
+from rent_buy_invest.core.differential import (
+    FINAL_STATE_COLUMN_PREFIX,
+    Tolerance,
+    compare_results,
+    run_differential,
+)
+from rent_buy_invest.core.final_state import FinalState
+from rent_buy_invest.io import io_utils
+
+DIR = "rent_buy_invest/temp/test_differential"
+FINAL_STATE = FinalState(wealth_if_renting=100.0, wealth_if_buying=200.0)
+
+
+def _perturbed_engine(
+    experiment_config: ExperimentConfig,
+) -> differential.EngineResult:
+    projection_cols, final_state = differential.reference_engine(experiment_config)
+    projection_cols = dict(projection_cols)
+    home_values = list(projection_cols["Buy: Home Value"])
+    home_values[3] += 0.05
+    projection_cols["Buy: Home Value"] = home_values
+    return projection_cols, final_state
+
+
+def test_compare_results() -> None:
+    expected = ({"Buy: A": [1.0, 2.0, 3.0], "Rent: B": [0.0, math.nan]}, FINAL_STATE)
+    actual = ({"Buy: A": [1.0, 2.005, 3.02], "Rent: B": [0.0, math.nan]}, FINAL_STATE)
+    divergences, errors = compare_results(7, expected, actual)
+    assert errors == []
+    by_column = {d.column: d for d in divergences}
+    assert set(by_column) == {
+        "Buy: A",
+        "Rent: B",
+        f"{FINAL_STATE_COLUMN_PREFIX}wealth_if_renting",
+        f"{FINAL_STATE_COLUMN_PREFIX}wealth_if_buying",
+    }
+    # the worst month is reported, 2 cents off with a tolerance of 1 cent
+    assert by_column["Buy: A"].month == 2
+    assert by_column["Buy: A"].scenario_index == 7
+    assert by_column["Buy: A"].ratio == pytest.approx(2)
+    assert not by_column["Buy: A"].within_tolerance
+    # NaNs on both sides are equal
+    assert by_column["Rent: B"].ratio == 0
+    assert by_column[f"{FINAL_STATE_COLUMN_PREFIX}wealth_if_buying"].month is None
+
+    # per-column tolerance
+    divergences, _ = compare_results(
+        7, expected, actual, {"Buy: A": Tolerance(abs_tol=0.0, rel_tol=0.01)}
+    )
+    assert divergences[0].within_tolerance
+
+    # structural errors
+    actual = ({"Buy: A": [1.0, 2.0], "Rent: C": [0.0]}, FINAL_STATE)
+    _, errors = compare_results(7, expected, actual)
+    assert len(errors) == 2
+    assert "missing columns ['Rent: B'], extra columns ['Rent: C']" in errors[0]
+    assert "Buy: A has 2 values, expected 3" in errors[1]
+
+
+def test_run_differential() -> None:
+    report = run_differential("dataframe", num_scenarios=10, seed=1)
+    assert report.passed
+    assert report.num_scenarios == 10
+    assert len(report.worst_by_column) == 18 + 2
+    assert all(d.ratio == 0 for d in report.worst_by_column.values())
+
+
+def test_run_differential_detects_divergence(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(differential.ENGINES, "perturbed", _perturbed_engine)
+    report = run_differential("perturbed", num_scenarios=5, seed=1, max_failures=3)
+    assert not report.passed
+    assert report.num_failures == 5
+    assert len(report.failures) == 3
+    worst = report.worst_by_column["Buy: Home Value"]
+    assert worst.month == 3
+    assert worst.actual - worst.expected == pytest.approx(0.05)
+    assert report.failures[0] == worst
+    # other columns are unaffected
+    assert report.worst_by_column["Buy: Loan Amount"].ratio == 0
+
+    # a looser tolerance accepts the divergence
+    report = run_differential(
+        "perturbed",
+        num_scenarios=5,
+        seed=1,
+        tolerances={"Buy: Home Value": Tolerance(abs_tol=0.1)},
+    )
+    assert report.passed
+
+
+def test_main(monkeypatch: pytest.MonkeyPatch) -> None:
+    differential.main(
+        ["dataframe", "--num-scenarios", "3", "--output", f"{DIR}/report.json"]
+    )
+    report = io_utils.read_json(f"{DIR}/report.json")
+    assert report["passed"]
+    assert report["num_scenarios"] == 3
+    io_utils.delete_dir(DIR)
+
+    monkeypatch.setitem(differential.ENGINES, "perturbed", _perturbed_engine)
+    with pytest.raises(SystemExit):
+        differential.main(["perturbed", "--num-scenarios", "3"])
+    differential.main(
+        ["perturbed", "--num-scenarios", "3", "--tolerance", "Buy: Home Value=0.1"]
+    )
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.calculator import ENGINE_VERSION, Calculator
+from rent_buy_invest.core.final_state import FinalState
+from rent_buy_invest.core.fixed_point_calculator import FixedPointCalculator
+from rent_buy_invest.core.initial_state import InitialState
+from rent_buy_invest.utils import hash_utils
+from rent_buy_invest.utils.data_utils import to_df
+from rent_buy_invest.utils.profiling_utils import PhaseTimer, maybe_phase
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+@dataclass(frozen=True)
+class ExperimentResult:
+    """Everything computed for a single experiment.
+
+    Attributes:
+        initial_state: State before the projection starts
+        projection: Monthly projection DataFrame (see Calculator.calculate)
+        final_state: Post-tax wealth at the end of the projection
+    """
+
+    initial_state: InitialState
+    projection: pd.DataFrame
+    final_state: FinalState
+
+    @staticmethod
+    def from_config(
+        experiment_config: ExperimentConfig,
+        phase_timer: PhaseTimer | None = None,
+        fixed_point: bool = False,
+    ) -> "ExperimentResult":
+        """Calculates the result of the given config.
+
+        Args:
+            experiment_config: Config of the experiment
+            phase_timer: If given, times the 'initial_state', 'projection',
+                'projection_df' (DataFrame construction), and 'final_state' phases
+            fixed_point: If True, the projection is calculated in integer cents
+                (see core/fixed_point_calculator.py)
+        """
+        buy_config = experiment_config.buy_config
+        rent_config = experiment_config.rent_config
+        market_config = experiment_config.market_config
+        personal_config = experiment_config.personal_config
+        num_years = experiment_config.num_years
+
+        with maybe_phase(phase_timer, "initial_state"):
+            initial_state = InitialState.from_configs(
+                buy_config, rent_config, market_config, personal_config
+            )
+        calculator = _get_calculator_class(fixed_point)(
+            buy_config,
+            rent_config,
+            market_config,
+            personal_config,
+            num_years,
+            experiment_config.start_date,
+            initial_state,
+        )
+        # same as calculator.calculate(), but timed separately
+        with maybe_phase(phase_timer, "projection"):
+            projection_cols, months = calculator.calculate_cols()
+        with maybe_phase(phase_timer, "projection_df"):
+            projection = to_df(projection_cols, months, multi_col=True)
+        with maybe_phase(phase_timer, "final_state"):
+            final_state = FinalState.from_projection(
+                buy_config, market_config, personal_config, num_years, projection
+            )
+        return ExperimentResult(initial_state, projection, final_state)
+
+    @staticmethod
+    def calculate_cols(
+        experiment_config: ExperimentConfig, fixed_point: bool = False
+    ) -> tuple[InitialState, dict[str, list[float]], list[str], FinalState]:
+        """Same as from_config, but the projection is kept as plain lists.
+
+        This avoids importing pandas and building the projection DataFrame, e.g.,
+        when the results are serialized to JSON.
+
+        Returns:
+            tuple[InitialState, dict[str, list[float]], list[str], FinalState]: The
+                initial state, map from '<Buy|Rent>: <column>' to monthly values,
+                the month labels, and the final state
+        """
+        initial_state = InitialState.from_configs(
+            experiment_config.buy_config,
+            experiment_config.rent_config,
+            experiment_config.market_config,
+            experiment_config.personal_config,
+        )
+        calculator = _get_calculator_class(fixed_point)(
+            experiment_config.buy_config,
+            experiment_config.rent_config,
+            experiment_config.market_config,
+            experiment_config.personal_config,
+            experiment_config.num_years,
+            experiment_config.start_date,
+            initial_state,
+        )
+        projection_cols, months = calculator.calculate_cols()
+        final_state = FinalState.from_projection_cols(
+            experiment_config.buy_config,
+            experiment_config.market_config,
+            experiment_config.personal_config,
+            experiment_config.num_years,
+            projection_cols,
+        )
+        return initial_state, projection_cols, months, final_state
+
+    @staticmethod
+    def get_final_state(
+        experiment_config: ExperimentConfig, fixed_point: bool = False
+    ) -> FinalState:
+        """Returns only the final state of the given config (see calculate_cols)."""
+        return ExperimentResult.calculate_cols(experiment_config, fixed_point)[-1]
+
+    @staticmethod
+    def get_cache_key(
+        experiment_config: ExperimentConfig, fixed_point: bool = False
+    ) -> str:
+        """Returns a key identifying the result of the given config.
+
+        The key depends on the contents of the configs (not the paths they were
+        parsed from), on ENGINE_VERSION, and on whether the result is calculated
+        in fixed point.
+        """
+        if fixed_point:
+            return hash_utils.get_hash(
+                ENGINE_VERSION, "fixed_point", experiment_config.fingerprint()
+            )
+        return hash_utils.get_hash(ENGINE_VERSION, experiment_config.fingerprint())
+
+    def get_num_bytes(self) -> int:
+        """Returns the approximate in-memory size of this result in bytes."""
+        return int(self.projection.memory_usage(index=True, deep=True).sum()) + sum(
+            sys.getsizeof(state) for state in (self.initial_state, self.final_state)
+        )
+
+
+def _get_calculator_class(fixed_point: bool) -> type[Calculator]:
+    return FixedPointCalculator if fixed_point else Calculator
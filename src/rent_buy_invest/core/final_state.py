@@ -1,7 +1,19 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
+from rent_buy_invest.configs.buy_config import BuyConfig
+from rent_buy_invest.configs.market_config import MarketConfig
+from rent_buy_invest.configs.personal_config import PersonalConfig
 from rent_buy_invest.utils.data_utils import to_df
+from rent_buy_invest.utils.math_utils import MONTHS_PER_YEAR
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+PRIMARY_HOME_CAP_GAINS_EXEMPTION = 250000
 
 
 @dataclass(frozen=True)
@@ -9,6 +21,132 @@ class FinalState:
     wealth_if_renting: float
     wealth_if_buying: float
 
+    @staticmethod
+    def from_projection(
+        buy_config: BuyConfig,
+        market_config: MarketConfig,
+        personal_config: PersonalConfig,
+        num_years: int,
+        projection: pd.DataFrame,
+    ) -> "FinalState":
+        projection_cols = {
+            f"{group}: {name}": projection[(group, name)].to_numpy()
+            for group, name in projection.columns
+        }
+        return FinalState.from_projection_cols(
+            buy_config, market_config, personal_config, num_years, projection_cols
+        )
+
+    @staticmethod
+    def from_projection_cols(
+        buy_config: BuyConfig,
+        market_config: MarketConfig,
+        personal_config: PersonalConfig,
+        num_years: int,
+        projection_cols: Mapping[str, Sequence[float]],
+    ) -> "FinalState":
+        """Same as from_projection, but from the output of Calculator.calculate_cols."""
+        # TODO handle short term gain too?
+        assert num_years > 1
+        # at the end, compare only post-tax values
+        # buy side: need to sell house, and investments
+        # the sale itself includes some deductible and non-deductible expenses, so we'll calculate that too
+        # rent side: need to sell investments
+        # First do buy case
+        # Realistically you wouldn't sell all your investments at once...
+        # you'd spread it out, and there's probably some optimal way to do that...
+        # but here we assume all at once...
+        # TODO maybe I should do it separately. After all, there may be a HUGE cap gains in one year, so doing it all at once may make it seem like buying is worse than it really is
+        assert len(projection_cols["Buy: Home Value"]) % MONTHS_PER_YEAR == 1
+        # get last year's annual income
+        annual_income = sum(
+            personal_config.get_ordinary_incomes(num_years * MONTHS_PER_YEAR)[
+                -1 - MONTHS_PER_YEAR : -1
+            ]
+        )
+        # get cap gains on investments if buying
+        final_investments_if_buying = projection_cols["Buy: Invested (Pre-Tax)"][-1]
+        initial_investments_if_buying = projection_cols["Buy: Invested (Pre-Tax)"][0]
+        # TODO handle losses here and everywhere else. For now, just set gain to 0
+        cap_gains_from_selling_investments_if_buying = max(
+            final_investments_if_buying - initial_investments_if_buying, 0
+        )
+        # get cap gains on home
+        # don't want to separately find tax for investments and home, since they don't contribute "proportionally"
+        # due to tax bracketing. Find total cap gains, then calculate tax
+        loan_amount = projection_cols["Buy: Loan Amount"][-1]
+        final_home_price = projection_cols["Buy: Home Value"][-1]
+        initial_home_price = projection_cols["Buy: Home Value"][0]
+        # some selling costs are immediately deductible from capital gains
+        deductible_selling_costs = buy_config.get_deductible_selling_costs(
+            final_home_price
+        )
+        nondeductible_selling_costs = buy_config.get_nondeductible_selling_costs(
+            final_home_price
+        )
+        home_cost_basis = (
+            initial_home_price + buy_config.get_part_of_basis_upfront_one_time_cost()
+        )
+        cap_gains_from_selling_home = max(
+            (final_home_price - deductible_selling_costs) - home_cost_basis,
+            0,
+        )
+        # calculate deduction here because it is separate for home vs investments
+        if not buy_config.rental_income_config:
+            home_cap_gains_exemption = min(
+                PRIMARY_HOME_CAP_GAINS_EXEMPTION, cap_gains_from_selling_home
+            )
+            cap_gains_from_selling_home -= home_cap_gains_exemption
+        total_cap_gains_if_buying = (
+            cap_gains_from_selling_investments_if_buying + cap_gains_from_selling_home
+        )
+        # TODO create classes/methods for this
+        num_months = num_years * MONTHS_PER_YEAR
+        income_and_cap_gains_tax_if_buying = market_config.get_tax(
+            num_months + 1,
+            ordinary_income=annual_income,
+            long_term_capital_gains=total_cap_gains_if_buying,
+        )
+        only_income_tax_if_buying = market_config.get_tax(
+            num_months + 1, ordinary_income=annual_income
+        )
+        cap_gains_tax_if_buying = (
+            income_and_cap_gains_tax_if_buying - only_income_tax_if_buying
+        )
+        wealth_if_buying = (
+            -loan_amount
+            + final_investments_if_buying
+            + (
+                final_home_price
+                - deductible_selling_costs
+                - nondeductible_selling_costs
+            )
+            - cap_gains_tax_if_buying
+        )
+
+        # Now do rent case
+        final_investments_if_renting = projection_cols["Rent: Invested (Pre-Tax)"][-1]
+        initial_investments_if_renting = projection_cols["Rent: Invested (Pre-Tax)"][0]
+        cap_gains_from_selling_investments_if_renting = max(
+            final_investments_if_renting - initial_investments_if_renting, 0
+        )
+        total_cap_gains_if_renting = cap_gains_from_selling_investments_if_renting
+        income_and_cap_gains_tax_if_renting = market_config.get_tax(
+            num_months + 1,
+            ordinary_income=annual_income,
+            long_term_capital_gains=total_cap_gains_if_renting,
+        )
+        only_income_tax_if_renting = market_config.get_tax(
+            num_months + 1, ordinary_income=annual_income
+        )
+        cap_gains_tax_if_renting = (
+            income_and_cap_gains_tax_if_renting - only_income_tax_if_renting
+        )
+        wealth_if_renting = final_investments_if_renting - cap_gains_tax_if_renting
+        return FinalState(
+            wealth_if_renting=wealth_if_renting, wealth_if_buying=wealth_if_buying
+        )
+
     def get_df(self) -> list[list[Any | None]]:
         rows = ["Wealth"]
         cols = {
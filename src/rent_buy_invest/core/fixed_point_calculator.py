@@ -0,0 +1,388 @@
+"""Calculator which carries money as integer cents instead of floats rounded to cents.
+
+Rounding rules (every rounding in the projection is one of these):
+    - Inputs: the month-by-month columns from the configs (home values, costs, rental
+      and ordinary incomes, rent costs) and the fixed amounts (initial loan amount,
+      mortgage payment, mortgage insurance, appraisal cost) are converted to cents
+      once, rounding to the nearest cent with ties to even.
+    - Rates: the annual mortgage rate and the monthly growth factor of
+      investments are carried as integers scaled by RATE_SCALE (15 decimal digits,
+      so a rate given with up to 15 decimals, like every rate in the configs, is
+      exact). The monthly growth factor, (1 + annual rate of return) ** (1 / 12),
+      is calculated from the scaled annual rate with an exact integer root and
+      rounded to the nearest integer, rather than with a float power.
+    - Interest: the mortgage interest of a month is loan * annual rate / 12,
+      rounded to the nearest cent with ties to even. Ties are common in cents
+      (e.g., half the loan amounts have an interest ending in half a cent at a 6%
+      rate), and rounding them up would bias the interest upward.
+    - Investments: the value of investments after a month is value * growth
+      factor, rounded to the nearest cent with ties to even.
+    - Taxes: the yearly tax amounts are calculated by MarketConfig (on floats, from
+      exact dollar amounts) and rounded to the nearest cent with ties to even.
+    - Equity and surplus: the mortgage equity payment (payment - interest), the
+      home equity (home value - loan), and the monthly surplus (net cost of buying
+      - net cost of renting) are exact differences of cents, so they are never
+      rounded.
+
+All arithmetic in the loop is on Python integers (unbounded, so neither large
+amounts nor intermediate products like loan * scaled rate overflow), so the loop is
+exact given its inputs: it does not depend on floating-point evaluation order or on
+which other scenarios are calculated in the same process. It is also faster than
+the float loop, which rounds with round(x, 2) at nearly every step.
+
+The inputs are not calculated in integers, though: the month-by-month input columns
+are projected by the configs with float powers ((1 + rate) ** n in
+math_utils.project_growth) before they are rounded to cents, and the taxes are
+calculated on floats by MarketConfig. Float powers depend on the platform's libm,
+which may differ in the last bit, and such a difference can move a rounded cent.
+So results are deterministic given identical float inputs (e.g., on the same
+platform and Python build), but are only bit-identical across platforms whose libm
+pow agrees on those inputs.
+
+The results differ from Calculator's by the rounding rules, i.e., by a few cents
+(which compound with the investments); see core/differential.py to compare them.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from rent_buy_invest.core.calculator import (
+    FHA_MI_LTPP_THRESHOLD_FOR_LIFELONG_MORTGAGE_INSURANCE,
+    FHA_MI_TERM_IF_BELOW_THRESHOLD,
+    MAX_MORTGAGE_BALANCE_ON_WHICH_INTEREST_IS_DEDUCTIBLE,
+    PMI_LTV_THRESHOLD,
+    Calculator,
+)
+from rent_buy_invest.utils.math_utils import MONTHS_PER_YEAR
+from rent_buy_invest.utils.metrics_utils import METRICS
+
+CENTS_PER_DOLLAR = 100
+# rates are carried as integers scaled by this
+RATE_SCALE = 10**15
+# amounts of cents up to this are exact as floats and fit in int64, so they are
+# converted to int64 arrays
+MAX_EXACT_CENTS = 2**53
+
+
+def to_cents(dollars: float) -> int:
+    """Rounds dollars to the nearest cent, ties to even."""
+    return round(dollars * CENTS_PER_DOLLAR)
+
+
+def to_cents_array(dollars: Sequence[float]) -> list[int]:
+    """Same as to_cents for every value, rounded at once with numpy.
+
+    Returns:
+        list[int]: Python ints rather than an int64 array, since they are unbounded
+            (amounts can exceed int64 cents over long horizons with extreme rates)
+            and arithmetic on them is faster than on numpy scalars in the loop
+    """
+    import numpy as np
+
+    cents = np.rint(np.asarray(dollars, dtype=np.float64) * CENTS_PER_DOLLAR)
+    if np.all(np.abs(cents) <= MAX_EXACT_CENTS):
+        return cents.astype(np.int64).tolist()
+    return list(map(int, cents.tolist()))
+
+
+def to_dollars_array(cents: Sequence[int]) -> list[float]:
+    """Converts cents to dollars (the nearest float to the exact dollar amount)."""
+    return [c / CENTS_PER_DOLLAR for c in cents]
+
+
+def div_round(numerator: int, denominator: int) -> int:
+    """Returns numerator / denominator rounded to the nearest integer, ties to even
+    (like round()), exactly.
+
+    Args:
+        denominator: Must be positive
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    twice_remainder = 2 * remainder
+    if twice_remainder > denominator or (
+        twice_remainder == denominator and quotient & 1
+    ):
+        return quotient + 1
+    return quotient
+
+
+def to_scaled_rate(rate: float) -> int:
+    """Returns rate * RATE_SCALE rounded to the nearest integer."""
+    return round(rate * RATE_SCALE)
+
+
+def integer_root(n: int, k: int) -> int:
+    """Returns floor(n ** (1 / k)) exactly (Newton's method on integers).
+
+    Args:
+        n: Must be non-negative
+        k: Must be positive
+    """
+    if n < 2:
+        return n
+    # start above the root, from which the iterates decrease to the floor of it
+    x = 1 << -(-n.bit_length() // k)
+    while True:
+        y = ((k - 1) * x + n // x ** (k - 1)) // k
+        if y >= x:
+            return x
+        x = y
+
+
+def get_scaled_monthly_growth_factor(annual_rate: float) -> int:
+    """Returns (1 + annual_rate) ** (1 / 12) * RATE_SCALE rounded to the nearest
+    integer, calculated exactly from to_scaled_rate(annual_rate).
+
+    Args:
+        annual_rate: Annual rate compounded annually; must be greater than -1
+    """
+    scaled_annual_factor = RATE_SCALE + to_scaled_rate(annual_rate)
+    assert scaled_annual_factor > 0, "Annual rate must be greater than -1"
+    # (scaled_annual_factor / RATE_SCALE) ** (1 / 12) * RATE_SCALE
+    n = scaled_annual_factor * RATE_SCALE ** (MONTHS_PER_YEAR - 1)
+    root = integer_root(n, MONTHS_PER_YEAR)
+    # round up if root + 1/2 is below the exact root (it can't be equal, since
+    # the left-hand side is odd and the right-hand side even)
+    if (2 * root + 1) ** MONTHS_PER_YEAR < 2**MONTHS_PER_YEAR * n:
+        return root + 1
+    return root
+
+
+class FixedPointCalculator(Calculator):
+    """Same as Calculator, but calculates in integer cents (see the module docstring
+    for the rounding rules).
+
+    The projection has the same columns and months as Calculator's, with values in
+    dollars.
+    """
+
+    def calculate_cols(self) -> tuple[dict[str, list[float]], list[str]]:
+        num_months = self.num_years * MONTHS_PER_YEAR
+
+        # Some housing costs/gains can be calculated independently at once
+        home_values = to_cents_array(
+            self.buy_config.get_monthly_home_values(num_months)
+        )
+        home_monthly_costs_related_to_home_value = to_cents_array(
+            self.buy_config.get_home_value_related_monthly_costs(num_months)
+        )
+        home_monthly_costs_related_to_inflation = to_cents_array(
+            self.buy_config.get_inflation_related_monthly_costs(
+                self.rent_config.annual_rent_inflation_rate, num_months
+            )
+        )
+        home_monthly_rental_incomes = to_cents_array(
+            self.buy_config.get_monthly_rental_incomes(num_months)
+        )
+
+        # Projected ordinary income (used only for tax projection purposes)
+        ordinary_incomes = to_cents_array(
+            self.personal_config.get_ordinary_incomes(num_months)
+        )
+
+        # Some renting costs/gains can be calculated independently at once
+        rent_monthly_costs = to_cents_array(
+            self.rent_config.get_monthly_costs_of_renting(num_months)
+        )
+
+        # The remaining housing and rental costs/gains are calculated in the loop
+        # which projects forward month by month
+        mortgage_interests = []
+        mortgage_interest_deduction_savings = []
+        paid_toward_equity = []
+        loan_amounts = []
+        equities = []
+        mortgage_insurances = []
+        rental_income_taxes = []
+        housing_monthly_surpluses = []
+        rent_monthly_surpluses = []
+        investment_values_if_renting = [
+            to_cents(self.initial_state.invested_if_renting)
+        ]  # NOTE: first value filled in
+        investment_values_if_buying = [0]  # NOTE: first value filed in
+        buy_one_off_costs = []
+
+        loan_amount = to_cents(self.buy_config.initial_loan_amount)
+        monthly_mortgage_payment = to_cents(
+            self.buy_config.get_monthly_mortgage_payment()
+        )
+        mortgage_insurance_if_required = to_cents(
+            self.buy_config.annual_mortgage_insurance_fraction
+            * self.buy_config.initial_loan_amount
+            / MONTHS_PER_YEAR
+        )
+        home_appraisal_cost = to_cents(self.buy_config.home_appraisal_cost)
+        # PMI is not required at or below this loan amount
+        max_loan_amount_without_pmi = (
+            PMI_LTV_THRESHOLD * self.buy_config.sale_price * CENTS_PER_DOLLAR
+        )
+        requires_lifelong_fha_mortgage_insurance = (
+            self.buy_config.initial_loan_fraction
+            > FHA_MI_LTPP_THRESHOLD_FOR_LIFELONG_MORTGAGE_INSURANCE
+        )
+
+        # rates scaled by RATE_SCALE; interest is loan * rate / 12 and the value of
+        # investments after a month is value * (1 + monthly rate)
+        scaled_mortgage_rate = to_scaled_rate(
+            self.buy_config.mortgage_annual_interest_rate
+        )
+        interest_divisor = MONTHS_PER_YEAR * RATE_SCALE
+        scaled_growth_factor = get_scaled_monthly_growth_factor(
+            self.market_config.market_rate_of_return
+        )
+
+        for month in range(num_months + 1):
+            buy_one_off_cost = 0
+
+            loan_amounts.append(loan_amount)
+
+            # mortgage interest cost
+            mortgage_interest = div_round(
+                loan_amount * scaled_mortgage_rate, interest_divisor
+            )
+            mortgage_interests.append(mortgage_interest)
+            # at the year boundary: mortgage interest tax deduction savings and
+            # taxes on rental income
+            if month % MONTHS_PER_YEAR == (MONTHS_PER_YEAR - 1):
+                year_start = month + 1 - MONTHS_PER_YEAR
+                annual_income = (
+                    sum(ordinary_incomes[year_start : month + 1]) / CENTS_PER_DOLLAR
+                )
+                # see Calculator.calculate_cols
+                deductible_fraction_of_interest = (
+                    MAX_MORTGAGE_BALANCE_ON_WHICH_INTEREST_IS_DEDUCTIBLE
+                    / max(
+                        MAX_MORTGAGE_BALANCE_ON_WHICH_INTEREST_IS_DEDUCTIBLE,
+                        loan_amount / CENTS_PER_DOLLAR,
+                    )
+                )
+                with METRICS.timer("calculator.mortgage_interest_deduction"):
+                    mortgage_interest_deduction_saving = to_cents(
+                        deductible_fraction_of_interest
+                        * self.market_config.get_income_tax_savings_from_deduction(
+                            month,
+                            annual_income,
+                            sum(mortgage_interests[-MONTHS_PER_YEAR:])
+                            / CENTS_PER_DOLLAR,
+                        )
+                    )
+                annual_rental_income = (
+                    sum(home_monthly_rental_incomes[year_start : month + 1])
+                    / CENTS_PER_DOLLAR
+                )
+                with METRICS.timer("calculator.rental_income_tax"):
+                    rental_income_tax = to_cents(
+                        self.market_config.get_additional_tax_from_additional_income(
+                            month, annual_income, annual_rental_income
+                        )
+                    )
+            else:
+                mortgage_interest_deduction_saving = 0
+                rental_income_tax = 0
+            mortgage_interest_deduction_savings.append(
+                mortgage_interest_deduction_saving
+            )
+            rental_income_taxes.append(rental_income_tax)
+
+            # mortgage equity payment and equity value
+            if loan_amount == 0:
+                # mortgage already paid off
+                toward_equity = 0
+            elif loan_amount + mortgage_interest <= monthly_mortgage_payment:
+                # final mortgage payment
+                toward_equity = loan_amount
+            else:
+                # regular mortgage payment
+                toward_equity = monthly_mortgage_payment - mortgage_interest
+            paid_toward_equity.append(toward_equity)
+            equities.append(home_values[month] - loan_amount)
+
+            if not mortgage_interest:
+                mortgage_insurance = 0
+            elif not self.buy_config.is_fha_loan:
+                if loan_amount <= max_loan_amount_without_pmi:
+                    if mortgage_insurances and mortgage_insurances[-1] != 0:
+                        buy_one_off_cost += home_appraisal_cost
+                    mortgage_insurance = 0
+                else:
+                    mortgage_insurance = mortgage_insurance_if_required
+            elif requires_lifelong_fha_mortgage_insurance:
+                mortgage_insurance = mortgage_insurance_if_required
+            elif month // MONTHS_PER_YEAR < FHA_MI_TERM_IF_BELOW_THRESHOLD:
+                mortgage_insurance = mortgage_insurance_if_required
+            else:
+                mortgage_insurance = 0
+            mortgage_insurances.append(mortgage_insurance)
+            buy_one_off_costs.append(buy_one_off_cost)
+
+            # monthly surplus from one option vs the other, from the perspective of
+            # renting (see Calculator.calculate_cols)
+            surplus = (
+                home_monthly_costs_related_to_home_value[month]
+                + home_monthly_costs_related_to_inflation[month]
+                + mortgage_interest
+                + toward_equity
+                + mortgage_insurance
+                + buy_one_off_cost
+                + rental_income_tax
+                - home_monthly_rental_incomes[month]
+                - rent_monthly_costs[month]
+            )
+            investment_value_if_renting = div_round(
+                investment_values_if_renting[-1] * scaled_growth_factor, RATE_SCALE
+            )
+            investment_value_if_buying = div_round(
+                investment_values_if_buying[-1] * scaled_growth_factor, RATE_SCALE
+            )
+            if surplus >= 0:
+                # rent option has a relative surplus
+                rent_monthly_surpluses.append(surplus)
+                housing_monthly_surpluses.append(0)
+                investment_value_if_renting += surplus
+            else:
+                # buy option has a relative surplus
+                rent_monthly_surpluses.append(0)
+                housing_monthly_surpluses.append(-surplus)
+                investment_value_if_buying -= surplus
+            investment_values_if_renting.append(investment_value_if_renting)
+            investment_values_if_buying.append(investment_value_if_buying)
+
+            # update loan_amount for next iteration
+            loan_amount -= toward_equity
+            assert loan_amount >= 0, "Loan amount cannot be negative."
+        # Pop last element from lists which have an extra item (starting value)
+        investment_values_if_renting.pop()
+        investment_values_if_buying.pop()
+
+        # same columns as Calculator.calculate_cols
+        cols = {
+            # Buy: state
+            "Buy: Invested (Pre-Tax)": investment_values_if_buying,
+            "Buy: Home Equity": equities,
+            "Buy: Home Value": home_values,
+            "Buy: Loan Amount": loan_amounts,
+            # Buy: costs
+            "Buy: Costs Tied to Home Value": home_monthly_costs_related_to_home_value,
+            "Buy: Costs Tied to Inflation": home_monthly_costs_related_to_inflation,
+            "Buy: Mortgage Insurance": mortgage_insurances,
+            "Buy: Mortgage Interest Payment": mortgage_interests,
+            "Buy: Mortgage Equity Payment": paid_toward_equity,
+            "Buy: Mortgage Interest Deduction Savings": mortgage_interest_deduction_savings,
+            "Buy: One-Off Costs": buy_one_off_costs,
+            # black formats the following line in an easy-to-misread way
+            # fmt: off
+            "Buy: Mortgage Payment": [i + e for i, e in zip(mortgage_interests, paid_toward_equity)],
+            # fmt: on
+            "Buy: Rental Income (Pre-Tax)": home_monthly_rental_incomes,
+            "Buy: Tax on Rental Income": rental_income_taxes,
+            # Buy: relative surplus
+            "Buy: Surplus": housing_monthly_surpluses,
+            # Rent: state
+            "Rent: Invested (Pre-Tax)": investment_values_if_renting,
+            # Rent: costs
+            "Rent: Costs Tied to Inflation": rent_monthly_costs,
+            # Rent: relative surplus
+            "Rent: Surplus": rent_monthly_surpluses,
+        }
+        cols = {name: to_dollars_array(values) for name, values in cols.items()}
+        return cols, self._get_months()
@@ -0,0 +1,122 @@
+import pytest
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.experiment_config_test import TestExperimentConfig
+from rent_buy_invest.configs.scenario_generator import ScenarioGenerator
+from rent_buy_invest.core.differential import run_differential
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.core.fixed_point_calculator import (
+    RATE_SCALE,
+    div_round,
+    get_scaled_monthly_growth_factor,
+    integer_root,
+    to_cents,
+    to_cents_array,
+    to_dollars_array,
+)
+
+EXPERIMENT_CONFIG = ExperimentConfig.parse(TestExperimentConfig.TEST_CONFIG_PATH)
+
+
+def test_div_round() -> None:
+    assert div_round(7, 3) == 2
+    assert div_round(8, 3) == 3
+    # ties to even
+    assert div_round(5, 2) == 2
+    assert div_round(7, 2) == 4
+    assert div_round(-5, 2) == -2
+    assert div_round(-7, 2) == -4
+    assert div_round(-8, 3) == -3
+    # exact for numbers beyond float precision
+    assert div_round(10**40 + 3, 2) == 5 * 10**39 + 2
+    assert div_round(10**40 + 1, 2) == 5 * 10**39
+
+
+def test_integer_root() -> None:
+    for k in (1, 2, 3, 12):
+        for root in (0, 1, 2, 7, 10**15 + 3, 3**40):
+            assert integer_root(root**k, k) == root
+            if root**k + 1 < (root + 1) ** k:
+                assert integer_root(root**k + 1, k) == root
+            if root > 1:
+                assert integer_root(root**k - 1, k) == root - 1
+
+
+def test_get_scaled_monthly_growth_factor() -> None:
+    assert get_scaled_monthly_growth_factor(0.0) == RATE_SCALE
+    # compounding monthly for a year is the annual rate
+    for annual_rate in (0.07, -0.5, 1.0, 0.0425):
+        factor = get_scaled_monthly_growth_factor(annual_rate)
+        assert factor == pytest.approx(
+            (1 + annual_rate) ** (1 / 12) * RATE_SCALE, abs=2
+        )
+        assert (factor / RATE_SCALE) ** 12 == pytest.approx(1 + annual_rate)
+    # 2 ** 12 = 4096
+    assert get_scaled_monthly_growth_factor(4095.0) == 2 * RATE_SCALE
+    with pytest.raises(AssertionError):
+        get_scaled_monthly_growth_factor(-1.0)
+
+
+def test_to_cents_array() -> None:
+    dollars = [0.0, 1.5, -2.25, 0.125, 123456.789, -0.004]
+    cents = to_cents_array(dollars)
+    assert cents == [to_cents(d) for d in dollars] == [0, 150, -225, 12, 12345679, 0]
+    assert all(type(c) is int for c in cents)
+    # beyond int64
+    assert to_cents_array([1e30]) == [int(1e32)]
+    assert to_dollars_array([12345, -5, 10**32]) == [123.45, -0.05, 1e30]
+
+
+class TestFixedPointCalculator:
+    def test_calculate_cols(self) -> None:
+        _, expected_cols, expected_months, _ = ExperimentResult.calculate_cols(
+            EXPERIMENT_CONFIG
+        )
+        _, projection_cols, months, _ = ExperimentResult.calculate_cols(
+            EXPERIMENT_CONFIG, fixed_point=True
+        )
+        assert list(projection_cols) == list(expected_cols)
+        assert months == expected_months
+        for name, values in projection_cols.items():
+            assert len(values) == len(expected_cols[name])
+            # whole cents
+            assert all(round(v * 100) / 100 == v for v in values), name
+            assert values == pytest.approx(expected_cols[name], rel=1e-5, abs=1.0)
+        for interest, equity, payment in zip(
+            projection_cols["Buy: Mortgage Interest Payment"],
+            projection_cols["Buy: Mortgage Equity Payment"],
+            projection_cols["Buy: Mortgage Payment"],
+        ):
+            assert round((interest + equity) * 100) == round(payment * 100)
+
+    def test_matches_reference(self) -> None:
+        # realistic scenarios; edge cases like 100% mortgage rates are so
+        # ill-conditioned that a cent of difference changes when the loan is paid off
+        report = run_differential(
+            "fixed_point", num_scenarios=20, seed=3, edge_probability=0
+        )
+        assert report.passed, report.get_summary()
+
+    def test_reproducible(self) -> None:
+        generator = ScenarioGenerator(seed=5)
+        experiment_configs = list(generator.iter_experiment_configs(4))
+        results = [
+            ExperimentResult.calculate_cols(experiment_config, fixed_point=True)
+            for experiment_config in experiment_configs
+        ]
+        # same results in any order
+        for experiment_config, result in reversed(
+            list(zip(experiment_configs, results))
+        ):
+            assert (
+                ExperimentResult.calculate_cols(experiment_config, fixed_point=True)
+                == result
+            )
+
+    def test_get_cache_key(self) -> None:
+        assert ExperimentResult.get_cache_key(
+            EXPERIMENT_CONFIG
+        ) != ExperimentResult.get_cache_key(EXPERIMENT_CONFIG, fixed_point=True)
+        assert ExperimentResult.get_cache_key(
+            EXPERIMENT_CONFIG, fixed_point=True
+        ) == ExperimentResult.get_cache_key(EXPERIMENT_CONFIG, fixed_point=True)
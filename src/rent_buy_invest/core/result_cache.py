@@ -0,0 +1,121 @@
+import dataclasses
+import threading
+from collections import OrderedDict
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+
+
+class ResultCache:
+    """In-memory LRU cache of experiment results for long-lived processes.
+
+    Results are keyed by ExperimentResult.get_cache_key, so two configs with the
+    same contents share an entry even if they were parsed separately. The cache is
+    bounded both by number of entries and by the approximate total size of the
+    cached results; when either bound is exceeded, least recently used entries are
+    evicted. The cache is thread-safe.
+
+    Results are copied when they are cached and when they are returned (the states
+    are immutable, the projection DataFrame is not), so editing a returned result
+    (e.g., adding a column to its projection) does not affect later lookups.
+
+    Attributes:
+        max_entries (int): Maximum number of cached results
+        max_bytes (int): Maximum total approximate size of cached results in bytes
+        hits (int): Number of lookups that found a cached result
+        misses (int): Number of lookups that did not find a cached result
+        evictions (int): Number of results evicted to stay within the bounds
+    """
+
+    DEFAULT_MAX_ENTRIES: int = 128
+    DEFAULT_MAX_BYTES: int = 256 * 1024 * 1024
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        assert max_entries > 0, "max_entries must be positive"
+        assert max_bytes > 0, "max_bytes must be positive"
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        # key -> (result, size in bytes); ordered from least to most recently used
+        self._entries: OrderedDict[str, tuple[ExperimentResult, int]] = OrderedDict()
+        self._num_bytes: int = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def num_bytes(self) -> int:
+        return self._num_bytes
+
+    def get(self, experiment_config: ExperimentConfig) -> ExperimentResult | None:
+        """Returns the cached result for the given config, or None on a miss."""
+        key = ExperimentResult.get_cache_key(experiment_config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return _copy_result(entry[0])
+
+    def put(
+        self, experiment_config: ExperimentConfig, result: ExperimentResult
+    ) -> None:
+        """Caches the result for the given config, evicting LRU entries if needed.
+
+        A result which by itself is larger than max_bytes is not cached.
+        """
+        key = ExperimentResult.get_cache_key(experiment_config)
+        num_bytes = result.get_num_bytes()
+        if num_bytes > self.max_bytes:
+            return
+        result = _copy_result(result)
+        with self._lock:
+            old_entry = self._entries.pop(key, None)
+            if old_entry is not None:
+                self._num_bytes -= old_entry[1]
+            self._entries[key] = (result, num_bytes)
+            self._num_bytes += num_bytes
+            while (
+                len(self._entries) > self.max_entries
+                or self._num_bytes > self.max_bytes
+            ):
+                _, (_, evicted_num_bytes) = self._entries.popitem(last=False)
+                self._num_bytes -= evicted_num_bytes
+                self.evictions += 1
+
+    def evaluate(self, experiment_config: ExperimentConfig) -> ExperimentResult:
+        """Returns the result for the given config, computing and caching it on a miss."""
+        result = self.get(experiment_config)
+        if result is None:
+            result = ExperimentResult.from_config(experiment_config)
+            self.put(experiment_config, result)
+        return result
+
+    def get_stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._num_bytes,
+            }
+
+    def clear(self) -> None:
+        """Removes all cached results. Counters are not reset."""
+        with self._lock:
+            self._entries.clear()
+            self._num_bytes = 0
+
+
+def _copy_result(result: ExperimentResult) -> ExperimentResult:
+    return dataclasses.replace(result, projection=result.projection.copy())
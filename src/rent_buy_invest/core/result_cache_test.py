@@ -0,0 +1,86 @@
+import copy
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.experiment_config_test import TestExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.core.result_cache import ResultCache
+
+EXPERIMENT_CONFIG = ExperimentConfig.parse(TestExperimentConfig.TEST_CONFIG_PATH)
+
+
+def _get_configs(num_configs: int) -> list[ExperimentConfig]:
+    configs = []
+    for i in range(num_configs):
+        config = copy.deepcopy(EXPERIMENT_CONFIG)
+        config.num_years = i + 2
+        configs.append(config)
+    return configs
+
+
+class TestResultCache:
+    def test_evaluate(self) -> None:
+        cache = ResultCache()
+        act = cache.evaluate(EXPERIMENT_CONFIG)
+        exp = ExperimentResult.from_config(EXPERIMENT_CONFIG)
+        assert act.final_state == exp.final_state
+        assert act.projection.equals(exp.projection)
+        # a separately parsed but identical config is a hit
+        reparsed_config = ExperimentConfig.parse(TestExperimentConfig.TEST_CONFIG_PATH)
+        hit = cache.evaluate(reparsed_config)
+        assert hit.final_state == exp.final_state
+        assert hit.projection.equals(exp.projection)
+        assert cache.get_stats() == {
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+            "entries": 1,
+            "bytes": act.get_num_bytes(),
+        }
+
+    def test_results_are_copied(self) -> None:
+        cache = ResultCache()
+        exp = ExperimentResult.from_config(EXPERIMENT_CONFIG)
+        result = cache.evaluate(EXPERIMENT_CONFIG)
+        num_bytes = cache.num_bytes
+        # editing the result computed on a miss or returned by a hit doesn't
+        # affect later hits
+        result.projection[("Buy", "Extra")] = 0.0
+        hit = cache.get(EXPERIMENT_CONFIG)
+        assert hit.projection.equals(exp.projection)
+        hit.projection.iloc[0, 0] = -1.0
+        hit.projection.drop(columns=[("Rent", "Surplus")], inplace=True)
+        assert cache.get(EXPERIMENT_CONFIG).projection.equals(exp.projection)
+        assert cache.num_bytes == num_bytes
+
+    def test_max_entries(self) -> None:
+        cache = ResultCache(max_entries=2)
+        configs = _get_configs(3)
+        for config in configs:
+            cache.evaluate(config)
+        assert len(cache) == 2
+        assert cache.evictions == 1
+        assert cache.get(configs[0]) is None
+        # make configs[1] least recently used
+        assert cache.get(configs[2]) is not None
+        cache.evaluate(configs[0])
+        assert cache.get(configs[1]) is None
+        assert cache.get(configs[2]) is not None
+
+    def test_max_bytes(self) -> None:
+        configs = _get_configs(3)
+        results = [ExperimentResult.from_config(config) for config in configs]
+        max_bytes = results[1].get_num_bytes() + results[2].get_num_bytes()
+        cache = ResultCache(max_bytes=max_bytes)
+        for config, result in zip(configs, results):
+            cache.put(config, result)
+        assert cache.num_bytes <= max_bytes
+        assert cache.get(configs[0]) is None
+        for config, result in zip(configs[1:], results[1:]):
+            hit = cache.get(config)
+            assert hit.final_state == result.final_state
+            assert hit.projection.equals(result.projection)
+
+        # too large to ever be cached
+        cache = ResultCache(max_bytes=1)
+        cache.put(configs[0], results[0])
+        assert len(cache) == 0
@@ -0,0 +1,119 @@
+import queue
+import threading
+from collections.abc import Callable
+from typing import Any
+
+
+class BackgroundWriter:
+    """Runs write tasks (e.g., serializing and saving outputs) on worker threads.
+
+    Tasks are queued with submit() and run in the background, so output writing
+    overlaps with whatever the caller does next (e.g., computing the next
+    experiment). The queue is bounded: once max_pending tasks are waiting, submit()
+    blocks until a worker frees a slot, which keeps memory bounded when writing is
+    slower than computing.
+
+    If a task raises, the remaining queued tasks are skipped and the exception is
+    re-raised in the caller's thread by the next call to submit(), flush(), or
+    close(). Always call close() (or use the writer as a context manager) so that
+    all outputs are written and errors are not lost; worker threads are daemons and
+    do not keep the process alive.
+
+    With one worker, tasks run in submission order. With more workers, tasks can
+    finish in any order, so tasks should not depend on each other.
+
+    NOTE: arguments are not copied; don't modify them after submitting.
+    """
+
+    DEFAULT_MAX_PENDING: int = 8
+
+    def __init__(
+        self, num_workers: int = 1, max_pending: int = DEFAULT_MAX_PENDING
+    ) -> None:
+        """Initialize BackgroundWriter and start its worker threads.
+
+        Args:
+            num_workers: Number of worker threads
+            max_pending: Maximum number of queued tasks before submit() blocks
+        """
+        assert num_workers > 0, "num_workers must be positive"
+        assert max_pending > 0, "max_pending must be positive"
+        # tasks are (fn, args, kwargs); None tells a worker to stop
+        self._queue: queue.Queue[
+            tuple[Callable[..., Any], tuple, dict[str, Any]] | None
+        ] = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._error_lock = threading.Lock()
+        self._closed = False
+        self._workers = [
+            threading.Thread(
+                target=self._work, name=f"BackgroundWriter-{i}", daemon=True
+            )
+            for i in range(num_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _work(self) -> None:
+        while True:
+            task = self._queue.get()
+            try:
+                if task is None:
+                    return
+                if self._error is None:
+                    fn, args, kwargs = task
+                    fn(*args, **kwargs)
+            except BaseException as e:
+                with self._error_lock:
+                    if self._error is None:
+                        self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+        """Queues fn(*args, **kwargs) to run on a worker thread.
+
+        Blocks while the queue is full.
+
+        Raises:
+            Exception: The first exception raised by a previously submitted task
+        """
+        assert not self._closed, "Cannot submit to a closed BackgroundWriter"
+        self._raise_error()
+        self._queue.put((fn, args, kwargs))
+
+    def flush(self) -> None:
+        """Blocks until every submitted task has finished.
+
+        Raises:
+            Exception: The first exception raised by a submitted task
+        """
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Finishes all submitted tasks and stops the worker threads.
+
+        Closing more than once is a no-op.
+
+        Raises:
+            Exception: The first exception raised by a submitted task
+        """
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._raise_error()
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from rent_buy_invest.io.background_writer import BackgroundWriter
+
+
+class TestBackgroundWriter:
+    def test_submit_and_flush(self) -> None:
+        written = []
+        with BackgroundWriter(num_workers=1, max_pending=2) as writer:
+            for i in range(10):
+                writer.submit(written.append, i)
+            writer.flush()
+            # one worker runs tasks in order
+            assert written == list(range(10))
+            writer.submit(written.append, 10)
+        assert written == list(range(11))
+        with pytest.raises(AssertionError):
+            writer.submit(written.append, 11)
+        # closing again is a no-op
+        writer.close()
+
+    def test_multiple_workers(self) -> None:
+        written = []
+        lock = threading.Lock()
+
+        def write(i: int) -> None:
+            with lock:
+                written.append(i)
+
+        with BackgroundWriter(num_workers=4) as writer:
+            for i in range(100):
+                writer.submit(write, i)
+        assert sorted(written) == list(range(100))
+
+    def test_max_pending(self) -> None:
+        release = threading.Event()
+        writer = BackgroundWriter(num_workers=1, max_pending=1)
+        writer.submit(release.wait)  # taken by the worker
+        writer.submit(lambda: None)  # fills the queue
+        submitted = threading.Event()
+
+        def submit() -> None:
+            writer.submit(lambda: None)
+            submitted.set()
+
+        thread = threading.Thread(target=submit)
+        thread.start()
+        assert not submitted.wait(timeout=0.1)
+        release.set()
+        assert submitted.wait(timeout=5)
+        thread.join()
+        writer.close()
+
+    def test_error_propagation(self) -> None:
+        def fail() -> None:
+            raise ValueError("write failed")
+
+        written = []
+        writer = BackgroundWriter()
+        writer.submit(fail)
+        writer.submit(written.append, 1)
+        with pytest.raises(ValueError, match="write failed"):
+            writer.flush()
+        # tasks after the failure are skipped
+        assert written == []
+        with pytest.raises(ValueError):
+            writer.submit(written.append, 2)
+        with pytest.raises(ValueError):
+            writer.close()
+
+        with pytest.raises(ValueError):
+            with BackgroundWriter() as writer:
+                writer.submit(fail)
@@ -1,30 +1,58 @@
+from __future__ import annotations
+
 import datetime
 import os
-from typing import Any
-
-import openpyxl
-import pandas as pd
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
 
 from rent_buy_invest.io import io_utils
+from rent_buy_invest.io.background_writer import BackgroundWriter
+from rent_buy_invest.utils.profiling_utils import PhaseTimer, maybe_phase
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from rent_buy_invest.configs.experiment_config import ExperimentConfig
+    from rent_buy_invest.core.experiment_result import ExperimentResult
 
 
 class ExperimentWriter:
     """Handles writing outputs to an output directory for a single experiment.
 
+    The output directory is only created when the first output is written.
+
+    By default, outputs are written synchronously. With num_writer_threads > 0,
+    the write_* methods instead queue the write on a BackgroundWriter and return
+    immediately; call close() (or use the ExperimentWriter as a context manager)
+    to wait for all outputs and raise any write errors.
+
     Attributes:
-        _output_dir (str): The output directory for the experiment"""
+        _output_dir (str): The output directory for the experiment
+        _background_writer (BackgroundWriter | None): Runs writes in the background,
+            if enabled"""
 
     DEFAULT_OUTPUT_DIR_PROJECT_PATH: str = "rent_buy_invest/out/"
+    # DataFrame output formats; parquet and feather require pyarrow
+    OUTPUT_FORMATS: tuple[str, ...] = ("npz", "csv", "parquet", "feather", "xlsx")
+    DEFAULT_OUTPUT_FORMAT: str = "npz"
 
     def __init__(
-        self, experiment_name: str, output_dir_project_path: str | None = None
+        self,
+        experiment_name: str,
+        output_dir_project_path: str | None = None,
+        num_writer_threads: int = 0,
+        max_pending_writes: int = BackgroundWriter.DEFAULT_MAX_PENDING,
     ) -> None:
         """Initialize ExperimentWriter
 
         Args:
             experiment_name: Name of the experiment; it must contain only alphanumeric characters, "_", and "-"
-            output_dir_project_path: Optional output dir path relative to folder containing rent_buy_invest.
+            output_dir_project_path: Optional output dir path relative to folder containing rent_buy_invest,
+                or absolute path. Outputs are written to '<output_dir_project_path>/<experiment_name>/<timestamp>'.
                 If not provided, ExperimentWriter.DEFAULT_OUTPUT_DIR_PROJECT_PATH is used
+            num_writer_threads: Number of background threads for writing outputs; if 0, outputs are
+                written synchronously
+            max_pending_writes: Maximum number of queued background writes before write_* methods block
         """
         assert all(
             c.isalpha() or c.isdigit() or c in "_-" for c in experiment_name
@@ -36,35 +64,175 @@ class ExperimentWriter:
             else ExperimentWriter.DEFAULT_OUTPUT_DIR_PROJECT_PATH
         )
         self._output_dir = os.path.join(
-            ExperimentWriter.DEFAULT_OUTPUT_DIR_PROJECT_PATH,
+            output_dir_project_path,
             experiment_name,
             timestamp_str,
         )
-        io_utils.make_dirs(self._output_dir)
+        assert num_writer_threads >= 0, "num_writer_threads must be non-negative"
+        self._background_writer = (
+            BackgroundWriter(num_writer_threads, max_pending_writes)
+            if num_writer_threads > 0
+            else None
+        )
+
+    @property
+    def output_dir(self) -> str:
+        """Project path of the output directory, which may not exist yet."""
+        return self._output_dir
+
+    def __enter__(self) -> "ExperimentWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _write(self, write_fn: Callable[..., None], *args: Any, **kwargs: Any) -> None:
+        if self._background_writer:
+            self._background_writer.submit(write_fn, *args, **kwargs)
+        else:
+            write_fn(*args, **kwargs)
+
+    def flush(self) -> None:
+        """Waits until all queued outputs are written; raises the first write error, if any."""
+        if self._background_writer:
+            self._background_writer.flush()
+
+    def close(self) -> None:
+        """Writes all queued outputs and stops the background threads; raises the first write error, if any."""
+        if self._background_writer:
+            self._background_writer.close()
 
     def write_yaml(self, filename: str, obj: Any) -> None:
         path = os.path.join(self._output_dir, filename)
-        io_utils.write_yaml(path, obj)
+        self._write(io_utils.write_yaml, path, obj)
 
     def write_xlsx_df(self, filename: str, df: pd.DataFrame, num_header_rows=0) -> None:
-        # TODO move some of this to io_utils xlsx writing method... and make some of this parametrizable or auto-set
+        """Writes DataFrame as a currency-formatted xlsx file in a single pass.
+
+        Args:
+            filename: Name of the file, ending in '.xlsx'
+            df: DataFrame to write
+            num_header_rows: Number of rows at the top which stay visible when scrolling
+        """
         path = os.path.join(self._output_dir, filename)
-        io_utils.write_xlsx_df(path, df)
-        # Convert to absolute path for openpyxl since it doesn't use get_abs_path()
-        abs_path = io_utils.get_abs_path(path)
-        wb = openpyxl.load_workbook(abs_path)
-        ws = wb["Sheet1"]
-        ws.column_dimensions["A"].width = 15
-        ws.freeze_panes = f"B{num_header_rows+1}"
-        max_num_cols_with_data = 14
-        for i in range(max_num_cols_with_data):
-            col_name = chr(ord("B") + i)
-            # ws.column_dimensions[col_name].number_format = "$#,##0.00"
-            ws.column_dimensions[col_name].width = 18
-            for header_row in range(1, num_header_rows + 1):
-                ws[f"{col_name}{header_row}"].alignment = openpyxl.styles.Alignment(
-                    horizontal="left"
-                )
-            for cell in ws[col_name]:
-                cell.number_format = "$#,##0.00"
-        wb.save(abs_path)
+        self._write(
+            io_utils.write_formatted_xlsx_df,
+            path,
+            df,
+            number_format="$#,##0.00",
+            index_width=15,
+            column_width=18,
+            freeze_panes=f"B{num_header_rows+1}",
+        )
+
+    def write_df(
+        self,
+        name: str,
+        df: pd.DataFrame,
+        output_format: str = DEFAULT_OUTPUT_FORMAT,
+        num_header_rows: int = 0,
+    ) -> None:
+        """Writes DataFrame to '<name>.<output_format>'.
+
+        The binary formats (npz, parquet, feather) are fast to write and load, and
+        preserve dtypes and multi-index columns exactly; use io_utils.read_df to
+        load any of the formats except xlsx, which is meant for viewing.
+
+        Args:
+            name: Name of the file without extension
+            df: DataFrame to write
+            output_format: One of ExperimentWriter.OUTPUT_FORMATS
+            num_header_rows: Number of column header rows; only used for xlsx (see write_xlsx_df)
+        """
+        assert (
+            output_format in ExperimentWriter.OUTPUT_FORMATS
+        ), f"Output format must be one of {ExperimentWriter.OUTPUT_FORMATS}; received '{output_format}'"
+        filename = f"{name}.{output_format}"
+        if output_format == "xlsx":
+            self.write_xlsx_df(filename, df, num_header_rows=num_header_rows)
+            return
+        writers = {
+            "npz": io_utils.write_npz_df,
+            "csv": io_utils.write_csv_df,
+            "parquet": io_utils.write_parquet_df,
+            "feather": io_utils.write_feather_df,
+        }
+        self._write(
+            writers[output_format], os.path.join(self._output_dir, filename), df
+        )
+
+    def write_result(
+        self,
+        experiment_config: ExperimentConfig,
+        result: ExperimentResult,
+        output_formats: Iterable[str] = (DEFAULT_OUTPUT_FORMAT,),
+        phase_timer: PhaseTimer | None = None,
+    ) -> None:
+        """Writes the configs and the initial state, projection, and final state.
+
+        Same as write_configs followed by write_outputs.
+
+        Args:
+            experiment_config: Config of the experiment, written to 'configs.yaml'
+            result: Result of the experiment
+            output_formats: Formats of the DataFrame outputs (see write_df)
+            phase_timer: See write_configs and write_outputs
+        """
+        self.write_configs(experiment_config, phase_timer)
+        self.write_outputs(result, output_formats, phase_timer)
+
+    def write_configs(
+        self,
+        experiment_config: ExperimentConfig,
+        phase_timer: PhaseTimer | None = None,
+    ) -> None:
+        """Writes the configs of the experiment to 'configs.yaml'.
+
+        With background writes, this can be called before the result is calculated,
+        so that the configs are written while it is being calculated.
+
+        Args:
+            experiment_config: Config of the experiment
+            phase_timer: If given, times writing the configs ('write_configs'),
+                waiting for the background write
+        """
+        with maybe_phase(phase_timer, "write_configs"):
+            self.write_yaml("configs.yaml", experiment_config)
+            if phase_timer:
+                self.flush()
+
+    def write_outputs(
+        self,
+        result: ExperimentResult,
+        output_formats: Iterable[str] = (DEFAULT_OUTPUT_FORMAT,),
+        phase_timer: PhaseTimer | None = None,
+    ) -> None:
+        """Writes the initial state, projection, and final state.
+
+        Args:
+            result: Result of the experiment
+            output_formats: Formats of the DataFrame outputs (see write_df)
+            phase_timer: If given, times writing each format (e.g., 'write_xlsx').
+                Each phase waits for its background writes, so writes no longer
+                overlap with each other.
+        """
+        for output_format in output_formats:
+            with maybe_phase(phase_timer, f"write_{output_format}"):
+                self._write_result_dfs(result, output_format)
+                if phase_timer:
+                    self.flush()
+
+    def _write_result_dfs(self, result: ExperimentResult, output_format: str) -> None:
+        self.write_df(
+            "initial_state",
+            result.initial_state.get_df(),
+            output_format,
+            num_header_rows=1,
+        )
+        self.write_df("projection", result.projection, output_format, num_header_rows=2)
+        self.write_df(
+            "final_state",
+            result.final_state.get_df(),
+            output_format,
+            num_header_rows=1,
+        )
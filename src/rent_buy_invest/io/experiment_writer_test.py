@@ -1,5 +1,9 @@
+import os
+
+import pandas as pd
 import pytest
 
+from rent_buy_invest.io import io_utils
 from rent_buy_invest.io.experiment_writer import ExperimentWriter
 
 
@@ -10,3 +14,66 @@ class TestExperimentWriter:
         with pytest.raises(AssertionError):
             ExperimentWriter("invalid/slash")
         experiment_writer = ExperimentWriter("TestExperimentWriter_test")
+        # the output directory is only created by the first write
+        assert not os.path.exists(io_utils.get_abs_path(experiment_writer.output_dir))
+
+    def test_output_dir(self, tmp_path) -> None:
+        experiment_writer = ExperimentWriter(
+            "TestExperimentWriter_test", output_dir_project_path=str(tmp_path)
+        )
+        assert experiment_writer.output_dir.startswith(
+            str(tmp_path / "TestExperimentWriter_test")
+        )
+        experiment_writer.write_yaml("obj.yaml", {"a": 1})
+        assert io_utils.read_yaml(
+            os.path.join(experiment_writer.output_dir, "obj.yaml")
+        ) == {"a": 1}
+
+    def test_write_df(self, tmp_path) -> None:
+        experiment_writer = ExperimentWriter(
+            "TestExperimentWriter_test", output_dir_project_path=str(tmp_path)
+        )
+        exp = pd.DataFrame(
+            {("Buy", "col1"): [1.5, 2.5], ("Rent", "col1"): [3, 4]}, index=["a", "b"]
+        )
+        experiment_writer.write_df("df", exp)
+        act = io_utils.read_df(os.path.join(experiment_writer._output_dir, "df.npz"))
+        assert act.equals(exp)
+        experiment_writer.write_df("df", exp, "xlsx", num_header_rows=2)
+        assert os.path.isfile(
+            io_utils.get_abs_path(
+                os.path.join(experiment_writer._output_dir, "df.xlsx")
+            )
+        )
+        with pytest.raises(AssertionError):
+            experiment_writer.write_df("df", exp, "pickle")
+
+    def test_background_writes(self, tmp_path) -> None:
+        exp = pd.DataFrame({"col1": [1.5, 2.5]}, index=["a", "b"])
+        with ExperimentWriter(
+            "TestExperimentWriter_test",
+            output_dir_project_path=str(tmp_path),
+            num_writer_threads=2,
+        ) as experiment_writer:
+            experiment_writer.write_yaml("obj.yaml", {"a": 1})
+            for i in range(5):
+                experiment_writer.write_df(f"df_{i}", exp)
+        assert io_utils.read_yaml(
+            os.path.join(experiment_writer._output_dir, "obj.yaml")
+        ) == {"a": 1}
+        for i in range(5):
+            act = io_utils.read_df(
+                os.path.join(experiment_writer._output_dir, f"df_{i}.npz")
+            )
+            assert act.equals(exp)
+
+        # write errors are raised in the calling thread
+        with pytest.raises(OSError):
+            with ExperimentWriter(
+                "TestExperimentWriter_test",
+                output_dir_project_path=str(tmp_path),
+                num_writer_threads=1,
+            ) as experiment_writer:
+                experiment_writer.write_yaml("obj.yaml", {"a": 1})
+                # the parent "directory" is a file
+                experiment_writer.write_df("obj.yaml/df", exp)
@@ -1,17 +1,34 @@
+from __future__ import annotations
+
+import functools
+import glob
 import json
 import os
 import shutil
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-import pandas as pd
 import yaml
 
+from rent_buy_invest.utils import data_utils
+
+# numpy, pandas, and openpyxl are slow to import, so they are only imported by the
+# functions that use them (see main_test.py)
+if TYPE_CHECKING:
+    import pandas as pd
+    from openpyxl.cell import WriteOnlyCell
+
+# Use the libyaml based loader if PyYAML was built with libyaml; it is much faster
+# than the pure python loader and constructs the same objects
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 def get_abs_path(project_path: str) -> str:
     """Returns the absolute path given relative path.
 
     Args:
-        project_path (str): path starting with 'rent_buy_invest' directory.
+        project_path (str): path starting with 'rent_buy_invest' directory, or an
+            absolute path (e.g., to write outputs outside of the package), which is
+            returned unchanged.
 
     Returns:
         str: absolute path
@@ -19,7 +36,11 @@ def get_abs_path(project_path: str) -> str:
     Examples:
     >>> get_abs_path("rent_buy_invest/configs")
     '/Users/FooBarUser/rent_buy_invest/configs'
+    >>> get_abs_path("/tmp/out")
+    '/tmp/out'
     """
+    if os.path.isabs(project_path):
+        return project_path
     if not project_path.startswith("rent_buy_invest"):
         raise ValueError(f"Invalid project_path: {project_path}")
     dir_containing_top_level_dir = os.path.join(
@@ -29,6 +50,34 @@ def get_abs_path(project_path: str) -> str:
     return os.path.join(os.path.abspath(dir_containing_top_level_dir), project_path)
 
 
+def glob_project_paths(project_pattern: str) -> list[str]:
+    """Returns the sorted project paths of files matching the given pattern.
+
+    Args:
+        project_pattern (str): glob pattern starting with 'rent_buy_invest' directory;
+            "**" matches any number of directories. Absolute patterns match
+            absolute paths.
+
+    Examples:
+    >>> glob_project_paths("rent_buy_invest/configs/examples/*/experiment-config.yaml")
+    ['rent_buy_invest/configs/examples/apples-to-apples/experiment-config.yaml', 'rent_buy_invest/configs/examples/example-1/experiment-config.yaml']
+    """
+    if os.path.isabs(project_pattern):
+        return sorted(
+            path
+            for path in glob.glob(project_pattern, recursive=True)
+            if os.path.isfile(path)
+        )
+    abs_dir_containing_top_level_dir = get_abs_path("rent_buy_invest")[
+        : -len("rent_buy_invest")
+    ]
+    return sorted(
+        os.path.relpath(abs_path, abs_dir_containing_top_level_dir)
+        for abs_path in glob.glob(get_abs_path(project_pattern), recursive=True)
+        if os.path.isfile(abs_path)
+    )
+
+
 class RentBuyInvestFileOpener:
     """File opener that takes in project path (relative to rent_buy_invest) and
     automatically handles making any directories in the path.
@@ -63,10 +112,21 @@ def delete_dir(project_path: str) -> None:
     shutil.rmtree(get_abs_path(project_path))
 
 
+def read_bytes(project_path: str) -> bytes:
+    """Read the raw contents of the file given by path (from 'rent_buy_invest' directory)."""
+    with RentBuyInvestFileOpener(project_path, mode="rb") as f:
+        return f.read()
+
+
+def load_yaml(content: str | bytes) -> dict[str, Any] | list:
+    """Load yaml from a string (or bytes) instead of a file."""
+    return yaml.load(content, Loader=YAML_LOADER)
+
+
 def read_yaml(project_path: str) -> dict[str, Any] | list:
     """Load yaml given by path (from 'rent_buy_invest' directory) as dictionary."""
     with RentBuyInvestFileOpener(project_path, mode="r") as f:
-        general_config: dict[str, Any] = yaml.load(f, Loader=yaml.SafeLoader)
+        general_config: dict[str, Any] = yaml.load(f, Loader=YAML_LOADER)
     return general_config
 
 
@@ -91,6 +151,265 @@ def write_xlsx_df(project_path: str, df: pd.DataFrame) -> None:
     df.to_excel(abs_path)
 
 
+@functools.cache
+def _get_xlsx_header_styles() -> dict[str, Any]:
+    """Returns the same look as the header and index cells written by pandas'
+    DataFrame.to_excel, except that column headers are left aligned."""
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    thin_side = Side(style="thin")
+    return {
+        "font": Font(bold=True),
+        "border": Border(
+            left=thin_side, right=thin_side, top=thin_side, bottom=thin_side
+        ),
+        "column_header_alignment": Alignment(horizontal="left"),
+        "index_alignment": Alignment(horizontal="center", vertical="top"),
+    }
+
+
+def _get_xlsx_header_cell(ws: Any, value: Any, is_index: bool) -> WriteOnlyCell:
+    from openpyxl.cell import WriteOnlyCell
+
+    styles = _get_xlsx_header_styles()
+    cell = WriteOnlyCell(ws, value)
+    cell.font = styles["font"]
+    cell.border = styles["border"]
+    cell.alignment = styles[
+        "index_alignment" if is_index else "column_header_alignment"
+    ]
+    return cell
+
+
+def _to_xlsx_value(value: Any) -> Any:
+    # pandas writes missing values as empty cells
+    return None if isinstance(value, float) and value != value else value
+
+
+def write_formatted_xlsx_df(
+    project_path: str,
+    df: pd.DataFrame,
+    number_format: str | None = None,
+    index_width: float | None = None,
+    column_width: float | None = None,
+    freeze_panes: str | None = None,
+) -> None:
+    """Write DataFrame with formatting to given path (from the 'rent_buy_invest' directory) as an xlsx file.
+
+    The workbook is streamed to disk in a single pass (openpyxl write-only mode), so
+    unlike formatting the output of write_xlsx_df, the file is never read back or
+    saved twice. The layout matches DataFrame.to_excel, so the file can be read with
+    pd.read_excel(..., index_col=0, header=list(range(df.columns.nlevels))). The
+    one difference is that repeated labels of multi-index columns are written once
+    (in the first column they apply to) instead of as merged cells, which write-only
+    mode does not support.
+
+    Args:
+        project_path: Path ending in '.xlsx'
+        df: DataFrame with a single-level index
+        number_format: Excel number format for all data cells (e.g., "$#,##0.00")
+        index_width: Width of the index column
+        column_width: Width of every data column
+        freeze_panes: Top-left cell of the scrollable area (e.g., "B3")
+    """
+    import openpyxl
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.utils import get_column_letter
+
+    assert (
+        df.index.nlevels == 1
+    ), "Only DataFrames with a single-level index are supported"
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    # column widths and frozen panes must be set before any rows are written
+    if index_width is not None:
+        ws.column_dimensions["A"].width = index_width
+    if column_width is not None:
+        for i in range(df.shape[1]):
+            ws.column_dimensions[get_column_letter(i + 2)].width = column_width
+    if freeze_panes is not None:
+        ws.freeze_panes = freeze_panes
+
+    # column header rows; for a multi-index, each level has a row starting with the
+    # level name, followed by a row for the index name
+    is_multi_index = df.columns.nlevels > 1
+    for level in range(df.columns.nlevels):
+        labels = df.columns.get_level_values(level).tolist()
+        level_name = df.columns.names[level]
+        first_cell = (
+            _get_xlsx_header_cell(ws, level_name, is_index=True)
+            if is_multi_index
+            else _get_xlsx_header_cell(ws, df.index.name, is_index=True)
+            if df.index.name is not None
+            else None
+        )
+        row = [first_cell]
+        for i, label in enumerate(labels):
+            # like merged cells, only label the first column of a run of equal labels
+            # in the upper levels
+            is_repeated = (
+                level < df.columns.nlevels - 1
+                and i > 0
+                and df.columns[i][: level + 1] == df.columns[i - 1][: level + 1]
+            )
+            row.append(
+                None
+                if is_repeated
+                else _get_xlsx_header_cell(ws, label, is_index=False)
+            )
+        ws.append(row)
+    if is_multi_index:
+        ws.append(
+            [
+                _get_xlsx_header_cell(ws, df.index.name, is_index=True)
+                if df.index.name is not None
+                else None
+            ]
+        )
+
+    # data rows
+    columns = [df.iloc[:, i].tolist() for i in range(df.shape[1])]
+    for index_value, values in zip(df.index.tolist(), zip(*columns)):
+        row = [_get_xlsx_header_cell(ws, index_value, is_index=True)]
+        for value in values:
+            cell = WriteOnlyCell(ws, _to_xlsx_value(value))
+            if number_format is not None:
+                cell.number_format = number_format
+            row.append(cell)
+        ws.append(row)
+    with RentBuyInvestFileOpener(project_path, mode="wb") as f:
+        wb.save(f)
+
+
+def write_npz_df(project_path: str, df: pd.DataFrame) -> None:
+    """Write DataFrame to given path (from the 'rent_buy_invest' directory) as a compressed numpy archive.
+
+    Every column is stored as its own array (see data_utils.df_to_arrays), so the
+    column dtypes and (multi-index) column labels are preserved and the file loads
+    without pickling. project_path should end in '.npz'
+    """
+    import numpy as np
+
+    with RentBuyInvestFileOpener(project_path, mode="wb") as f:
+        np.savez_compressed(f, **data_utils.df_to_arrays(df))
+
+
+def read_npz_df(project_path: str) -> pd.DataFrame:
+    """Inverse of write_npz_df."""
+    import numpy as np
+
+    with np.load(get_abs_path(project_path)) as npz:
+        return data_utils.arrays_to_df(npz)
+
+
+def write_csv_df(project_path: str, df: pd.DataFrame) -> None:
+    """Write DataFrame to given path (from the 'rent_buy_invest' directory) as csv.
+
+    Multi-index columns are written as one header row per level. project_path
+    should end in '.csv'
+    """
+    with RentBuyInvestFileOpener(project_path, mode="w") as f:
+        df.to_csv(f)
+
+
+def read_csv_df(project_path: str, num_header_rows: int = 1) -> pd.DataFrame:
+    """Inverse of write_csv_df.
+
+    Args:
+        project_path: Path ending in '.csv'
+        num_header_rows: Number of column levels of the written DataFrame
+    """
+    import pandas as pd
+
+    header = list(range(num_header_rows)) if num_header_rows > 1 else 0
+    # round_trip parses floats exactly as written, like the binary formats
+    return pd.read_csv(
+        get_abs_path(project_path),
+        header=header,
+        index_col=0,
+        float_precision="round_trip",
+    )
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError(
+            "The parquet and feather formats require pyarrow; run 'pip install pyarrow'"
+        ) from e
+    return pyarrow
+
+
+def write_parquet_df(project_path: str, df: pd.DataFrame) -> None:
+    """Write DataFrame to given path (from the 'rent_buy_invest' directory) as parquet.
+
+    Requires pyarrow. The index and multi-index columns are preserved.
+    project_path should end in '.parquet'
+    """
+    _import_pyarrow()
+    with RentBuyInvestFileOpener(project_path, mode="wb") as f:
+        df.to_parquet(f)
+
+
+def read_parquet_df(project_path: str) -> pd.DataFrame:
+    """Inverse of write_parquet_df."""
+    import pandas as pd
+
+    _import_pyarrow()
+    return pd.read_parquet(get_abs_path(project_path))
+
+
+def write_feather_df(project_path: str, df: pd.DataFrame) -> None:
+    """Write DataFrame to given path (from the 'rent_buy_invest' directory) as feather.
+
+    Requires pyarrow. Unlike DataFrame.to_feather, the index and multi-index
+    columns are preserved. project_path should end in '.feather'
+    """
+    pyarrow = _import_pyarrow()
+    from pyarrow import feather
+
+    with RentBuyInvestFileOpener(project_path, mode="wb") as f:
+        feather.write_feather(pyarrow.Table.from_pandas(df), f)
+
+
+def read_feather_df(project_path: str) -> pd.DataFrame:
+    """Inverse of write_feather_df."""
+    _import_pyarrow()
+    from pyarrow import feather
+
+    return feather.read_feather(get_abs_path(project_path))
+
+
+def read_df(project_path: str, num_header_rows: int = 1) -> pd.DataFrame:
+    """Read a DataFrame written by write_npz_df, write_csv_df, write_parquet_df, or write_feather_df.
+
+    The format is determined by the file extension.
+
+    Args:
+        project_path: Path ending in '.npz', '.csv', '.parquet', or '.feather'
+        num_header_rows: Number of column levels; only needed for csv files, since
+            the other formats store the column levels
+    """
+    extension = os.path.splitext(project_path)[1]
+    if extension == ".csv":
+        return read_csv_df(project_path, num_header_rows=num_header_rows)
+    readers = {
+        ".npz": read_npz_df,
+        ".parquet": read_parquet_df,
+        ".feather": read_feather_df,
+    }
+    assert (
+        extension in readers
+    ), f"Cannot read DataFrame from '{project_path}'; unsupported extension '{extension}'"
+    return readers[extension](project_path)
+
+
 def read_json(project_path: str) -> dict | list:
     with RentBuyInvestFileOpener(project_path, mode="r") as f:
         return json.load(f)
+
+
+def write_json(project_path: str, obj: Any) -> None:
+    with RentBuyInvestFileOpener(project_path, mode="w") as f:
+        json.dump(obj, f, indent=2)
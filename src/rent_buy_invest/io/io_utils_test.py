@@ -1,6 +1,8 @@
 import os
 
+import openpyxl
 import pandas as pd
+import pytest
 
 from rent_buy_invest.io import io_utils
 
@@ -24,6 +26,15 @@ def test_get_abs_path() -> None:
     assert actual in expected
 
 
+def test_absolute_paths(tmp_path) -> None:
+    assert io_utils.get_abs_path(str(tmp_path)) == str(tmp_path)
+    io_utils.write_yaml(str(tmp_path / "a" / "obj.yaml"), EXPECTED_TEST_VALUE)
+    assert io_utils.read_yaml(str(tmp_path / "a" / "obj.yaml")) == EXPECTED_TEST_VALUE
+    assert io_utils.glob_project_paths(str(tmp_path / "**" / "*.yaml")) == [
+        str(tmp_path / "a" / "obj.yaml")
+    ]
+
+
 def test_make_dirs_and_remove_dirs() -> None:
     project_path_dir = "rent_buy_invest/temp/test_dir/"
     io_utils.make_dirs(project_path_dir)
@@ -59,6 +70,13 @@ def test_read_yaml_and_write_yaml() -> None:
     io_utils.delete_dir(dir)
 
 
+def test_read_bytes_and_load_yaml() -> None:
+    content = io_utils.read_bytes(TEST_YAML_PATH)
+    assert isinstance(content, bytes)
+    assert io_utils.load_yaml(content) == EXPECTED_TEST_VALUE
+    assert io_utils.load_yaml(content.decode()) == EXPECTED_TEST_VALUE
+
+
 def test_write_xlsx_df() -> None:
     dir = f"rent_buy_invest/temp/test_write_xlsx_df"
     project_path = f"{dir}/test_write_xlsx_df.xlsx"
@@ -89,6 +107,90 @@ def test_write_xlsx_df() -> None:
     io_utils.delete_dir(dir)
 
 
+def test_write_formatted_xlsx_df() -> None:
+    dir = "rent_buy_invest/temp/test_write_formatted_xlsx_df"
+    project_path = f"{dir}/test_write_formatted_xlsx_df.xlsx"
+
+    # test basic DataFrame
+    exp = pd.DataFrame(
+        {
+            "col1": [1.5, 2.0],
+            "col2": [3, 4],
+        },
+        index=["row1", "row2"],
+    )
+    io_utils.write_formatted_xlsx_df(
+        project_path, exp, number_format="$#,##0.00", freeze_panes="B2"
+    )
+    act = pd.read_excel(io_utils.get_abs_path(project_path), index_col=0)
+    assert act.equals(exp)
+    ws = openpyxl.load_workbook(io_utils.get_abs_path(project_path)).active
+    assert ws.freeze_panes == "B2"
+    assert ws["B1"].font.b
+    assert ws["A2"].font.b
+    assert ws["B2"].number_format == "$#,##0.00"
+
+    # test multi-index column; written in the same layout as DataFrame.to_excel
+    exp = pd.DataFrame(
+        {
+            ("category 1", "col1"): [1.5, 2.0],
+            ("category 1", "col2"): [3.0, float("nan")],
+            ("category 2", "col1"): [5.5, 6.5],
+        }
+    )
+    io_utils.write_formatted_xlsx_df(project_path, exp, column_width=18)
+    act = pd.read_excel(io_utils.get_abs_path(project_path), index_col=0, header=[0, 1])
+    assert act.equals(exp)
+    ws = openpyxl.load_workbook(io_utils.get_abs_path(project_path)).active
+    assert [cell.value for cell in ws[1]] == [None, "category 1", None, "category 2"]
+    assert ws.column_dimensions["D"].width == 18
+
+    io_utils.delete_dir(dir)
+
+
+def _check_write_and_read_df(dir: str, formats: list[str]) -> None:
+    dfs = [
+        pd.DataFrame(
+            {
+                "col1": [1.1, 2.0 / 3.0],
+                "col2": [3, 4],
+            },
+            index=["row1", "row2"],
+        ),
+        pd.DataFrame(
+            {
+                ("category 1", "col1"): [1.1, 2.0 / 3.0],
+                ("category 1", "col2"): [3, 4],
+                ("category 2", "col1"): [5.5, float("nan")],
+            },
+            index=["row1", "row2"],
+        ),
+    ]
+    for exp in dfs:
+        for fmt in formats:
+            project_path = f"{dir}/df.{fmt}"
+            getattr(io_utils, f"write_{fmt}_df")(project_path, exp)
+            act = io_utils.read_df(project_path, num_header_rows=exp.columns.nlevels)
+            assert act.equals(exp), fmt
+            assert act.columns.equals(exp.columns), fmt
+            assert act.index.equals(exp.index), fmt
+
+
+def test_write_and_read_df() -> None:
+    dir = "rent_buy_invest/temp/test_write_and_read_df"
+    _check_write_and_read_df(dir, ["npz", "csv"])
+    with pytest.raises(AssertionError):
+        io_utils.read_df(f"{dir}/df.xlsx")
+    io_utils.delete_dir(dir)
+
+
+def test_write_and_read_df_pyarrow() -> None:
+    pytest.importorskip("pyarrow")
+    dir = "rent_buy_invest/temp/test_write_and_read_df_pyarrow"
+    _check_write_and_read_df(dir, ["parquet", "feather"])
+    io_utils.delete_dir(dir)
+
+
 def test_read_json() -> None:
     # simple custom test case
     actual = io_utils.read_yaml(TEST_JSON_PATH)
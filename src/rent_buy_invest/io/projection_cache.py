@@ -0,0 +1,133 @@
+import dataclasses
+import os
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.core.final_state import FinalState
+from rent_buy_invest.core.initial_state import InitialState
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.utils import data_utils
+
+_PROJECTION_PREFIX = "projection_"
+
+
+class ProjectionCache:
+    """Content-addressed on-disk cache of experiment results.
+
+    Each entry is a single compressed .npz file named after the hash of the fully
+    parsed experiment config (i.e., the contents of the sub-configs, not their
+    paths) and ENGINE_VERSION, so editing any config file or changing the engine
+    results in a miss. The cache is size-bounded: whenever an entry is added,
+    least recently used entries are evicted until the total size is at most
+    max_bytes. A file's mtime is its last use time.
+
+    Attributes:
+        _cache_dir (str): Project path of the cache directory
+        _max_bytes (int): Maximum total size of the cache in bytes
+    """
+
+    DEFAULT_CACHE_DIR_PROJECT_PATH: str = "rent_buy_invest/cache/projections/"
+    DEFAULT_MAX_BYTES: int = 256 * 1024 * 1024
+
+    def __init__(
+        self,
+        cache_dir_project_path: str | None = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Initialize ProjectionCache
+
+        Args:
+            cache_dir_project_path: Optional cache dir path relative to folder containing rent_buy_invest.
+                If not provided, ProjectionCache.DEFAULT_CACHE_DIR_PROJECT_PATH is used
+            max_bytes: Maximum total size of the cache in bytes
+        """
+        assert max_bytes > 0, "max_bytes must be positive"
+        self._cache_dir = (
+            cache_dir_project_path
+            if cache_dir_project_path
+            else ProjectionCache.DEFAULT_CACHE_DIR_PROJECT_PATH
+        )
+        self._max_bytes = max_bytes
+        io_utils.make_dirs(self._cache_dir)
+
+    def _get_abs_path(self, key: str) -> str:
+        return io_utils.get_abs_path(os.path.join(self._cache_dir, f"{key}.npz"))
+
+    def get(
+        self, experiment_config: ExperimentConfig, fixed_point: bool = False
+    ) -> ExperimentResult | None:
+        """Returns the cached result for the given config (calculated in fixed point
+        if fixed_point), or None on a miss."""
+        import numpy as np
+
+        abs_path = self._get_abs_path(
+            ExperimentResult.get_cache_key(experiment_config, fixed_point)
+        )
+        try:
+            with np.load(abs_path) as npz:
+                arrays = dict(npz)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # corrupt or partially written entry; drop it and treat it as a miss
+            os.remove(abs_path)
+            return None
+        # mark as most recently used
+        os.utime(abs_path)
+        projection = data_utils.arrays_to_df(
+            {
+                name[len(_PROJECTION_PREFIX) :]: array
+                for name, array in arrays.items()
+                if name.startswith(_PROJECTION_PREFIX)
+            }
+        )
+        return ExperimentResult(
+            initial_state=InitialState(*arrays["initial_state"].tolist()),
+            projection=projection,
+            final_state=FinalState(*arrays["final_state"].tolist()),
+        )
+
+    def put(
+        self,
+        experiment_config: ExperimentConfig,
+        result: ExperimentResult,
+        fixed_point: bool = False,
+    ) -> None:
+        """Stores the result for the given config (calculated in fixed point if
+        fixed_point), then evicts LRU entries if needed."""
+        import numpy as np
+
+        abs_path = self._get_abs_path(
+            ExperimentResult.get_cache_key(experiment_config, fixed_point)
+        )
+        arrays = {
+            f"{_PROJECTION_PREFIX}{name}": array
+            for name, array in data_utils.df_to_arrays(result.projection).items()
+        }
+        arrays["initial_state"] = np.array(dataclasses.astuple(result.initial_state))
+        arrays["final_state"] = np.array(dataclasses.astuple(result.final_state))
+        # write to a temporary file first so that readers never see a partial entry
+        tmp_abs_path = f"{abs_path}.{os.getpid()}.tmp"
+        with open(tmp_abs_path, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmp_abs_path, abs_path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Deletes least recently used entries until the cache fits in max_bytes."""
+        abs_dir = io_utils.get_abs_path(self._cache_dir)
+        entries = []
+        for entry in os.scandir(abs_dir):
+            if entry.is_file() and entry.name.endswith(".npz"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_bytes <= self._max_bytes:
+                break
+            os.remove(path)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        io_utils.delete_dir(self._cache_dir)
+        io_utils.make_dirs(self._cache_dir)
@@ -0,0 +1,68 @@
+import copy
+import os
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.experiment_config_test import TestExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.io.projection_cache import ProjectionCache
+
+EXPERIMENT_CONFIG = ExperimentConfig.parse(TestExperimentConfig.TEST_CONFIG_PATH)
+RESULT = ExperimentResult.from_config(EXPERIMENT_CONFIG)
+
+
+class TestProjectionCache:
+    CACHE_DIR = "rent_buy_invest/temp/test_projection_cache"
+
+    def test_get_and_put(self) -> None:
+        cache = ProjectionCache(TestProjectionCache.CACHE_DIR)
+        assert cache.get(EXPERIMENT_CONFIG) is None
+        cache.put(EXPERIMENT_CONFIG, RESULT)
+        act = cache.get(EXPERIMENT_CONFIG)
+        assert act.initial_state == RESULT.initial_state
+        assert act.final_state == RESULT.final_state
+        assert act.projection.equals(RESULT.projection)
+
+        # any change to the parsed config contents is a miss
+        modified_config = copy.deepcopy(EXPERIMENT_CONFIG)
+        modified_config.rent_config.monthly_rent += 1
+        assert cache.get(modified_config) is None
+        io_utils.delete_dir(TestProjectionCache.CACHE_DIR)
+
+    def test_corrupt_entry_is_a_miss(self) -> None:
+        cache = ProjectionCache(TestProjectionCache.CACHE_DIR)
+        key = ExperimentResult.get_cache_key(EXPERIMENT_CONFIG)
+        abs_path = io_utils.get_abs_path(f"{TestProjectionCache.CACHE_DIR}/{key}.npz")
+        with open(abs_path, "w") as f:
+            f.write("not an npz file")
+        assert cache.get(EXPERIMENT_CONFIG) is None
+        assert not os.path.exists(abs_path)
+        io_utils.delete_dir(TestProjectionCache.CACHE_DIR)
+
+    def test_lru_eviction(self) -> None:
+        cache = ProjectionCache(TestProjectionCache.CACHE_DIR)
+        cache.put(EXPERIMENT_CONFIG, RESULT)
+        abs_dir = io_utils.get_abs_path(TestProjectionCache.CACHE_DIR)
+        entry_size = sum(entry.stat().st_size for entry in os.scandir(abs_dir))
+
+        # room for only two entries
+        cache = ProjectionCache(TestProjectionCache.CACHE_DIR, max_bytes=2 * entry_size)
+        configs = [EXPERIMENT_CONFIG]
+        for i in range(1, 3):
+            config = copy.deepcopy(EXPERIMENT_CONFIG)
+            config.personal_config.ordinary_income += i
+            configs.append(config)
+        cache.put(configs[1], RESULT)
+        # use the first entry so that the second is least recently used
+        os.utime(
+            io_utils.get_abs_path(
+                f"{TestProjectionCache.CACHE_DIR}/{ExperimentResult.get_cache_key(configs[1])}.npz"
+            ),
+            ns=(0, 0),
+        )
+        assert cache.get(configs[0]) is not None
+        cache.put(configs[2], RESULT)
+        assert cache.get(configs[0]) is not None
+        assert cache.get(configs[1]) is None
+        assert cache.get(configs[2]) is not None
+        io_utils.delete_dir(TestProjectionCache.CACHE_DIR)
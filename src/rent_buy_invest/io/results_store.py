@@ -0,0 +1,394 @@
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import operator
+import os
+import re
+import sqlite3
+from typing import TYPE_CHECKING, Any
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.core.calculator import ENGINE_VERSION
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.core.final_state import FinalState
+from rent_buy_invest.core.initial_state import InitialState
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.utils import hash_utils
+from rent_buy_invest.utils.math_utils import MONTHS_PER_YEAR
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# runs table column -> attribute path in ExperimentConfig; these are the fields
+# usually swept over, so each gets its own (indexed) column
+KEY_CONFIG_FIELDS: dict[str, str] = {
+    "num_years": "num_years",
+    "start_date": "start_date",
+    "sale_price": "buy_config.sale_price",
+    "down_payment_fraction": "buy_config.down_payment_fraction",
+    "mortgage_annual_interest_rate": "buy_config.mortgage_annual_interest_rate",
+    "annual_assessed_value_inflation_rate": "buy_config.annual_assessed_value_inflation_rate",
+    "monthly_rent": "rent_config.monthly_rent",
+    "annual_rent_inflation_rate": "rent_config.annual_rent_inflation_rate",
+    "market_rate_of_return": "market_config.market_rate_of_return",
+    "ordinary_income": "personal_config.ordinary_income",
+}
+INITIAL_STATE_FIELDS: list[str] = [f.name for f in dataclasses.fields(InitialState)]
+FINAL_STATE_FIELDS: list[str] = [f.name for f in dataclasses.fields(FinalState)]
+RUN_COLUMNS: list[str] = (
+    ["id", "experiment_name", "created_at", "engine_version", "fingerprint"]
+    + list(KEY_CONFIG_FIELDS)
+    + ["config_json"]
+    + INITIAL_STATE_FIELDS
+    + FINAL_STATE_FIELDS
+    + ["wealth_difference"]
+)
+# SQLite type of each runs column
+RUN_COLUMN_TYPES: dict[str, str] = {
+    column: {
+        "id": "INTEGER",
+        "experiment_name": "TEXT",
+        "created_at": "TEXT",
+        "engine_version": "INTEGER",
+        "fingerprint": "TEXT",
+        "num_years": "INTEGER",
+        "start_date": "TEXT",
+        "config_json": "TEXT",
+    }.get(column, "REAL")
+    for column in RUN_COLUMNS
+}
+# columns returned by ResultsStore.query_runs by default
+DEFAULT_QUERY_COLUMNS: list[str] = (
+    ["id", "experiment_name"]
+    + list(KEY_CONFIG_FIELDS)
+    + FINAL_STATE_FIELDS
+    + ["wealth_difference"]
+)
+# columns of the runs table with an index, besides id
+INDEXED_RUN_COLUMNS: list[str] = (
+    ["fingerprint"] + list(KEY_CONFIG_FIELDS) + ["wealth_difference"]
+)
+
+
+def get_projection_column_name(column: str | tuple[str, ...]) -> str:
+    """Returns the projection_rows column name for a projection column.
+
+    Examples:
+    >>> get_projection_column_name(("Buy", "Invested (Pre-Tax)"))
+    'buy_invested_pre_tax'
+    """
+    name = " ".join(column) if isinstance(column, tuple) else column
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _check_run_column(column: str) -> None:
+    # column names are interpolated into SQL, so only known columns are allowed
+    assert (
+        column in RUN_COLUMNS
+    ), f"'{column}' is not a column of the runs table; valid columns are {RUN_COLUMNS}"
+
+
+def _get_where_clause(
+    filters: dict[str, tuple[Any, Any]] | None
+) -> tuple[str, list[Any]]:
+    conditions = []
+    params = []
+    for column, (low, high) in (filters or {}).items():
+        _check_run_column(column)
+        if low is not None:
+            conditions.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            conditions.append(f"{column} <= ?")
+            params.append(high)
+    where_clause = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    return where_clause, params
+
+
+def _get_config_value(experiment_config: ExperimentConfig, attribute_path: str) -> Any:
+    value = operator.attrgetter(attribute_path)(experiment_config)
+    if isinstance(value, datetime.date):  # also covers datetime.datetime
+        return value.isoformat()
+    return value
+
+
+class ResultsStore:
+    """Stores experiment results in a local SQLite database.
+
+    Each run is one row of the 'runs' table: the config fingerprint, the
+    KEY_CONFIG_FIELDS as individually indexed columns, the full config as JSON,
+    the InitialState and FinalState fields, and wealth_difference (wealth if
+    buying minus wealth if renting). Optionally, the projection at the start of
+    each year (i.e., every 12th month) is stored in the 'projection_rows' table,
+    keyed by (run_id, year), with one column per projection column (see
+    get_projection_column_name).
+
+    Runs are buffered and inserted in batches, each in a single transaction, so
+    adding many runs (e.g., a sweep) is fast. Call flush() or close() (or use the
+    store as a context manager) to insert buffered runs.
+
+    Attributes:
+        _db_path (str): Project path of the database file
+        _batch_size (int): Number of buffered runs which triggers a flush
+        _store_projection (bool): Whether to store annual projection rows
+        _pending (list): Buffered (run row, annual projection) pairs
+    """
+
+    DEFAULT_DB_PROJECT_PATH: str = "rent_buy_invest/out/results.sqlite"
+    DEFAULT_BATCH_SIZE: int = 1000
+
+    def __init__(
+        self,
+        db_project_path: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        store_projection: bool = False,
+    ) -> None:
+        """Initialize ResultsStore, creating the database and tables if needed.
+
+        Args:
+            db_project_path: Optional database path relative to folder containing rent_buy_invest.
+                If not provided, ResultsStore.DEFAULT_DB_PROJECT_PATH is used
+            batch_size: Number of buffered runs which triggers a flush
+            store_projection: If True, also store the annual projection rows of each run
+        """
+        assert batch_size > 0, "batch_size must be positive"
+        self._db_path = (
+            db_project_path if db_project_path else ResultsStore.DEFAULT_DB_PROJECT_PATH
+        )
+        self._batch_size = batch_size
+        self._store_projection = store_projection
+        self._pending: list[tuple[list[Any], pd.DataFrame | None]] = []
+        io_utils.make_dirs(os.path.dirname(self._db_path))
+        # isolation_level=None: transactions are managed explicitly in flush()
+        self._connection = sqlite3.connect(
+            io_utils.get_abs_path(self._db_path), isolation_level=None
+        )
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _create_tables(self) -> None:
+        column_defs = [
+            f"{column} {RUN_COLUMN_TYPES[column]}"
+            + (" PRIMARY KEY" if column == "id" else "")
+            for column in RUN_COLUMNS
+        ]
+        self._connection.execute(
+            f"CREATE TABLE IF NOT EXISTS runs ({', '.join(column_defs)})"
+        )
+        for column in INDEXED_RUN_COLUMNS:
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS runs_{column} ON runs ({column})"
+            )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS projection_rows ("
+            "run_id INTEGER NOT NULL REFERENCES runs (id), "
+            "year INTEGER NOT NULL, "
+            "date TEXT, "
+            "PRIMARY KEY (run_id, year))"
+        )
+
+    def _get_projection_columns(self) -> list[str]:
+        return [
+            row["name"]
+            for row in self._connection.execute("PRAGMA table_info(projection_rows)")
+        ]
+
+    def add(
+        self,
+        experiment_config: ExperimentConfig,
+        result: ExperimentResult,
+        experiment_name: str | None = None,
+    ) -> None:
+        """Buffers a run; flushes once batch_size runs are buffered.
+
+        Args:
+            experiment_config: Config the result was computed from
+            result: Result of the experiment
+            experiment_name: Optional name of the experiment (e.g., the sweep name)
+        """
+        row = [
+            None,  # id is assigned in flush()
+            experiment_name,
+            datetime.datetime.now().isoformat(timespec="seconds"),
+            ENGINE_VERSION,
+            experiment_config.fingerprint(),
+            *[
+                _get_config_value(experiment_config, attribute_path)
+                for attribute_path in KEY_CONFIG_FIELDS.values()
+            ],
+            hash_utils.to_canonical_json(experiment_config.to_dict()),
+            *dataclasses.astuple(result.initial_state),
+            *dataclasses.astuple(result.final_state),
+            result.final_state.wealth_if_buying - result.final_state.wealth_if_renting,
+        ]
+        annual_projection = (
+            result.projection.iloc[::MONTHS_PER_YEAR]
+            if self._store_projection
+            else None
+        )
+        self._pending.append((row, annual_projection))
+        if len(self._pending) >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Inserts all buffered runs in a single transaction.
+
+        If the insert fails (e.g., the database is locked by another writer), the
+        runs stay buffered, so flushing again later still inserts them.
+        """
+        if not self._pending:
+            return
+        pending = self._pending
+        try:
+            # BEGIN IMMEDIATE locks the database, so the ids assigned below can't
+            # collide with another writer's
+            self._connection.execute("BEGIN IMMEDIATE")
+            next_id = (
+                self._connection.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM runs"
+                ).fetchone()[0]
+                + 1
+            )
+            for i, (row, _) in enumerate(pending):
+                row[0] = next_id + i
+            self._connection.executemany(
+                f"INSERT INTO runs ({', '.join(RUN_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(RUN_COLUMNS))})",
+                [row for row, _ in pending],
+            )
+            if self._store_projection:
+                self._insert_projection_rows(pending)
+            self._connection.execute("COMMIT")
+        except BaseException:
+            if self._connection.in_transaction:
+                self._connection.execute("ROLLBACK")
+            raise
+        self._pending = []
+
+    def _insert_projection_rows(
+        self, pending: list[tuple[list[Any], pd.DataFrame | None]]
+    ) -> None:
+        existing_columns = set(self._get_projection_columns())
+        rows_by_columns: dict[tuple[str, ...], list[list[Any]]] = {}
+        for row, annual_projection in pending:
+            columns = tuple(
+                get_projection_column_name(column)
+                for column in annual_projection.columns
+            )
+            for column in columns:
+                if column not in existing_columns:
+                    # the projection columns can change with the engine version
+                    self._connection.execute(
+                        f"ALTER TABLE projection_rows ADD COLUMN {column} REAL"
+                    )
+                    existing_columns.add(column)
+            values = annual_projection.to_numpy().tolist()
+            rows_by_columns.setdefault(columns, []).extend(
+                [row[0], year, str(date), *year_values]
+                for year, (date, year_values) in enumerate(
+                    zip(annual_projection.index, values)
+                )
+            )
+        for columns, rows in rows_by_columns.items():
+            all_columns = ["run_id", "year", "date", *columns]
+            self._connection.executemany(
+                f"INSERT INTO projection_rows ({', '.join(all_columns)}) "
+                f"VALUES ({', '.join('?' * len(all_columns))})",
+                rows,
+            )
+
+    def query_runs(
+        self,
+        filters: dict[str, tuple[Any, Any]] | None = None,
+        columns: list[str] | None = None,
+        order_by: str = "wealth_difference",
+        descending: bool = True,
+        limit: int | None = None,
+    ) -> pd.DataFrame:
+        """Returns stored runs matching the filters, sorted.
+
+        Args:
+            filters: runs column -> (min, max), both inclusive; None for no bound.
+                E.g., {"sale_price": (400000, None)} selects runs with sale_price >= 400000
+            columns: runs columns to return; defaults to DEFAULT_QUERY_COLUMNS
+            order_by: runs column to sort by
+            descending: If True, sort in descending order
+            limit: Maximum number of runs to return (e.g., for the top N)
+
+        Returns:
+            pd.DataFrame: One row per run, with the given columns
+        """
+        import pandas as pd
+
+        columns = columns if columns else DEFAULT_QUERY_COLUMNS
+        for column in columns + [order_by]:
+            _check_run_column(column)
+        where_clause, params = _get_where_clause(filters)
+        sql = (
+            f"SELECT {', '.join(columns)} FROM runs{where_clause} "
+            f"ORDER BY {order_by} {'DESC' if descending else 'ASC'}, id"
+        )
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        self.flush()
+        rows = self._connection.execute(sql, params).fetchall()
+        return pd.DataFrame.from_records([tuple(row) for row in rows], columns=columns)
+
+    def get_pivot(
+        self,
+        index: str,
+        columns: str,
+        values: str = "wealth_difference",
+        filters: dict[str, tuple[Any, Any]] | None = None,
+    ) -> pd.DataFrame:
+        """Returns a grid of values over two runs columns (e.g., sale_price x monthly_rent).
+
+        The grid is aggregated in SQL, so no results are recomputed. Runs with the
+        same (index, columns) values are averaged; use filters to fix the other
+        swept fields.
+
+        Args:
+            index: runs column for the rows of the grid
+            columns: runs column for the columns of the grid
+            values: runs column to aggregate
+            filters: Same as in query_runs
+
+        Returns:
+            pd.DataFrame: Grid of the average values; NaN where there are no runs
+        """
+        import pandas as pd
+
+        for column in (index, columns, values):
+            _check_run_column(column)
+        where_clause, params = _get_where_clause(filters)
+        sql = (
+            f"SELECT {index}, {columns}, AVG({values}) FROM runs{where_clause} "
+            f"GROUP BY {index}, {columns}"
+        )
+        self.flush()
+        rows = self._connection.execute(sql, params).fetchall()
+        df = pd.DataFrame.from_records(
+            [tuple(row) for row in rows], columns=[index, columns, values]
+        )
+        return df.pivot(index=index, columns=columns, values=values)
+
+    def get_num_runs(self) -> int:
+        self.flush()
+        return self._connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def close(self) -> None:
+        """Inserts buffered runs and closes the database connection."""
+        try:
+            self.flush()
+        finally:
+            self._connection.close()
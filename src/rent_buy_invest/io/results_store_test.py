@@ -0,0 +1,211 @@
+import sqlite3
+
+import pytest
+
+from rent_buy_invest.configs.experiment_config import ExperimentConfig
+from rent_buy_invest.configs.experiment_config_test import TestExperimentConfig
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
+from rent_buy_invest.io.results_store import (
+    INDEXED_RUN_COLUMNS,
+    ResultsStore,
+    get_projection_column_name,
+)
+
+DIR = "rent_buy_invest/temp/test_results_store"
+DB_PATH = f"{DIR}/results.sqlite"
+EXPERIMENT_CONFIG = ExperimentConfig.parse(TestExperimentConfig.TEST_CONFIG_PATH)
+
+
+def _get_config(
+    sale_price: float, monthly_rent: float | None = None
+) -> ExperimentConfig:
+    rent_config = EXPERIMENT_CONFIG.rent_config.to_dict()
+    if monthly_rent is not None:
+        rent_config["monthly_rent"] = monthly_rent
+    return EXPERIMENT_CONFIG.with_overrides(
+        buy_config={**EXPERIMENT_CONFIG.buy_config.to_dict(), "sale_price": sale_price},
+        rent_config=rent_config,
+    )
+
+
+def _get_configs_and_results(
+    num_configs: int,
+) -> list[tuple[ExperimentConfig, ExperimentResult]]:
+    configs_and_results = []
+    for i in range(num_configs):
+        config = _get_config(400000.0 + 10000 * i)
+        configs_and_results.append((config, ExperimentResult.from_config(config)))
+    return configs_and_results
+
+
+def write_sweep(db_path: str) -> list[tuple[ExperimentConfig, ExperimentResult]]:
+    """Stores runs over a 3 (sale_price) x 2 (monthly_rent) grid."""
+    configs_and_results = []
+    with ResultsStore(db_path) as results_store:
+        for sale_price in (400000.0, 500000.0, 600000.0):
+            for monthly_rent in (2000.0, 3000.0):
+                config = _get_config(sale_price, monthly_rent)
+                result = ExperimentResult.from_config(config)
+                results_store.add(config, result, "sweep")
+                configs_and_results.append((config, result))
+    return configs_and_results
+
+
+def test_get_projection_column_name() -> None:
+    assert get_projection_column_name(("Buy", "Invested (Pre-Tax)")) == (
+        "buy_invested_pre_tax"
+    )
+    assert get_projection_column_name("Rent: Surplus") == "rent_surplus"
+
+
+class TestResultsStore:
+    def test_add(self) -> None:
+        configs_and_results = _get_configs_and_results(5)
+        with ResultsStore(DB_PATH, batch_size=2) as results_store:
+            for config, result in configs_and_results:
+                results_store.add(config, result, "test")
+            # two full batches have been inserted, the last run is buffered
+            connection = sqlite3.connect(io_utils.get_abs_path(DB_PATH))
+            assert connection.execute("SELECT COUNT(*) FROM runs").fetchone()[0] == 4
+            assert results_store.get_num_runs() == 5
+
+        rows = connection.execute(
+            "SELECT id, experiment_name, fingerprint, sale_price, monthly_rent, "
+            "start_date, wealth_if_renting, wealth_if_buying, wealth_difference "
+            "FROM runs ORDER BY id"
+        ).fetchall()
+        for i, (config, result) in enumerate(configs_and_results):
+            exp = (
+                i + 1,
+                "test",
+                config.fingerprint(),
+                config.buy_config.sale_price,
+                config.rent_config.monthly_rent,
+                config.start_date.isoformat(),
+                result.final_state.wealth_if_renting,
+                result.final_state.wealth_if_buying,
+                result.final_state.wealth_if_buying
+                - result.final_state.wealth_if_renting,
+            )
+            assert rows[i] == exp
+        num_projection_rows = connection.execute(
+            "SELECT COUNT(*) FROM projection_rows"
+        ).fetchone()[0]
+        assert num_projection_rows == 0
+
+        # sweep parameters are indexed
+        index_names = {
+            row[0]
+            for row in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        assert {f"runs_{column}" for column in INDEXED_RUN_COLUMNS} <= index_names
+        plan = connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM runs WHERE sale_price > 420000"
+        ).fetchall()
+        assert "runs_sale_price" in str(plan)
+        connection.close()
+
+        # appending to an existing database continues the ids
+        with ResultsStore(DB_PATH) as results_store:
+            results_store.add(*configs_and_results[0])
+            assert results_store.get_num_runs() == 6
+        io_utils.delete_dir(DIR)
+
+    def test_flush_locked(self) -> None:
+        configs_and_results = _get_configs_and_results(2)
+        with ResultsStore(DB_PATH, batch_size=2) as results_store:
+            # fail right away instead of waiting for the lock
+            results_store._connection.execute("PRAGMA busy_timeout = 0")
+            other_connection = sqlite3.connect(
+                io_utils.get_abs_path(DB_PATH), isolation_level=None
+            )
+            other_connection.execute("BEGIN IMMEDIATE")
+            results_store.add(*configs_and_results[0])
+            with pytest.raises(sqlite3.OperationalError, match="locked"):
+                results_store.add(*configs_and_results[1])
+            other_connection.execute("ROLLBACK")
+            other_connection.close()
+            # the runs are still buffered and are inserted once the lock is released
+            assert results_store.get_num_runs() == 2
+        connection = sqlite3.connect(io_utils.get_abs_path(DB_PATH))
+        assert connection.execute("SELECT id FROM runs ORDER BY id").fetchall() == [
+            (1,),
+            (2,),
+        ]
+        connection.close()
+        io_utils.delete_dir(DIR)
+
+    def test_store_projection(self) -> None:
+        (config, result), *_ = _get_configs_and_results(1)
+        with ResultsStore(DB_PATH, store_projection=True) as results_store:
+            results_store.add(config, result)
+            results_store.add(config, result)
+        connection = sqlite3.connect(io_utils.get_abs_path(DB_PATH))
+        rows = connection.execute(
+            "SELECT run_id, year, date, buy_home_equity, rent_invested_pre_tax "
+            "FROM projection_rows ORDER BY run_id, year"
+        ).fetchall()
+        assert len(rows) == 2 * (config.num_years + 1)
+        for year in range(config.num_years + 1):
+            month = 12 * year
+            assert rows[year] == (
+                1,
+                year,
+                result.projection.index[month],
+                result.projection[("Buy", "Home Equity")].iloc[month],
+                result.projection[("Rent", "Invested (Pre-Tax)")].iloc[month],
+            )
+        connection.close()
+        io_utils.delete_dir(DIR)
+
+    def test_query_runs(self) -> None:
+        configs_and_results = write_sweep(DB_PATH)
+        wealth_differences = [
+            result.final_state.wealth_if_buying - result.final_state.wealth_if_renting
+            for _, result in configs_and_results
+        ]
+        with ResultsStore(DB_PATH) as results_store:
+            act = results_store.query_runs()
+            assert len(act) == 6
+            assert act["wealth_difference"].tolist() == sorted(
+                wealth_differences, reverse=True
+            )
+
+            act = results_store.query_runs(
+                filters={"sale_price": (450000, None), "monthly_rent": (2000, 2000)},
+                columns=["id", "sale_price", "monthly_rent"],
+                order_by="sale_price",
+                descending=False,
+            )
+            assert act.values.tolist() == [[3, 500000.0, 2000.0], [5, 600000.0, 2000.0]]
+
+            act = results_store.query_runs(limit=2, descending=False)
+            assert act["wealth_difference"].tolist() == sorted(wealth_differences)[:2]
+
+            with pytest.raises(AssertionError):
+                results_store.query_runs(columns=["sale_price; DROP TABLE runs"])
+            with pytest.raises(AssertionError):
+                results_store.query_runs(filters={"not_a_column": (0, 1)})
+        io_utils.delete_dir(DIR)
+
+    def test_get_pivot(self) -> None:
+        configs_and_results = write_sweep(DB_PATH)
+        with ResultsStore(DB_PATH) as results_store:
+            act = results_store.get_pivot("sale_price", "monthly_rent")
+            act_filtered = results_store.get_pivot(
+                "sale_price", "monthly_rent", filters={"sale_price": (None, 500000)}
+            )
+        assert act.index.tolist() == [400000.0, 500000.0, 600000.0]
+        assert act.columns.tolist() == [2000.0, 3000.0]
+        for config, result in configs_and_results:
+            assert act.loc[
+                config.buy_config.sale_price, config.rent_config.monthly_rent
+            ] == (
+                result.final_state.wealth_if_buying
+                - result.final_state.wealth_if_renting
+            )
+        assert act_filtered.equals(act.loc[[400000.0, 500000.0]])
+        io_utils.delete_dir(DIR)
@@ -1,27 +1,44 @@
 import argparse
-import datetime
+import contextlib
+import cProfile
+import importlib
 import os
-from typing import Any
-
-import openpyxl
-import pandas as pd
+import pstats
+import sys
+import tracemalloc
 
+# NOTE: pandas, numpy, openpyxl, and jsonschema are only imported by the code paths
+# which need them, so that e.g. `--help` and `--summary-only` start fast; keep it
+# that way (see main_test.py)
 from rent_buy_invest.configs.experiment_config import ExperimentConfig
-from rent_buy_invest.core.calculator import Calculator
-from rent_buy_invest.core.final_state import FinalState
-from rent_buy_invest.core.initial_state import InitialState
+from rent_buy_invest.core.experiment_result import ExperimentResult
+from rent_buy_invest.io import io_utils
 from rent_buy_invest.io.experiment_writer import ExperimentWriter
-from rent_buy_invest.io.io_utils import RentBuyInvestFileOpener
-from rent_buy_invest.utils.math_utils import MONTHS_PER_YEAR
+from rent_buy_invest.io.projection_cache import ProjectionCache
+from rent_buy_invest.io.results_store import ResultsStore
+from rent_buy_invest.utils.metrics_utils import METRICS, collect_metrics
+from rent_buy_invest.utils.profiling_utils import MemoryTracer, PhaseTimer, maybe_phase
 
-PRIMARY_HOME_CAP_GAINS_EXEMPTION = 250000
+# subcommand -> module whose main() takes the arguments after the subcommand;
+# modules are imported only when their subcommand is run. Without a subcommand, a
+# single experiment is run
+COMMANDS = {
+    "query": "rent_buy_invest.commands.query",
+    "daemon": "rent_buy_invest.commands.daemon",
+    "client": "rent_buy_invest.commands.client",
+    "serve": "rent_buy_invest.commands.serve",
+    "batch": "rent_buy_invest.commands.batch",
+}
+# number of functions printed by --cprofile
+NUM_PROFILE_ROWS = 20
 
 
-def _get_args() -> argparse.Namespace:
+def _get_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parses the arguments of a single experiment run; defaults to sys.argv[1:]."""
     parser = argparse.ArgumentParser(
         prog="rent_buy_invest",
         description="Calculates the long-term financial pros and cons of decisions related to renting a home, buying a home, and investing in the stock market.",
-        epilog="See README for more details.",
+        epilog=f"Subcommands: {', '.join(COMMANDS)} (see 'python -m rent_buy_invest <subcommand> --help'). See README for more details.",
     )
     parser.add_argument(
         "experiment_config",
@@ -33,10 +50,85 @@ def _get_args() -> argparse.Namespace:
         type=str,
         help="Name of the experiment. Output folder will be 'out/<experiment_name>/<timestamp>'; defaults to 'experiment'",
     )
-    args = parser.parse_args()
-    assert args.experiment_config.endswith(".yaml") or args.experiment.config_endswith(
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always recompute the projection instead of reusing a cached result for identical configs.",
+    )
+    parser.add_argument(
+        "--fixed-point",
+        action="store_true",
+        help="Calculate in integer cents with explicit rounding rules instead of floats rounded to cents, "
+        "so that the month-by-month calculation is exact given its inputs (see core/fixed_point_calculator.py). "
+        "Results may differ from the default calculation by a few cents.",
+    )
+    parser.add_argument(
+        "--output-format",
+        type=str,
+        nargs="+",
+        choices=ExperimentWriter.OUTPUT_FORMATS,
+        default=[ExperimentWriter.DEFAULT_OUTPUT_FORMAT],
+        help=f"Format(s) of the initial state, projection, and final state outputs; defaults to '{ExperimentWriter.DEFAULT_OUTPUT_FORMAT}'. "
+        "Use 'xlsx' for formatted spreadsheets; 'parquet' and 'feather' require pyarrow.",
+    )
+    parser.add_argument(
+        "--results-db",
+        type=str,
+        help="Path (from 'rent_buy_invest' directory) to a SQLite results database, e.g., "
+        f"'{ResultsStore.DEFAULT_DB_PROJECT_PATH}'. If given, the run's config and results are appended to it.",
+    )
+    parser.add_argument(
+        "--store-projection",
+        action="store_true",
+        help="With --results-db, also store the projection at the start of each year.",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Only calculate and print the final wealth if renting and if buying. Nothing is written and the cache is not used, which makes this much faster.",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time each phase of the run (loading configs, calculating, writing each format, ...), "
+        "print a summary, and write it to 'timings.json' in the output folder. Outputs are then written one format at a time.",
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Same as --profile, but also run under cProfile, print the slowest functions, "
+        "and write the stats to 'profile.pstats' in the output folder. cProfile slows down the run.",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="store_true",
+        help="Count calls and add up the time of hot computations (tax calculations, growth projections, ...) "
+        "and write them to 'metrics.json' in the output folder. The projection cache is not used.",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Trace memory allocations with tracemalloc during each phase of the run (loading configs, calculating, "
+        "building DataFrames, writing each format, ...), print the peak memory per phase, and write the peaks and "
+        "top allocation sites per phase to 'memory.json' in the output folder. The projection cache is not used. "
+        "Tracing slows down the run considerably.",
+    )
+    args = parser.parse_args(argv)
+    assert args.experiment_config.endswith(".yaml") or args.experiment_config.endswith(
         ".yml"
     ), "Experiment config file must end in '.yaml' or '.yml'"
+    if args.summary_only and args.results_db:
+        parser.error("--summary-only cannot be used with --results-db")
+    if args.cprofile:
+        args.profile = True
+    if args.summary_only and args.profile:
+        parser.error("--summary-only cannot be used with --profile or --cprofile")
+    if args.summary_only and args.metrics:
+        parser.error("--summary-only cannot be used with --metrics")
+    if args.trace_memory and (args.summary_only or args.profile):
+        parser.error(
+            "--trace-memory cannot be used with --summary-only, --profile, or --cprofile"
+        )
     if not args.experiment_name:
         args.experiment_name = "unnamed_experiment"
     return args
@@ -45,141 +137,142 @@ def _get_args() -> argparse.Namespace:
 def main() -> None:
     """Main method; entrypoint for this repo."""
 
+    # dispatch subcommands
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        importlib.import_module(COMMANDS[sys.argv[1]]).main(sys.argv[2:])
+        return
+
     # get args; set up `--help` and `-h`
-    args = _get_args()
-
-    # load configs
-    experiment_config = ExperimentConfig.parse(args.experiment_config)
-    num_years = experiment_config.num_years
-    market_config = experiment_config.market_config
-    personal_config = experiment_config.personal_config
-    rent_config = experiment_config.rent_config
-    buy_config = experiment_config.buy_config
-    start_date = experiment_config.start_date
-
-    # initialize experiment writer
-    experiment_writer = ExperimentWriter(args.experiment_name)
-    # dump configs in output dir (to keep record of configs)
-    experiment_writer.write_yaml("configs.yaml", experiment_config)
-    # calculate initial state
-    initial_state = InitialState.from_configs(
-        buy_config, rent_config, market_config, personal_config
-    )
-    # dump initial state
-    experiment_writer.write_xlsx_df(
-        "initial_state.xlsx", initial_state.get_df(), num_header_rows=1
-    )
+    run(_get_args())
 
-    # project forward in time
-    calculator = Calculator(
-        buy_config,
-        rent_config,
-        market_config,
-        personal_config,
-        num_years,
-        start_date,
-        initial_state,
-    )
-    projection = calculator.calculate()
-    experiment_writer.write_xlsx_df("projection.xlsx", projection, num_header_rows=2)
-
-    # TODO handle short term gain too?
-    assert num_years > 1
-    # at the end, compare only post-tax values
-    # buy side: need to sell house, and investments
-    # the sale itself includes some deductible and non-deductible expenses, so we'll calculate that too
-    # rent side: need to sell investments
-    # First do buy case
-    # Realistically you wouldn't sell all your investments at once...
-    # you'd spread it out, and there's probably some optimal way to do that...
-    # but here we assume all at once...
-    # TODO maybe I should do it separately. After all, there may be a HUGE cap gains in one year, so doing it all at once may make it seem like buying is worse than it really is
-    assert len(projection) % MONTHS_PER_YEAR == 1
-    # get last year's annual income
-    annual_income = sum(
-        personal_config.get_ordinary_incomes(num_years * MONTHS_PER_YEAR)[
-            -1 - MONTHS_PER_YEAR : -1
-        ]
-    )
-    # get cap gains on investments if buying
-    final_investments_if_buying = projection[("Buy", "Invested (Pre-Tax)")].iloc[-1]
-    initial_investments_if_buying = projection[("Buy", "Invested (Pre-Tax)")].iloc[0]
-    # TODO handle losses here and everywhere else. For now, just set gain to 0
-    cap_gains_from_selling_investments_if_buying = max(
-        final_investments_if_buying - initial_investments_if_buying, 0
-    )
-    # get cap gains on home
-    # don't want to separately find tax for investments and home, since they don't contribute "proportionally"
-    # due to tax bracketing. Find total cap gains, then calculate tax
-    loan_amount = projection[("Buy", "Loan Amount")].iloc[-1]
-    final_home_price = projection[("Buy", "Home Value")].iloc[-1]
-    initial_home_price = projection[("Buy", "Home Value")].iloc[0]
-    # some selling costs are immediately deductible from capital gains
-    deductible_selling_costs = buy_config.get_deductible_selling_costs(final_home_price)
-    nondeductible_selling_costs = buy_config.get_nondeductible_selling_costs(
-        final_home_price
-    )
-    home_cost_basis = (
-        initial_home_price + buy_config.get_part_of_basis_upfront_one_time_cost()
-    )
-    cap_gains_from_selling_home = max(
-        (final_home_price - deductible_selling_costs) - home_cost_basis,
-        0,
-    )
-    # calculate deduction here because it is separate for home vs investments
-    if not buy_config.rental_income_config:
-        home_cap_gains_exemption = min(
-            PRIMARY_HOME_CAP_GAINS_EXEMPTION, cap_gains_from_selling_home
-        )
-        cap_gains_from_selling_home -= home_cap_gains_exemption
-    total_cap_gains_if_buying = (
-        cap_gains_from_selling_investments_if_buying + cap_gains_from_selling_home
-    )
-    # TODO create classes/methods for this
-    num_months = num_years * MONTHS_PER_YEAR
-    income_and_cap_gains_tax_if_buying = market_config.get_tax(
-        num_months + 1,
-        ordinary_income=annual_income,
-        long_term_capital_gains=total_cap_gains_if_buying,
-    )
-    only_income_tax_if_buying = market_config.get_tax(
-        num_months + 1, ordinary_income=annual_income
-    )
-    cap_gains_tax_if_buying = (
-        income_and_cap_gains_tax_if_buying - only_income_tax_if_buying
-    )
-    wealth_if_buying = (
-        -loan_amount
-        + final_investments_if_buying
-        + (final_home_price - deductible_selling_costs - nondeductible_selling_costs)
-        - cap_gains_tax_if_buying
-    )
 
-    # Now do rent case
-    final_investments_if_renting = projection[("Rent", "Invested (Pre-Tax)")].iloc[-1]
-    initial_investments_if_renting = projection[("Rent", "Invested (Pre-Tax)")].iloc[0]
-    cap_gains_from_selling_investments_if_renting = max(
-        final_investments_if_renting - initial_investments_if_renting, 0
-    )
-    total_cap_gains_if_renting = cap_gains_from_selling_investments_if_renting
-    income_and_cap_gains_tax_if_renting = market_config.get_tax(
-        num_months + 1,
-        ordinary_income=annual_income,
-        long_term_capital_gains=total_cap_gains_if_renting,
-    )
-    only_income_tax_if_renting = market_config.get_tax(
-        num_months + 1, ordinary_income=annual_income
-    )
-    cap_gains_tax_if_renting = (
-        income_and_cap_gains_tax_if_renting - only_income_tax_if_renting
-    )
-    wealth_if_renting = final_investments_if_renting - cap_gains_tax_if_renting
-    final_state = FinalState(
-        wealth_if_renting=wealth_if_renting, wealth_if_buying=wealth_if_buying
+def run(
+    args: argparse.Namespace, experiment_config: ExperimentConfig | None = None
+) -> None:
+    """Runs a single experiment.
+
+    Args:
+        args: Parsed arguments (see _get_args)
+        experiment_config: Already parsed args.experiment_config, if available
+            (e.g., cached by the daemon; see commands/daemon.py)
+    """
+    phase_timer = PhaseTimer() if args.profile else None
+    profiler = cProfile.Profile() if args.cprofile else None
+    if args.trace_memory:
+        phase_timer = MemoryTracer()
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    try:
+        # load configs
+        with maybe_phase(phase_timer, "load_configs"):
+            if experiment_config is None:
+                experiment_config = ExperimentConfig.parse(args.experiment_config)
+
+        # only calculate the final state, skipping the projection DataFrame and
+        # outputs
+        if args.summary_only:
+            final_state = ExperimentResult.get_final_state(
+                experiment_config, args.fixed_point
+            )
+            difference = final_state.wealth_if_buying - final_state.wealth_if_renting
+            print(f"Wealth if renting: ${final_state.wealth_if_renting:,.2f}")
+            print(f"Wealth if buying: ${final_state.wealth_if_buying:,.2f}")
+            print(
+                f"Buying minus renting: {'-' if difference < 0 else ''}${abs(difference):,.2f}"
+            )
+            return
+
+        # initialize experiment writer; outputs are written on a background thread,
+        # overlapping with the calculation, and are all written when the block exits
+        with ExperimentWriter(
+            args.experiment_name, num_writer_threads=1
+        ) as experiment_writer:
+            # dump configs in output dir (to keep record of configs)
+            experiment_writer.write_configs(experiment_config, phase_timer)
+
+            # calculate initial state, project forward in time, and calculate final
+            # state, unless identical configs were already run with the current
+            # engine (with --metrics or --trace-memory, always calculate so that it is
+            # measured)
+            projection_cache = (
+                None
+                if args.no_cache or args.metrics or args.trace_memory
+                else ProjectionCache()
+            )
+            result = None
+            if projection_cache:
+                with maybe_phase(phase_timer, "cache_lookup"):
+                    result = projection_cache.get(experiment_config, args.fixed_point)
+            if result is None:
+                with collect_metrics() if args.metrics else contextlib.nullcontext():
+                    result = ExperimentResult.from_config(
+                        experiment_config, phase_timer, args.fixed_point
+                    )
+                if projection_cache:
+                    with maybe_phase(phase_timer, "cache_store"):
+                        projection_cache.put(
+                            experiment_config, result, args.fixed_point
+                        )
+
+            # append results to the results database
+            if args.results_db:
+                with maybe_phase(phase_timer, "results_db"):
+                    with ResultsStore(
+                        args.results_db, store_projection=args.store_projection
+                    ) as results_store:
+                        results_store.add(
+                            experiment_config, result, args.experiment_name
+                        )
+
+            # dump results
+            experiment_writer.write_outputs(result, args.output_format, phase_timer)
+    finally:
+        if profiler:
+            profiler.disable()
+        if args.trace_memory:
+            tracemalloc.stop()
+
+    if args.trace_memory:
+        _write_memory_trace(experiment_writer.output_dir, phase_timer)
+    elif phase_timer:
+        _write_profile(experiment_writer.output_dir, phase_timer, profiler)
+    if args.metrics:
+        metrics_path = os.path.join(experiment_writer.output_dir, "metrics.json")
+        io_utils.write_json(metrics_path, METRICS.to_dict())
+        print(f"Metrics: {metrics_path}")
+
+
+def _write_profile(
+    output_dir: str, phase_timer: PhaseTimer, profiler: cProfile.Profile | None
+) -> None:
+    """Writes and prints the phase timings and, if given, the cProfile stats."""
+    io_utils.write_json(
+        os.path.join(output_dir, "timings.json"),
+        {"phases": phase_timer.timings, "total": phase_timer.get_total()},
     )
-    experiment_writer.write_xlsx_df(
-        "final_state.xlsx", final_state.get_df(), num_header_rows=1
+    print(phase_timer.get_summary())
+    if profiler:
+        profile_path = os.path.join(output_dir, "profile.pstats")
+        profiler.dump_stats(io_utils.get_abs_path(profile_path))
+        print()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(NUM_PROFILE_ROWS)
+        print(f"cProfile stats: {profile_path} (load with pstats or snakeviz)")
+
+
+def _write_memory_trace(output_dir: str, memory_tracer: MemoryTracer) -> None:
+    """Writes and prints the memory of each phase."""
+    memory_path = os.path.join(output_dir, "memory.json")
+    io_utils.write_json(
+        memory_path,
+        {
+            "phases": memory_tracer.memory,
+            "peak_bytes": memory_tracer.get_peak(),
+            "timings": memory_tracer.timings,
+        },
     )
+    print(memory_tracer.get_memory_summary())
+    print(f"Memory trace: {memory_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,172 @@
+import glob
+import json
+import os
+import pstats
+import subprocess
+import sys
+import tracemalloc
+
+import pytest
+
+from rent_buy_invest import main
+from rent_buy_invest.io import io_utils
+
+# modules which are slow to import and must only be imported by the code paths
+# which need them
+HEAVY_MODULES = {"pandas", "numpy", "openpyxl", "jsonschema", "pyarrow"}
+EXPERIMENT_CONFIG_PATH = (
+    "rent_buy_invest/configs/examples/example-1/experiment-config.yaml"
+)
+
+
+def _run_python(*args: str) -> subprocess.CompletedProcess:
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.path.dirname(io_utils.get_abs_path("rent_buy_invest")),
+    }
+    return subprocess.run(
+        [sys.executable, *args], env=env, capture_output=True, text=True, check=True
+    )
+
+
+def _get_imported_modules(code: str) -> set[str]:
+    """Returns the top-level modules imported after running code in a fresh interpreter."""
+    completed = _run_python(
+        "-c",
+        f"{code}\nimport json, sys\nprint(json.dumps(sorted(sys.modules)))",
+    )
+    last_line = completed.stdout.strip().splitlines()[-1]
+    return {module.split(".")[0] for module in json.loads(last_line)}
+
+
+def test_import_main() -> None:
+    modules = _get_imported_modules("import rent_buy_invest.main")
+    assert not modules & HEAVY_MODULES
+
+
+def test_summary_only() -> None:
+    modules = _get_imported_modules(
+        "import sys\n"
+        "from rent_buy_invest.main import main\n"
+        f"sys.argv = ['rent_buy_invest', '{EXPERIMENT_CONFIG_PATH}', '--summary-only']\n"
+        "main()"
+    )
+    # jsonschema is needed to validate the configs
+    assert not modules & (HEAVY_MODULES - {"jsonschema"})
+
+
+def test_help() -> None:
+    # --help stays fast since it imports none of the heavy modules (checked
+    # deterministically rather than by timing it)
+    modules = _get_imported_modules(
+        "import sys\n"
+        "from rent_buy_invest.main import main\n"
+        "sys.argv = ['rent_buy_invest', '--help']\n"
+        "try:\n"
+        "    main()\n"
+        "except SystemExit as e:\n"
+        "    assert e.code == 0\n"
+    )
+    assert not modules & HEAVY_MODULES
+
+
+def test_profile(capsys: pytest.CaptureFixture) -> None:
+    args = main._get_args(
+        [
+            EXPERIMENT_CONFIG_PATH,
+            "--experiment-name",
+            "test_profile",
+            "--no-cache",
+            "--cprofile",
+        ]
+    )
+    main.run(args)
+    out = capsys.readouterr().out
+    assert out.startswith("Phase")
+    assert "profile.pstats" in out
+
+    (output_dir,) = glob.glob(
+        io_utils.get_abs_path("rent_buy_invest/out/test_profile/*")
+    )
+    timings = io_utils.read_json(os.path.join(output_dir, "timings.json"))
+    assert list(timings["phases"]) == [
+        "load_configs",
+        "write_configs",
+        "initial_state",
+        "projection",
+        "projection_df",
+        "final_state",
+        "write_npz",
+    ]
+    assert timings["total"] == pytest.approx(sum(timings["phases"].values()))
+    stats = pstats.Stats(os.path.join(output_dir, "profile.pstats"))
+    assert stats.total_calls > 0
+    io_utils.delete_dir("rent_buy_invest/out/test_profile")
+
+
+def test_metrics(capsys: pytest.CaptureFixture) -> None:
+    args = main._get_args(
+        [EXPERIMENT_CONFIG_PATH, "--experiment-name", "test_metrics", "--metrics"]
+    )
+    main.run(args)
+    assert "metrics.json" in capsys.readouterr().out
+
+    (output_dir,) = glob.glob(
+        io_utils.get_abs_path("rent_buy_invest/out/test_metrics/*")
+    )
+    metrics = io_utils.read_json(os.path.join(output_dir, "metrics.json"))
+    counters = metrics["counters"]
+    num_years = io_utils.read_yaml(EXPERIMENT_CONFIG_PATH)["num_years"]
+    # the year-boundary branches run once a year and each calculate two taxes
+    assert counters["calculator.mortgage_interest_deduction"] == num_years
+    assert counters["calculator.rental_income_tax"] == num_years
+    assert counters["market_config.get_tax"] >= 4 * num_years
+    # get_tax inflates and applies both the income and capital gains tax brackets
+    assert (
+        counters["tax_brackets.get_inflated"]
+        == counters["tax_brackets._get_tax"]
+        == 2 * counters["market_config.get_tax"]
+    )
+    assert counters["math_utils.project_growth"] > 0
+    assert set(metrics["timers"]) == {
+        "calculator.mortgage_interest_deduction",
+        "calculator.rental_income_tax",
+    }
+    io_utils.delete_dir("rent_buy_invest/out/test_metrics")
+
+
+def test_trace_memory(capsys: pytest.CaptureFixture) -> None:
+    args = main._get_args(
+        [
+            EXPERIMENT_CONFIG_PATH,
+            "--experiment-name",
+            "test_trace_memory",
+            "--trace-memory",
+        ]
+    )
+    main.run(args)
+    out = capsys.readouterr().out
+    assert out.startswith("Phase")
+    assert "memory.json" in out
+    assert not tracemalloc.is_tracing()
+
+    (output_dir,) = glob.glob(
+        io_utils.get_abs_path("rent_buy_invest/out/test_trace_memory/*")
+    )
+    memory = io_utils.read_json(os.path.join(output_dir, "memory.json"))
+    # the projection cache is not used, so every phase is traced
+    assert list(memory["phases"]) == [
+        "load_configs",
+        "write_configs",
+        "initial_state",
+        "projection",
+        "projection_df",
+        "final_state",
+        "write_npz",
+    ]
+    assert list(memory["timings"]) == list(memory["phases"])
+    assert memory["peak_bytes"] == max(
+        phase["peak_bytes"] for phase in memory["phases"].values()
+    )
+    assert memory["phases"]["projection_df"]["peak_increase_bytes"] > 0
+    io_utils.delete_dir("rent_buy_invest/out/test_trace_memory")
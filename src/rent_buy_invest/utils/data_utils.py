@@ -1,7 +1,12 @@
-from collections.abc import Callable
-from typing import Any
+from __future__ import annotations
 
-import pandas as pd
+from collections.abc import Callable, Mapping
+from typing import TYPE_CHECKING, Any
+
+# numpy and pandas are slow to import, so they are only imported when needed
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 
 def to_df(
@@ -20,6 +25,8 @@ def to_df(
     Returns:
         pd.DataFrame: DataFrame constructed from given cols
     """
+    import pandas as pd
+
     index = index = pd.Index(rows) if rows else None
     df = pd.DataFrame(data=cols, index=index)
     if multi_col:
@@ -27,3 +34,47 @@ def to_df(
         columns = pd.MultiIndex.from_tuples(tuples)
         df.columns = columns
     return df
+
+
+def df_to_arrays(df: pd.DataFrame) -> dict[str, np.ndarray]:
+    """Converts a DataFrame to a flat dict of numpy arrays (e.g., for np.savez).
+
+    Column labels (including MultiIndex levels) and the index are stored as
+    string arrays so that the DataFrame can be rebuilt with arrays_to_df without
+    pickling. Each column keeps its own dtype.
+
+    Args:
+        df: DataFrame whose index and column labels are strings
+
+    Returns:
+        dict[str, np.ndarray]: arrays keyed by "index", "columns" and "col_<i>"
+    """
+    import numpy as np
+
+    columns = [
+        col_name if isinstance(col_name, tuple) else (col_name,)
+        for col_name in df.columns
+    ]
+    arrays = {
+        "index": np.array(df.index, dtype=str),
+        "columns": np.array(columns, dtype=str),
+    }
+    for i in range(df.shape[1]):
+        arrays[f"col_{i}"] = df.iloc[:, i].to_numpy()
+    return arrays
+
+
+def arrays_to_df(arrays: Mapping[str, np.ndarray]) -> pd.DataFrame:
+    """Inverse of df_to_arrays."""
+    import pandas as pd
+
+    columns = [tuple(col_name) for col_name in arrays["columns"].tolist()]
+    df = pd.DataFrame(
+        data={i: arrays[f"col_{i}"] for i in range(len(columns))},
+        index=pd.Index(arrays["index"].tolist()),
+    )
+    if columns and len(columns[0]) > 1:
+        df.columns = pd.MultiIndex.from_tuples(columns)
+    else:
+        df.columns = pd.Index([col_name[0] for col_name in columns])
+    return df
@@ -51,3 +51,12 @@ def test_to_df_cols_rows_multicol() -> None:
 
     exp = pd.read_pickle(io_utils.get_abs_path(exp_df_project_path))
     assert act.equals(exp)
+
+
+def test_df_to_arrays_and_arrays_to_df() -> None:
+    for multi_col in (False, True):
+        exp = data_utils.to_df(COLS, ROWS, multi_col=multi_col)
+        act = data_utils.arrays_to_df(data_utils.df_to_arrays(exp))
+        assert act.equals(exp)
+        assert list(act.columns) == list(exp.columns)
+        assert list(act.index) == list(exp.index)
@@ -0,0 +1,28 @@
+import datetime
+import hashlib
+import json
+from collections.abc import Mapping
+from typing import Any
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Fallback for json.dumps for objects it cannot serialize natively."""
+    if isinstance(obj, datetime.date):  # also covers datetime.datetime
+        return obj.isoformat()
+    if isinstance(obj, Mapping):  # e.g., frozen config fields
+        return dict(obj)
+    raise TypeError(f"Cannot canonicalize object of type {type(obj).__name__}")
+
+
+def to_canonical_json(obj: Any) -> str:
+    """Serializes obj to JSON deterministically (sorted keys, no whitespace).
+
+    Dates are serialized in ISO format, read-only mappings as dicts and tuples as
+    lists.
+    """
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), default=_to_jsonable)
+
+
+def get_hash(*objs: Any) -> str:
+    """Returns the hex SHA-256 of the canonical JSON of the given objects."""
+    return hashlib.sha256(to_canonical_json(list(objs)).encode()).hexdigest()
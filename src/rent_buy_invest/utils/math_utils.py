@@ -1,6 +1,8 @@
 import datetime
 from collections.abc import Iterable
 
+from rent_buy_invest.utils.metrics_utils import METRICS
+
 MONTHS_PER_YEAR: int = 12
 
 
@@ -32,6 +34,8 @@ def project_growth(
     Raises:
         AssertionError: If principal or num_months is negative
     """
+    if METRICS.enabled:
+        METRICS.increment("math_utils.project_growth")
     assert principal >= 0, "Principal must be non-negative."
     assert num_months >= 0, "Number of months must be non-negative."
     if compound_monthly:
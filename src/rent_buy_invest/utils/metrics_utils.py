@@ -0,0 +1,102 @@
+import contextlib
+import time
+from collections.abc import Iterator
+from typing import Any
+
+
+class MetricsRegistry:
+    """Counters and cumulative timers of hot code paths (e.g., tax calculations).
+
+    Disabled by default. Hot code checks `enabled` before recording, so that a
+    disabled registry costs one attribute lookup per record:
+
+        if METRICS.enabled:
+            METRICS.increment("market_config.get_tax")
+
+    Not thread-safe; each process has its own registry (see METRICS).
+
+    Attributes:
+        enabled (bool): If False, nothing is recorded
+        counters (dict[str, int]): Metric name -> count
+        timers (dict[str, float]): Metric name -> cumulative seconds
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counters: dict[str, int] = {}
+        self.timers: dict[str, float] = {}
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def timer(self, name: str) -> contextlib.AbstractContextManager:
+        """Returns a context manager which counts its blocks and adds up their time
+        under the given name, if enabled."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Timer(self, name)
+
+    def reset(self) -> None:
+        self.counters = {}
+        self.timers = {}
+
+    def merge(self, metrics: dict[str, dict[str, float]]) -> None:
+        """Adds metrics from to_dict() (e.g., of another process) to this registry."""
+        for name, count in metrics["counters"].items():
+            self.increment(name, count)
+        for name, seconds in metrics["timers"].items():
+            self.add_time(name, seconds)
+
+    def to_dict(self) -> dict[str, dict[str, float]]:
+        """Returns the metrics as a JSON-serializable dict, sorted by name.
+
+        Example:
+            {"counters": {"market_config.get_tax": 120}, "timers": {"market_config.get_tax": 0.0012}}
+        """
+        return {
+            "counters": dict(sorted(self.counters.items())),
+            "timers": dict(sorted(self.timers.items())),
+        }
+
+
+class _Timer:
+    def __init__(self, registry: MetricsRegistry, name: str) -> None:
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.registry.increment(self.name)
+        self.registry.add_time(self.name, time.perf_counter() - self.start)
+
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+# metrics of this process
+METRICS = MetricsRegistry()
+
+
+@contextlib.contextmanager
+def collect_metrics() -> Iterator[MetricsRegistry]:
+    """Context manager which records METRICS from zero during its block.
+
+    METRICS is disabled again afterwards (unless it was already enabled), but keeps
+    its values, so they can be read after the block.
+
+    Example:
+        with collect_metrics() as metrics:
+            ExperimentResult.from_config(experiment_config)
+        io_utils.write_json(path, metrics.to_dict())
+    """
+    was_enabled = METRICS.enabled
+    METRICS.reset()
+    METRICS.enabled = True
+    try:
+        yield METRICS
+    finally:
+        METRICS.enabled = was_enabled
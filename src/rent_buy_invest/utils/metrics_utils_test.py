@@ -0,0 +1,49 @@
+from rent_buy_invest.utils.metrics_utils import (
+    METRICS,
+    MetricsRegistry,
+    collect_metrics,
+)
+
+
+def test_metrics_registry() -> None:
+    metrics = MetricsRegistry()
+    assert not metrics.enabled
+    # disabled timers record nothing
+    with metrics.timer("a"):
+        pass
+    assert metrics.to_dict() == {"counters": {}, "timers": {}}
+
+    metrics.enabled = True
+    metrics.increment("b")
+    metrics.increment("b", 2)
+    with metrics.timer("a"):
+        pass
+    with metrics.timer("a"):
+        pass
+    assert metrics.counters == {"b": 3, "a": 2}
+    assert list(metrics.timers) == ["a"]
+    assert metrics.timers["a"] >= 0
+
+    # sorted by name
+    metrics_dict = metrics.to_dict()
+    assert list(metrics_dict["counters"]) == ["a", "b"]
+    other = MetricsRegistry()
+    other.merge(metrics_dict)
+    other.merge(metrics_dict)
+    assert other.counters == {"a": 4, "b": 6}
+    assert other.timers == {"a": 2 * metrics.timers["a"]}
+
+    metrics.reset()
+    assert metrics.to_dict() == {"counters": {}, "timers": {}}
+
+
+def test_collect_metrics() -> None:
+    assert not METRICS.enabled
+    METRICS.increment("stale")
+    with collect_metrics() as metrics:
+        assert metrics is METRICS
+        assert METRICS.enabled
+        METRICS.increment("a")
+    assert not METRICS.enabled
+    assert METRICS.counters == {"a": 1}
+    METRICS.reset()
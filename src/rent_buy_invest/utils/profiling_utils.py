@@ -0,0 +1,187 @@
+import contextlib
+import fnmatch
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any
+
+# number of allocation sites kept per phase by MemoryTracer
+NUM_TOP_ALLOCATIONS = 10
+# allocations in these files (e.g., by the snapshots themselves) are not attributed to
+# any phase
+_IGNORED_FILENAME_PATTERNS = (
+    __file__,
+    tracemalloc.__file__,
+    "<frozen importlib._bootstrap*>",
+    "<unknown>",
+)
+
+
+class PhaseTimer:
+    """Measures the wall-clock time of named phases of a run.
+
+    Times come from time.perf_counter, a monotonic clock. Timing the same phase
+    more than once adds up the times.
+
+    Attributes:
+        timings (dict[str, float]): Phase name -> seconds, in order of first use
+    """
+
+    def __init__(self) -> None:
+        self.timings: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Context manager which adds the time spent in its block to the phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = (
+                self.timings.get(name, 0.0) + time.perf_counter() - start
+            )
+
+    def get_total(self) -> float:
+        """Returns the total time of all phases in seconds."""
+        return sum(self.timings.values())
+
+    def get_summary(self) -> str:
+        """Returns a table of the phases, slowest first.
+
+        Example:
+            Phase           Seconds  Share
+            projection        0.412  81.3%
+            initial_state     0.001   0.2%
+            Total             0.507
+        """
+        total = self.get_total()
+        width = max([len("Phase"), len("Total")] + [len(n) for n in self.timings])
+        lines = [f"{'Phase':<{width}}  {'Seconds':>8}  {'Share':>6}"]
+        for name, seconds in sorted(
+            self.timings.items(), key=lambda item: item[1], reverse=True
+        ):
+            share = seconds / total if total else 0.0
+            lines.append(f"{name:<{width}}  {seconds:>8.3f}  {share:>6.1%}")
+        lines.append(f"{'Total':<{width}}  {total:>8.3f}")
+        return "\n".join(lines)
+
+
+class MemoryTracer(PhaseTimer):
+    """PhaseTimer which also measures the memory allocated by each phase with
+    tracemalloc.
+
+    tracemalloc must be tracing (see tracemalloc.start) while phases run. It slows
+    down allocations considerably, so the timings are only rough. Phases must not
+    be nested.
+
+    Attributes:
+        memory (dict[str, dict[str, Any]]): Phase name -> {
+            "peak_bytes": highest traced memory (of the whole process) during the phase,
+            "peak_increase_bytes": peak_bytes minus the traced memory when the phase started,
+            "allocated_bytes": traced memory still allocated after the phase, minus when it started,
+            "top_allocations": source lines which allocated the most memory still
+                allocated after the phase, as {"site": "<file>:<line>", "size_bytes", "count"},
+        }; timing the same phase more than once keeps the highest peaks and adds
+        up the rest
+    """
+
+    def __init__(self, num_top_allocations: int = NUM_TOP_ALLOCATIONS) -> None:
+        super().__init__()
+        self.num_top_allocations = num_top_allocations
+        self.memory: dict[str, dict[str, Any]] = {}
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        assert tracemalloc.is_tracing(), "tracemalloc must be tracing"
+        before_snapshot_memory, _ = tracemalloc.get_traced_memory()
+        start_snapshot = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_memory, _ = tracemalloc.get_traced_memory()
+        # the start snapshot is held during the phase, but isn't part of its memory
+        snapshot_memory = start_memory - before_snapshot_memory
+        try:
+            with super().phase(name):
+                yield
+        finally:
+            end_memory, peak_memory = tracemalloc.get_traced_memory()
+            end_snapshot = tracemalloc.take_snapshot()
+            # filtering the statistics rather than the snapshots (which have a trace
+            # per allocation) is much faster
+            top_allocations = []
+            for stat in end_snapshot.compare_to(start_snapshot, "lineno"):
+                if len(top_allocations) == self.num_top_allocations:
+                    break
+                frame = stat.traceback[0]
+                if stat.size_diff > 0 and not any(
+                    fnmatch.fnmatch(frame.filename, pattern)
+                    for pattern in _IGNORED_FILENAME_PATTERNS
+                ):
+                    top_allocations.append(
+                        {
+                            "site": f"{frame.filename}:{frame.lineno}",
+                            "size_bytes": stat.size_diff,
+                            "count": stat.count_diff,
+                        }
+                    )
+            self._add_memory(
+                name,
+                {
+                    "peak_bytes": peak_memory - snapshot_memory,
+                    "peak_increase_bytes": peak_memory - start_memory,
+                    "allocated_bytes": end_memory - start_memory,
+                    "top_allocations": top_allocations,
+                },
+            )
+
+    def _add_memory(self, name: str, memory: dict[str, Any]) -> None:
+        if name not in self.memory:
+            self.memory[name] = memory
+            return
+        prev = self.memory[name]
+        prev["peak_bytes"] = max(prev["peak_bytes"], memory["peak_bytes"])
+        prev["peak_increase_bytes"] = max(
+            prev["peak_increase_bytes"], memory["peak_increase_bytes"]
+        )
+        prev["allocated_bytes"] += memory["allocated_bytes"]
+        prev["top_allocations"] = sorted(
+            prev["top_allocations"] + memory["top_allocations"],
+            key=lambda allocation: allocation["size_bytes"],
+            reverse=True,
+        )[: self.num_top_allocations]
+
+    def get_peak(self) -> int:
+        """Returns the highest traced memory of all phases in bytes."""
+        return max((m["peak_bytes"] for m in self.memory.values()), default=0)
+
+    def get_memory_summary(self) -> str:
+        """Returns a table of the memory of the phases, in order of first use.
+
+        Example:
+            Phase          Peak MiB  Peak increase MiB  Allocated MiB
+            load_configs      0.412              0.380          0.102
+            projection        3.120              2.700          1.950
+            Peak              3.120
+        """
+        mib = 1024**2
+        width = max([len("Phase"), len("Peak")] + [len(n) for n in self.memory])
+        lines = [
+            f"{'Phase':<{width}}  {'Peak MiB':>8}  {'Peak increase MiB':>17}  {'Allocated MiB':>13}"
+        ]
+        for name, memory in self.memory.items():
+            lines.append(
+                f"{name:<{width}}  {memory['peak_bytes'] / mib:>8.3f}  "
+                f"{memory['peak_increase_bytes'] / mib:>17.3f}  "
+                f"{memory['allocated_bytes'] / mib:>13.3f}"
+            )
+        lines.append(f"{'Peak':<{width}}  {self.get_peak() / mib:>8.3f}")
+        return "\n".join(lines)
+
+
+@contextlib.contextmanager
+def maybe_phase(phase_timer: PhaseTimer | None, name: str) -> Iterator[None]:
+    """PhaseTimer.phase if phase_timer is given; otherwise, does nothing."""
+    if phase_timer is None:
+        yield
+    else:
+        with phase_timer.phase(name):
+            yield
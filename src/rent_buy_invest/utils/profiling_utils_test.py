@@ -0,0 +1,59 @@
+import time
+import tracemalloc
+
+from rent_buy_invest.utils.profiling_utils import MemoryTracer, PhaseTimer, maybe_phase
+
+
+def test_phase_timer() -> None:
+    phase_timer = PhaseTimer()
+    with phase_timer.phase("a"):
+        time.sleep(0.02)
+    with phase_timer.phase("b"):
+        pass
+    with maybe_phase(phase_timer, "a"):
+        time.sleep(0.02)
+    with maybe_phase(None, "c"):
+        pass
+    assert list(phase_timer.timings) == ["a", "b"]
+    assert phase_timer.timings["a"] >= 0.04
+    assert phase_timer.get_total() == sum(phase_timer.timings.values())
+
+    lines = phase_timer.get_summary().splitlines()
+    assert lines[0].split() == ["Phase", "Seconds", "Share"]
+    # slowest first
+    assert [line.split()[0] for line in lines[1:]] == ["a", "b", "Total"]
+
+
+def test_memory_tracer() -> None:
+    memory_tracer = MemoryTracer(num_top_allocations=2)
+    tracemalloc.start()
+    try:
+        with memory_tracer.phase("a"):
+            kept = [bytearray(1000) for _ in range(1000)]
+        with maybe_phase(memory_tracer, "b"):
+            freed = bytearray(10**6)
+            del freed
+        with memory_tracer.phase("b"):
+            pass
+    finally:
+        tracemalloc.stop()
+    assert list(memory_tracer.timings) == ["a", "b"]
+    assert list(memory_tracer.memory) == ["a", "b"]
+
+    a = memory_tracer.memory["a"]
+    assert a["allocated_bytes"] >= 10**6
+    assert a["peak_increase_bytes"] >= a["allocated_bytes"]
+    assert a["peak_bytes"] >= a["peak_increase_bytes"]
+    # the bytearrays are the top allocation site
+    assert a["top_allocations"][0]["site"].startswith(f"{__file__}:")
+    assert a["top_allocations"][0]["count"] >= 1000
+    assert len(a["top_allocations"]) <= 2
+
+    b = memory_tracer.memory["b"]
+    assert b["peak_increase_bytes"] >= 10**6
+    assert b["allocated_bytes"] < 10**5
+    assert memory_tracer.get_peak() == max(a["peak_bytes"], b["peak_bytes"])
+
+    lines = memory_tracer.get_memory_summary().splitlines()
+    assert [line.split()[0] for line in lines] == ["Phase", "a", "b", "Peak"]
+    del kept